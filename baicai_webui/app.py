@@ -3,12 +3,18 @@ from pathlib import Path
 
 import streamlit as st
 
+from baicai_webui.services import get_interpreter_pool, install_llm_accounting, llm_scope
 from baicai_webui.utils import guard_llm_setting
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
+# 服务启动后在后台预热代码解释器，首个会话不必等待内核启动和导入重型库
+get_interpreter_pool()
+# 记录所有大模型调用的耗时和 token 用量，在「LLM 调用统计」页面查看
+install_llm_accounting()
+
 if guard_llm_setting():
     # Define your pages with custom titles and icons
     pages = [
@@ -20,6 +26,7 @@ if guard_llm_setting():
         st.Page("pages/collab.py", title="推荐系统", icon="🤝"),
         st.Page("pages/ml.py", title="传统机器学习", icon="📊"),
         st.Page("pages/llm_setting.py", title="大模型配置", icon="⚙️"),
+        st.Page("pages/llm_usage.py", title="LLM 调用统计", icon="📈"),
         # st.Page("pages/try.py", title="开发", icon="🛠️"),
     ]
 else:
@@ -31,4 +38,5 @@ else:
 # Set up navigation
 pg = st.navigation(pages)
 st.set_page_config(page_title="白菜人工智能平台", page_icon="🥬", layout="wide", initial_sidebar_state="expanded")
-pg.run()
+with llm_scope(page=pg.title):
+    pg.run()
@@ -0,0 +1,25 @@
+import uuid
+
+import streamlit as st
+
+from baicai_webui.services import DEFAULT_FIGURE_DPI, DEFAULT_FIGURE_FORMAT, ArtifactStore, sweep_artifacts
+
+
+def get_artifact_store() -> ArtifactStore:
+    """获取当前会话的产物目录，新会话创建目录时顺便清理已废弃会话的产物"""
+    if "artifact_session_id" not in st.session_state:
+        st.session_state.artifact_session_id = uuid.uuid4().hex
+        sweep_artifacts()
+    return ArtifactStore(st.session_state.artifact_session_id)
+
+
+async def run_with_artifacts(
+    code_interpreter, code: str, dpi: int = DEFAULT_FIGURE_DPI, fmt: str = DEFAULT_FIGURE_FORMAT, **kwargs
+):
+    """在代码解释器中运行代码，代码中可以调用 save_artifact/save_current_figure 保存产物
+
+    Returns:
+        tuple: (解释器输出, 是否成功)，产物句柄包含在输出中，可用 ArtifactStore.figures 等方法读取
+    """
+    store = get_artifact_store()
+    return await code_interpreter.run(store.prelude(dpi=dpi, fmt=fmt) + code, **kwargs)
@@ -3,11 +3,19 @@ import os
 
 import streamlit as st
 import torch
-from baicai_base.utils.setups import setup_code_interpreter
 from baicai_dev.utils.data import TaskType
 
 from baicai_webui.components.chat import ai_assistant
-from baicai_webui.components.model import create_training_monitor, result_display
+from baicai_webui.components.model import (
+    configure_run_timeouts_ui,
+    create_training_monitor,
+    ensure_code_interpreter,
+    get_client_id,
+    render_interpreter_pool_stats,
+    render_run_history,
+    result_display,
+)
+from baicai_webui.services import AdmissionError, get_job_manager, job_class_for, run_async
 
 
 class BasePage:
@@ -20,8 +28,7 @@ class BasePage:
         # 初始化按钮文本
         self.button_text = "开始训练"  # 默认训练
 
-        if "code_interpreter" not in st.session_state:
-            st.session_state.code_interpreter = setup_code_interpreter()
+        ensure_code_interpreter()
 
         # 初始化页面状态
         if "page_state" not in st.session_state:
@@ -46,9 +53,65 @@ class BasePage:
                 "dl_success": False,
             }
 
+    def _current_job(self):
+        """当前页面的训练任务
+
+        优先使用本会话记录的任务 id，刷新页面后会话状态丢失时，从地址中的 job 参数或
+        当前客户端仍在运行的任务重新连接。
+        """
+        manager = get_job_manager()
+        job = manager.get(st.session_state.page_state.get("job_id")) or manager.get(st.query_params.get("job"))
+        if job is None:
+            job = manager.latest(owner=get_client_id(), kind=self.task_type.value, active_only=True)
+        if job is not None:
+            st.session_state.page_state["job_id"] = job.id
+        return job
+
+    def _handle_finished_job(self, monitor, job):
+        """任务结束后取回图状态，并安排训练后处理"""
+        st.session_state.page_state["handled_job_id"] = job.id
+        try:
+            state_values = monitor.attach_job(job)
+        except Exception as e:
+            st.error(f"读取训练结果失败：{str(e)}")
+            return
+        if state_values is None:
+            if job.status.value == "succeeded":
+                st.warning("训练完成，但未返回结果")
+            return
+        st.session_state.graph_state["dl_codes"] = state_values.get("dl_codes", [])
+        st.session_state.graph_state["dl_models"] = state_values.get("dl_models", [])
+        st.session_state.graph_state["dl_success"] = state_values.get("dl_success", False)
+        st.session_state.page_state["helper_ready"] = True
+        st.session_state.page_state["run_post_train"] = True
+        st.session_state.page_state["post_train_completed"] = False
+
+    def _load_previous_run(self, run_id):
+        """加载已保存的运行结果，恢复结果查看和 AI 助手，不重新训练"""
+        monitor = st.session_state.page_state["monitor"]
+        try:
+            restored = monitor.restore_run(run_id, st.session_state.code_interpreter)
+        except Exception as e:
+            st.toast(f"加载运行失败：{str(e)}", icon="❌")
+            return
+        if restored is None:
+            st.toast("该运行没有保存结果", icon="⚠️")
+            return
+        _, state_values = restored
+        st.session_state.graph_state["dl_codes"] = state_values.get("dl_codes", [])
+        st.session_state.graph_state["dl_models"] = state_values.get("dl_models", [])
+        st.session_state.graph_state["dl_success"] = state_values.get("dl_success", False)
+        st.session_state.page_state["helper_ready"] = True
+        # 训练后处理依赖解释器中的学习器，加载历史运行时不再执行
+        st.session_state.page_state["run_post_train"] = False
+        st.session_state.page_state["post_train_completed"] = True
+        st.session_state.page_state["job_id"] = None
+        st.query_params.pop("job", None)
+
     def show(self, pre_train=None, post_train=None, title=None):
         """Display the page with common structure"""
         st.title(f"{title or self.task_type.value}")
+        render_interpreter_pool_stats()
 
         # Create tabs
         tab1, tab2, tab3 = st.tabs(["🤖 智能体配置", "📈结果查看", "💬 AI助手"])
@@ -63,12 +126,15 @@ class BasePage:
                 return
 
             data_config["configurable"]["from_web_ui"] = True
+            data_config["configurable"].update(configure_run_timeouts_ui(data_config["configurable"]))
 
             if data_config:
                 st.session_state.data_config = data_config
                 if pre_train:
                     pre_train()
 
+                render_run_history(self.task_type.value, on_load=self._load_previous_run, key="run_history")
+
                 # 根据任务类型动态设置按钮文本
                 if self.task_type == TaskType.NLP:
                     # 检查是否是情感分类训练任务
@@ -83,36 +149,31 @@ class BasePage:
                 # Show start training button
                 if st.button(button_text, type="primary", key="start_training_button"):
                     st.session_state.page_state["post_train_completed"] = False
-                    st.session_state.page_state["run_post_train"] = True
+                    st.session_state.page_state["run_post_train"] = False
+                    st.session_state.page_state["helper_ready"] = False
+                    # 添加内存清理
+                    import gc
+                    gc.collect()
+
                     try:
-                        # 添加内存清理
-                        import gc
-                        gc.collect()
-                        
-                        result = asyncio.run(
-                            monitor.start_training(
-                                task_type=self.task_type.value,
-                                config=data_config,
-                                code_interpreter=st.session_state.code_interpreter,
-                            )
+                        job = monitor.submit_training(
+                            task_type=self.task_type.value,
+                            config=data_config,
+                            code_interpreter=st.session_state.code_interpreter,
+                            owner=get_client_id(),
+                            job_class="nlp_infer" if button_text == "开始推理" else job_class_for(self.task_type.value),
                         )
-                        if result:
-                            state_values = monitor.app.get_state(data_config).values
-                            st.session_state.graph_state["dl_codes"] = state_values.get("dl_codes", [])
-                            st.session_state.graph_state["dl_models"] = state_values.get("dl_models", [])
-                            st.session_state.graph_state["dl_success"] = state_values.get("dl_success", False)
-                            st.session_state.page_state["helper_ready"] = True
-                            st.success("训练已启动！")
-                        else:
-                            st.warning("训练完成，但未返回结果")
-                    except Exception as e:
-                        st.error(f"训练失败：{str(e)}")
-                        import traceback
-                        st.code(traceback.format_exc(), language="python")
-                    finally:
-                        # 强制清理内存
-                        import gc
-                        gc.collect()
+                    except AdmissionError as e:
+                        st.warning(str(e))
+                    else:
+                        st.session_state.page_state["job_id"] = job.id
+                        st.query_params["job"] = job.id
+
+                job = self._current_job()
+                if job is not None:
+                    monitor.show_job_progress(job)
+                    if job.finished and st.session_state.page_state.get("handled_job_id") != job.id:
+                        self._handle_finished_job(monitor, job)
 
         with tab2:
             # Handle post_train in a separate rerun
@@ -123,7 +184,7 @@ class BasePage:
             ):
                 try:
                     # 添加超时保护
-                    asyncio.run(asyncio.wait_for(
+                    run_async(asyncio.wait_for(
                         post_train(st.session_state.code_interpreter),
                         timeout=120.0  # 2分钟超时
                     ))
@@ -143,6 +204,7 @@ class BasePage:
             if st.session_state.page_state["helper_ready"]:
                 try:
                     result_display.display_results(st.session_state.graph_state, graph="dl")
+                    monitor.show_resource_usage()
                 except Exception as e:
                     st.error(f"显示结果失败：{str(e)}")
 
@@ -1,11 +1,14 @@
 # Need a refacor later
 
-import asyncio
+import os
 
 import pandas as pd
 import streamlit as st
 from langchain_core.messages import AIMessage, HumanMessage
 
+from baicai_webui.components.artifacts import get_artifact_store, run_with_artifacts
+from baicai_webui.services import run_async
+
 # 在文件开头修改常量定义
 MSG_TYPE_DATAFRAME = "<<DATAFRAME>>"
 MSG_TYPE_JSON = "<<JSON>>"
@@ -125,7 +128,7 @@ def create_ai_assistant(monitor, run_code=True, task_type="ml") -> None:
             # return state_update
 
         # Run the async function
-        asyncio.run(_get_helper_response())
+        run_async(_get_helper_response())
 
 
 def _show_formatted_content(content, content_placeholder):
@@ -159,7 +162,13 @@ def _show_formatted_content(content, content_placeholder):
         elif msg_type == MSG_TYPE_HTML:
             content_placeholder.markdown(msg_content, unsafe_allow_html=True)
         elif msg_type == MSG_TYPE_IMAGE:
-            content_placeholder.markdown(msg_content, unsafe_allow_html=True)
+            if msg_content.startswith("<"):
+                # 旧版本消息中保存的是内嵌 base64 的 HTML
+                content_placeholder.markdown(msg_content, unsafe_allow_html=True)
+            elif os.path.exists(msg_content):
+                content_placeholder.image(msg_content, use_container_width=True)
+            else:
+                content_placeholder.caption(f"图片已被清理: {os.path.basename(msg_content)}")
         elif msg_type == MSG_TYPE_CODE:
             content_placeholder.markdown(msg_content)
         elif msg_type == MSG_TYPE_TEXT:
@@ -174,50 +183,17 @@ def _format_message_content(content_type: str, content: str) -> str:
 
 
 async def _handle_img(code):
+    """运行绘图代码，图表通过产物目录返回，输出中只包含图片路径"""
     altered_code = (
-        """
-import base64
-from io import BytesIO
-def fig_to_base64(fig):
-    # Save the figure to a temporary buffer with high DPI
-    buf = BytesIO()
-    fig.savefig(buf, format='png', dpi=300, bbox_inches='tight', pad_inches=0.1)
-    buf.seek(0)
-    # Encode the bytes as base64
-    img_base64 = base64.b64encode(buf.getvalue()).decode('utf-8')
-    buf.close()
-    return img_base64
-"""
-        + code
+        code
         + """
-if "plot" in locals():
-    if hasattr(plot, 'figure'):
-        # If plot is an Axes object
-        base64_string = fig_to_base64(plot.figure)
-    elif hasattr(plot, 'fig'):
-        # If plot has a fig attribute
-        base64_string = fig_to_base64(plot.fig)
-    else:
-        # Assume plot is already a Figure object
-        base64_string = fig_to_base64(plot)
-elif "fig" in locals():
-    base64_string = fig_to_base64(fig)
-elif plt.get_fignums():
-    base64_string = fig_to_base64(plt.gcf())
-else:
-    base64_string = ""
-
-print("START_BASE64")
-print(base64_string)
-print("END_BASE64")
+save_current_figure(globals().get("plot"), globals().get("fig"))
 """
     )
 
-    result = await st.session_state.code_interpreter.run(altered_code, ignore_keep_len=True)
-    base64_start = result[0].find("START_BASE64")
-    base64_end = result[0].find("END_BASE64")
-    base64_string = result[0][base64_start + len("START_BASE64") : base64_end]
-    return base64_string
+    result = await run_with_artifacts(st.session_state.code_interpreter, altered_code, ignore_keep_len=True)
+    figures = get_artifact_store().figures(result[0])
+    return str(figures[-1]) if figures else ""
 
 
 async def _handle_code_run_results(code):
@@ -227,18 +203,13 @@ async def _handle_code_run_results(code):
     response = ""
 
     if "import matplotlib.pyplot as plt" in code:
-        base64_string = await _handle_img(code)
-        # Create a container with proper styling for the image
-        img_container = f"""
-        <div style="width:100%; overflow:auto; margin:10px 0;">
-            <img src="data:image/png;base64,{base64_string}"
-                 style="max-width:100%; height:auto; display:block; margin:0 auto;"
-                 onerror="this.style.display='none'"/>
-        </div>
-        """
-        result_placeholder.markdown(img_container, unsafe_allow_html=True)
-        # Add image to message history with type
-        response = "\n" + _format_message_content(MSG_TYPE_IMAGE, img_container)
+        image_path = await _handle_img(code)
+        if image_path:
+            result_placeholder.image(image_path, use_container_width=True)
+            # Add image to message history with type
+            response = "\n" + _format_message_content(MSG_TYPE_IMAGE, image_path)
+        else:
+            result_placeholder.warning("代码执行完成，但未生成图片")
     else:
         try:
             code = code.replace("# Final Answer is below:", "")
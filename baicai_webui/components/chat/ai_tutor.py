@@ -1,11 +1,10 @@
 # TODO: Need a refacor later
 
-import asyncio
-
 import streamlit as st
 from baicai_tutor.agents.roles import concept_explainer, hinter
 
 from baicai_webui.components.model import get_page_llm
+from baicai_webui.services import llm_scope, run_async
 
 
 def create_ai_tutor(from_level: int = 1, terms: list[str] = None, debug: bool = False) -> None:
@@ -91,10 +90,11 @@ def create_ai_tutor(from_level: int = 1, terms: list[str] = None, debug: bool =
                 chain = concept_explainer(llm) if from_level == 1 else hinter(llm)
 
                 # Stream the response
-                async for chunk in chain.astream({"messages": [user_message]}):
-                    if hasattr(chunk, "content"):
-                        full_response += chunk.content
-                        message_placeholder.markdown(full_response + "▌")
+                with llm_scope(feature="concept_explainer" if from_level == 1 else "hinter"):
+                    async for chunk in chain.astream({"messages": [user_message]}):
+                        if hasattr(chunk, "content"):
+                            full_response += chunk.content
+                            message_placeholder.markdown(full_response + "▌")
 
                 if from_level != 1 and not debug:
                     full_response = full_response.split("</think>")[1]
@@ -105,4 +105,4 @@ def create_ai_tutor(from_level: int = 1, terms: list[str] = None, debug: bool =
                 )
 
         # Run the async function
-        asyncio.run(_get_helper_response())
+        run_async(_get_helper_response())
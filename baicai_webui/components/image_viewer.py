@@ -1,30 +1,67 @@
 import os
-from pathlib import Path
 from typing import List
 
 import streamlit as st
 
+from baicai_webui.services import ImageDatasetIndex, ThumbnailCache
 
-def get_image_files(folder_path: str) -> List[str]:
-    """Get all image files from a folder."""
-    image_extensions = {".jpg", ".jpeg", ".png", ".gif", ".bmp"}
-    return [str(f) for f in Path(folder_path).glob("*") if f.suffix.lower() in image_extensions]
 
+@st.cache_resource(show_spinner=False)
+def load_dataset_index(image_path: str) -> ImageDatasetIndex:
+    """Get the shared dataset index for an image root, built once per path."""
+    return ImageDatasetIndex(image_path)
 
-def get_subfolders(folder_path: str) -> List[str]:
+
+def get_dataset_index(image_path: str) -> ImageDatasetIndex:
+    """Get the dataset index for an image root, incrementally refreshed."""
+    index = load_dataset_index(str(image_path))
+    with st.spinner("正在建立图片索引..."):
+        index.refresh()
+    return index
+
+
+@st.cache_resource(show_spinner=False)
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Get the process-wide thumbnail cache shared by all sessions."""
+    return ThumbnailCache()
+
+
+def get_image_files(folder_path: str, index: ImageDatasetIndex) -> List[str]:
+    """Get all image files directly inside a folder."""
+    return [str(f) for f in index.image_files(index.relative(folder_path), recursive=False)]
+
+
+def get_subfolders(folder_path: str, index: ImageDatasetIndex) -> List[str]:
     """Get all subfolders from a folder."""
-    return [f.name for f in Path(folder_path).iterdir() if f.is_dir()]
+    return index.subfolders(index.relative(folder_path))
 
 
 def display_image_group(images: List[str], start_idx: int, group_size: int):
-    """Display a group of images."""
+    """Display a group of images as thumbnails and prefetch the next group."""
     end_idx = min(start_idx + group_size, len(images))
     current_images = images[start_idx:end_idx]
 
+    thumbnails = get_thumbnail_cache()
+    thumbs = thumbnails.get_many(current_images)
+    # Only the visible group is rendered; warm up the next one in the background
+    thumbnails.prefetch(images[end_idx : end_idx + group_size])
+
     cols = st.columns(min(4, len(current_images)))
-    for idx, img_path in enumerate(current_images):
+    for idx, (img_path, thumb) in enumerate(zip(current_images, thumbs, strict=True)):
         with cols[idx % len(cols)]:
-            st.image(img_path, use_container_width=True)
+            if thumb is None:
+                st.warning(f"无法读取图片: {os.path.basename(img_path)}")
+                continue
+            st.image(str(thumb), use_container_width=True)
+            if st.button("查看原图", key=f"open_original_{start_idx + idx}"):
+                st.session_state.original_image = img_path
+
+    original = st.session_state.get("original_image")
+    if original in current_images:
+        st.image(original, caption=os.path.basename(original), use_container_width=True)
+        if st.button("关闭原图", key="close_original_button"):
+            del st.session_state.original_image
+            st.rerun()
 
     return end_idx < len(images)
 
@@ -41,6 +78,8 @@ def reset_image_viewing_state():
         del st.session_state.current_group_start
     if "group_size" in st.session_state:
         del st.session_state.group_size
+    if "original_image" in st.session_state:
+        del st.session_state.original_image
 
 
 class ImageViewer:
@@ -69,7 +108,7 @@ class ImageViewer:
             reset_image_viewing_state()
             st.session_state.previous_dataset = self.image_path
 
-    def _display_folder_navigation(self):
+    def _display_folder_navigation(self, index: ImageDatasetIndex):
         """Display folder navigation controls."""
         # Display current folder path
         st.write(f"当前路径: {st.session_state.current_folder}")
@@ -83,7 +122,7 @@ class ImageViewer:
                 st.rerun()
 
         # Get and display subfolders
-        subfolders = get_subfolders(st.session_state.current_folder)
+        subfolders = get_subfolders(st.session_state.current_folder, index)
         if subfolders:
             st.write("选择文件夹:")
             cols = st.columns(4)
@@ -131,10 +170,11 @@ class ImageViewer:
 
             # Check if path is a directory
             if os.path.isdir(st.session_state.current_folder):
-                self._display_folder_navigation()
+                index = get_dataset_index(self.image_path)
+                self._display_folder_navigation(index)
 
                 # Get and display images
-                images = get_image_files(st.session_state.current_folder)
+                images = get_image_files(st.session_state.current_folder, index)
                 if images:
                     self._display_image_navigation(images)
                 else:
@@ -1,9 +1,11 @@
-from .data_upload import collab_uploader, ml_uploader, nlp_uploader, vision_uploader
+from .data_upload import collab_uploader, configure_run_timeouts_ui, ml_uploader, nlp_uploader, vision_uploader
 from .draw import draw_matplotlib
 from .graph_executor import create_graph_executor
 from .result_display import display_results
 from .tabular_shap import create_shap_analysis
-from .training import create_training_monitor
+from .training import create_training_monitor, get_client_id, saved_step_values
+from .run_history import render_run_history
+from .interpreter import ensure_code_interpreter, release_code_interpreter, render_interpreter_pool_stats
 from .model_settings import render_model_settings
 from .model_config_form import render_model_config_form
 from .model_config_page import get_page_llm
@@ -15,11 +17,18 @@ __all__ = [
     "nlp_uploader",
     "vision_uploader",
     "collab_uploader",
+    "configure_run_timeouts_ui",
     "draw_matplotlib",
     "create_graph_executor",
     "create_training_monitor",
+    "get_client_id",
     "create_shap_analysis",
     "render_model_settings",
     "render_model_config_form",
     "get_page_llm",
+    "render_run_history",
+    "saved_step_values",
+    "ensure_code_interpreter",
+    "release_code_interpreter",
+    "render_interpreter_pool_stats",
 ]
@@ -0,0 +1,83 @@
+from pathlib import Path
+from typing import Any, Dict, List
+
+from baicai_dev.agents.graphs.action_builder import ActionBuilder
+from baicai_dev.agents.graphs.action_builder.nodes import RunActionCoderNode
+from langchain_core.runnables import RunnableConfig
+
+from baicai_webui.services import (
+    COLUMNAR_LOADER_PRELUDE,
+    COLUMNAR_SUFFIXES,
+    DEFAULT_FANOUT_CONCURRENCY,
+    DEFAULT_FANOUT_TIMEOUT,
+    get_interpreter_pool,
+    get_job_manager,
+    run_isolated,
+)
+
+
+class ConcurrentRunActionNode(RunActionCoderNode):
+    """并发评估特征工程建议的运行节点
+
+    加载数据的代码仍在会话的解释器中运行（AI 助手会用到加载好的数据），各个建议的代码则分别在
+    从解释器池租用的独立解释器中运行：每个解释器先运行同一段加载数据的代码，得到相同的基线数据快照，
+    再运行自己的建议代码，建议之间互不影响。结果按建议原来的顺序写回，重试和调试逻辑不变。
+
+    同时运行的数量和每个建议的超时时间可以通过配置中的 ``action_concurrency`` 和 ``action_timeout``
+    调整。
+    """
+
+    def __init__(self, pool=None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.pool = pool
+        self.max_concurrency = DEFAULT_FANOUT_CONCURRENCY
+        self.timeout = DEFAULT_FANOUT_TIMEOUT
+        self.prelude = ""
+
+    async def __call__(self, state, config: RunnableConfig) -> Dict[str, Any]:
+        configurable = config.get("configurable", {})
+        self.max_concurrency = int(configurable.get("action_concurrency") or DEFAULT_FANOUT_CONCURRENCY)
+        self.timeout = float(configurable.get("action_timeout") or DEFAULT_FANOUT_TIMEOUT)
+        # 独立的解释器同样需要能读取列式数据文件
+        columnar = Path(str(configurable.get("path", ""))).suffix.lower() in COLUMNAR_SUFFIXES
+        self.prelude = COLUMNAR_LOADER_PRELUDE if columnar else ""
+        return await super().__call__(state, config)
+
+    async def _execute_actions(self):
+        """在独立的解释器中并发运行尚未成功的建议，按原顺序合并结果"""
+        self.successes = [] if self.iter == 1 else [any(self.successes)]
+        pending: List[Dict[str, Any]] = []
+        for action in self.actions:
+            if action.get("ignore") or action.get("success"):
+                continue
+            if not action["code"].strip():
+                self._log_and_update_code(action, "You generated nothing, please try again.", False)
+                continue
+            pending.append(action)
+        if not pending:
+            return
+
+        self.logger.info(
+            f"#### 并发评估 {len(pending)} 个特征工程建议（最多同时 {self.max_concurrency} 个，"
+            f"每个超时 {self.timeout:.0f} 秒）"
+        )
+        results = await run_isolated(
+            [action["code"].strip() for action in pending],
+            self.pool or get_interpreter_pool(),
+            setup_code=self.prelude + self.load_data_code["code"],
+            max_concurrency=self.max_concurrency,
+            timeout=self.timeout,
+            owner="actions",
+            scheduler=get_job_manager().scheduler,
+        )
+        for action, result in zip(pending, results, strict=True):
+            message = result["output"] or ("Success" if result["success"] else "Failed")
+            self._log_and_update_code(action, message, result["success"])
+
+
+class ConcurrentActionBuilder(ActionBuilder):
+    """特征工程构建器，各个建议的代码在独立的解释器中并发评估"""
+
+    def __init__(self, pool=None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.run_action_node = ConcurrentRunActionNode(pool=pool, code_interpreter=self.code_interpreter)
@@ -1,13 +1,14 @@
+import hashlib
 import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import streamlit as st
 import torch
-from baicai_base.utils.data import get_tmp_folder, load_data
+from baicai_base.utils.data import get_tmp_folder
 from baicai_dev.utils.data import TaskType, load_example_data
 from baicai_dev.utils.setups import (
     bears_func_config,
@@ -28,12 +29,34 @@ from baicai_dev.utils.setups import (
     titanic_config_data,
 )
 
+from baicai_webui.components.image_viewer import get_dataset_index
+from baicai_webui.services import (
+    CANDIDATE_FAMILIES,
+    DEFAULT_CANDIDATES,
+    DEFAULT_DEV_SAMPLE_ROWS,
+    DEFAULT_FANOUT_CONCURRENCY,
+    DEFAULT_FANOUT_TIMEOUT,
+    DEV_SAMPLE_THRESHOLD,
+    DTYPE_TRANSFORMS,
+    RunTimeouts,
+    SQLiteSource,
+    TrialBudget,
+    apply_dtype_transforms,
+    columnar_copy,
+    load_table,
+    register_columnar_loaders,
+    table_schema,
+)
+
 # 设置matplotlib中文显示，支持多平台
 plt.rcParams["font.sans-serif"] = [
     "SimHei", "Microsoft YaHei", "Arial Unicode MS", "STHeiti", "PingFang SC", "Heiti TC", "WenQuanYi Micro Hei", "sans-serif"
 ]
 plt.rcParams["axes.unicode_minus"] = False  # 正常显示负号
 
+# 让 load_data/preview_data 能读取 Parquet/Feather（数据库导出和列式上传）
+register_columnar_loaders()
+
 
 @st.cache_data
 def create_histogram(df_clean, col_name):
@@ -183,8 +206,84 @@ def process_data_for_visualization(df):
     return df_clean
 
 
-def display_data_info(df: pd.DataFrame) -> None:
-    """显示数据框的基本信息"""
+@st.cache_data(show_spinner=False)
+def list_sqlite_tables(db_path: str, mtime: float):
+    """列出数据库中的数据表及行数的缓存函数（mtime 变化时失效）"""
+    return SQLiteSource(db_path).list_tables()
+
+
+@st.cache_data(show_spinner=False)
+def sample_sqlite_source(db_path: str, mtime: float, table, query, n: int, method: str) -> pd.DataFrame:
+    """在数据库端采样的缓存函数（mtime 变化时失效）"""
+    return SQLiteSource(db_path).sample(table=table, query=query, n=n, method=method)
+
+
+def configure_sqlite_source(file_path: Path):
+    """SQLite 数据源配置：选择数据表或查询，预览并采样
+
+    Returns:
+        tuple: (采样数据, 数据源信息)，未完成配置时返回 (None, None)
+    """
+    source = SQLiteSource(file_path)
+    mtime = file_path.stat().st_mtime
+    tables = list_sqlite_tables(str(file_path), mtime)
+
+    custom_query_option = "✏️ 自定义SQL查询"
+    table_counts = dict(tables)
+    table_choice = st.selectbox(
+        "🗂️ 选择数据表",
+        [name for name, _ in tables] + [custom_query_option],
+        format_func=lambda x: x if x == custom_query_option else f"{x}（{table_counts[x]:,} 行）",
+    )
+
+    table, query = None, None
+    if table_choice == custom_query_option:
+        query = st.text_input("🔍 SQL查询", value=f"SELECT * FROM {tables[0][0]}" if tables else "")
+        if not query:
+            st.warning("⚠️ 请输入SQL查询")
+            return None, None
+        total_rows = source.count(query=query)
+    else:
+        table = table_choice
+        total_rows = table_counts[table]
+
+    with st.expander("数据预览", expanded=False):
+        st.dataframe(source.preview(table=table, query=query, limit=10))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        sample_size = st.number_input(
+            "📐 探索性分析采样行数",
+            min_value=100,
+            max_value=200000,
+            value=min(10000, max(total_rows, 100)),
+            step=1000,
+            help="数据在数据库端采样，完整数据只在开始训练时导出",
+        )
+    with col2:
+        sample_method = st.radio(
+            "采样方式",
+            ["random", "stride"],
+            format_func=lambda x: {"random": "随机采样", "stride": "等距采样"}[x],
+            horizontal=True,
+            disabled=table is None,
+            help="等距采样按 rowid 间隔抽取，速度更快，仅对数据表可用",
+        )
+
+    df = sample_sqlite_source(str(file_path), mtime, table, query, int(sample_size), sample_method)
+    if total_rows > len(df):
+        st.info(f"共 {total_rows:,} 行，已采样 {len(df):,} 行用于数据探索")
+
+    return df, {"db_path": str(file_path), "table": table, "query": query, "total_rows": total_rows}
+
+
+def display_data_info(df: pd.DataFrame, transforms: Optional[Dict[str, str]] = None) -> None:
+    """显示数据框的基本信息
+
+    Args:
+        df: 数据
+        transforms: 记录列类型转换的字典，给出时转换会写入其中，页面重新运行后仍然生效
+    """
     with st.expander("数据信息", expanded=False):
         # 数据类型转换功能 - 放在最开始
         st.markdown("#### 数据类型调整")
@@ -197,7 +296,7 @@ def display_data_info(df: pd.DataFrame) -> None:
         with col2:
             target_dtype = st.selectbox(
                 "目标数据类型",
-                ["object", "int64", "float64", "datetime64", "category"],
+                list(DTYPE_TRANSFORMS),
                 format_func=lambda x: {
                     "object": "文本 (object)",
                     "int64": "整数 (int64)",
@@ -211,22 +310,9 @@ def display_data_info(df: pd.DataFrame) -> None:
         if st.button("🔄 转换数据类型"):
             try:
                 original_dtype = df[convert_col].dtype
-
-                if target_dtype == "datetime64":
-                    # 尝试自动解析日期时间
-                    df[convert_col] = pd.to_datetime(df[convert_col], errors="coerce")
-                elif target_dtype == "int64":
-                    # 转换为整数
-                    df[convert_col] = pd.to_numeric(df[convert_col], errors="coerce").astype("Int64")
-                elif target_dtype == "float64":
-                    # 转换为浮点数
-                    df[convert_col] = pd.to_numeric(df[convert_col], errors="coerce")
-                elif target_dtype == "category":
-                    # 转换为分类
-                    df[convert_col] = df[convert_col].astype("category")
-                elif target_dtype == "object":
-                    # 转换为文本
-                    df[convert_col] = df[convert_col].astype("object")
+                apply_dtype_transforms(df, {convert_col: target_dtype})
+                if transforms is not None:
+                    transforms[convert_col] = target_dtype
 
                 new_dtype = df[convert_col].dtype
                 st.success(f"✅ 成功将列 '{convert_col}' 从 {original_dtype} 转换为 {new_dtype}")
@@ -627,6 +713,193 @@ def configure_metrics_ui(df, target_col=None, default_is_classification=None, co
     )
 
 
+def configure_baseline_mode_ui(config_data=None) -> Dict[str, Any]:
+    """选择基线模型的运行方式：单个随机森林基线，或并行运行多个候选模型族后选出最优
+
+    Returns:
+        dict: baseline_mode（"single" 或 "parallel"）和 baseline_candidates（候选模型族列表）
+    """
+    config_data = config_data or {}
+    modes = {"single": "单个基线（随机森林）", "parallel": "并行候选模型"}
+    mode = st.radio(
+        "🏁 基线模式",
+        options=list(modes.keys()),
+        format_func=lambda x: modes[x],
+        index=list(modes.keys()).index(config_data.get("baseline_mode", "single")),
+        horizontal=True,
+        help="并行候选模型会在各自独立的解释器中同时训练多个模型族，按验证集指标选出最优的作为基线，仅用于手动模式的基线步骤",
+    )
+    candidates = list(config_data.get("baseline_candidates", DEFAULT_CANDIDATES))
+    if mode == "parallel":
+        candidates = st.multiselect(
+            "🧪 候选模型",
+            options=list(CANDIDATE_FAMILIES.keys()),
+            default=candidates,
+            format_func=lambda x: CANDIDATE_FAMILIES[x]["label"],
+        )
+        if not candidates:
+            st.warning("⚠️ 请至少选择一个候选模型，未选择时使用全部候选")
+            candidates = list(DEFAULT_CANDIDATES)
+    return {"baseline_mode": mode, "baseline_candidates": candidates}
+
+
+def configure_action_evaluation_ui(config_data=None) -> Dict[str, Any]:
+    """设置手动模式中特征工程建议的并发评估：同时运行的解释器数量和每个建议的超时时间
+
+    Returns:
+        dict: action_concurrency 和 action_timeout（秒）
+    """
+    config_data = config_data or {}
+    with st.expander("⚡ 特征工程并发评估", expanded=False):
+        col1, col2 = st.columns(2)
+        concurrency = col1.number_input(
+            "同时评估的建议数",
+            min_value=1,
+            max_value=16,
+            value=int(config_data.get("action_concurrency", DEFAULT_FANOUT_CONCURRENCY)),
+            help="每个建议在独立的解释器中运行，数量越多占用的内存越多",
+        )
+        timeout = col2.number_input(
+            "每个建议的超时（秒）",
+            min_value=10,
+            max_value=7200,
+            value=int(config_data.get("action_timeout", DEFAULT_FANOUT_TIMEOUT)),
+            step=30,
+        )
+    return {"action_concurrency": int(concurrency), "action_timeout": float(timeout)}
+
+
+def configure_dev_sample_ui(config_data=None, total_rows=None) -> Dict[str, Any]:
+    """设置开发采样模式：智能体在分层采样数据上生成和调试代码，最终工作流再用完整数据重新训练
+
+    Args:
+        config_data: 已有配置
+        total_rows: 完整数据的行数，超过 DEV_SAMPLE_THRESHOLD 时默认开启
+
+    Returns:
+        dict: dev_sample 和 dev_sample_rows
+    """
+    config_data = config_data or {}
+    large = bool(total_rows and total_rows > DEV_SAMPLE_THRESHOLD)
+    enabled = st.checkbox(
+        "🧪 开发采样模式",
+        value=bool(config_data.get("dev_sample", large)),
+        help="代码生成和调试在按目标变量分层采样的 Parquet 数据上进行，只有最终工作流用完整数据重新训练，适合大数据集",
+    )
+    rows = int(config_data.get("dev_sample_rows", DEFAULT_DEV_SAMPLE_ROWS))
+    if enabled:
+        rows = st.number_input("采样行数", min_value=1000, max_value=1000000, value=rows, step=1000)
+        if total_rows and total_rows <= rows:
+            st.info(f"数据只有 {total_rows} 行，不超过采样行数，将使用全部数据")
+    return {"dev_sample": enabled, "dev_sample_rows": int(rows)}
+
+
+def configure_trial_budget_ui(config_data=None) -> Dict[str, Any]:
+    """设置手动模式中模型优化的超参数搜索预算：进程数、内存上限、试验数量、总时长和提前停止
+
+    Returns:
+        dict: trial_cpus、trial_memory_mb、trial_max_trials、trial_time_budget（秒）和 trial_patience
+    """
+    config_data = config_data or {}
+    default = TrialBudget()
+    with st.expander("🔬 模型优化试验预算", expanded=False):
+        col1, col2 = st.columns(2)
+        cpus = col1.number_input(
+            "并行进程数",
+            min_value=1,
+            max_value=max(1, os.cpu_count() or 1),
+            value=min(int(config_data.get("trial_cpus", default.cpus)), max(1, os.cpu_count() or 1)),
+            help="同时评估超参数组合的进程数，多人共用一台机器时请调小",
+        )
+        memory_mb = col2.number_input(
+            "内存上限（MB）",
+            min_value=256,
+            max_value=262144,
+            value=int(config_data.get("trial_memory_mb", default.memory_mb)),
+            step=256,
+            help="按数据大小估算每个进程的内存，进程数不会超过内存上限允许的数量",
+        )
+        col3, col4, col5 = st.columns(3)
+        max_trials = col3.number_input(
+            "最多试验数",
+            min_value=0,
+            max_value=10000,
+            value=int(config_data.get("trial_max_trials", default.max_trials)),
+            help="每次搜索最多评估的参数组合数，0 表示不限制",
+        )
+        time_budget = col4.number_input(
+            "总时长上限（秒）",
+            min_value=0,
+            max_value=86400,
+            value=int(config_data.get("trial_time_budget", default.time_budget)),
+            step=60,
+            help="超过后不再开始新的试验，0 表示不限制",
+        )
+        patience = col5.number_input(
+            "提前停止轮数",
+            min_value=0,
+            max_value=100,
+            value=int(config_data.get("trial_patience", default.patience)),
+            help="连续多少批试验得分没有提升时停止搜索，0 表示不提前停止",
+        )
+    return {
+        "trial_cpus": int(cpus),
+        "trial_memory_mb": int(memory_mb),
+        "trial_max_trials": int(max_trials),
+        "trial_time_budget": float(time_budget),
+        "trial_patience": int(patience),
+    }
+
+
+def configure_run_timeouts_ui(config_data=None) -> Dict[str, Any]:
+    """设置运行的墙钟时长上限：整个运行和解释器中单次代码执行，超过后中断解释器内核
+
+    Returns:
+        dict: run_timeout 和 node_timeout（秒），0 表示不限制
+    """
+    config_data = config_data or {}
+    default = RunTimeouts()
+    with st.expander("⏱️ 运行时长上限", expanded=False):
+        col1, col2 = st.columns(2)
+        run_timeout = col1.number_input(
+            "整个运行（秒）",
+            min_value=0,
+            max_value=7 * 86400,
+            value=int(config_data.get("run_timeout", default.run)),
+            step=300,
+            help="超过后中断运行，历史记录中标记为已取消，0 表示不限制",
+        )
+        node_timeout = col2.number_input(
+            "单次代码执行（秒）",
+            min_value=0,
+            max_value=86400,
+            value=int(config_data.get("node_timeout", default.node)),
+            step=60,
+            help="生成的代码单次执行超过该时长时中断，节点按执行失败处理，0 表示不限制",
+        )
+    return {"run_timeout": float(run_timeout), "node_timeout": float(node_timeout)}
+
+
+def display_image_dataset_summary(image_path: str) -> None:
+    """显示图片数据集概况（来自图片索引，不重复遍历目录）"""
+    if not os.path.isdir(image_path):
+        st.warning(f"路径不存在或不是文件夹: {image_path}")
+        return
+
+    index = get_dataset_index(image_path)
+    summary = index.summary()
+    class_counts = index.class_counts()
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("图片数量", summary["num_images"])
+    col2.metric("子文件夹数量", len(class_counts))
+    col3.metric("总大小", f"{summary['total_size'] / 1024 / 1024:.1f} MB")
+
+    if not class_counts.empty:
+        with st.expander("各文件夹图片数量"):
+            st.bar_chart(class_counts)
+
+
 def vision_uploader() -> Dict[str, Any]:
     """视觉基础设置组件"""
     st.subheader("基础设置")
@@ -643,6 +916,8 @@ def vision_uploader() -> Dict[str, Any]:
             valid_path = st.text_input("🔍 验证数据路径（可选）")
 
             if train_path:
+                display_image_dataset_summary(train_path)
+
                 # 基础配置
                 st.subheader("模型配置")
                 batch_size = st.number_input("批次大小", 1, 128, 4)
@@ -675,6 +950,8 @@ def vision_uploader() -> Dict[str, Any]:
             data_path = st.text_input("🔍 数据根目录路径", help="包含图片文件夹和CSV标注文件的根目录")
             
             if data_path:
+                display_image_dataset_summary(data_path)
+
                 # CSV文件配置
                 st.subheader("CSV标注文件配置")
                 col1, col2 = st.columns(2)
@@ -942,8 +1219,13 @@ def ml_uploader() -> Dict[str, Any]:
             save_path = get_tmp_folder() / "from_user" / "ml"
             save_path.mkdir(exist_ok=True, parents=True)
             file_path = save_path / file.name
-            with open(file_path, "wb") as f:
-                f.write(file.getbuffer())
+            # 每次重新运行页面都会执行到这里，文件未变化时不重复写入（大文件写入很慢且会使缓存失效）。
+            # 按上传的 file_id 判断：同名、同大小的不同文件也会重新写入
+            written = st.session_state.setdefault("ml_uploaded_files", {})
+            if not file_path.exists() or written.get(str(file_path)) != file.file_id:
+                with open(file_path, "wb") as f:
+                    f.write(file.getbuffer())
+                written[str(file_path)] = file.file_id
 
             # 根据文件类型设置额外参数
             file_extension = file_path.suffix.lower().strip(".")
@@ -981,14 +1263,20 @@ def ml_uploader() -> Dict[str, Any]:
             elif file_extension == "h5":
                 key = st.text_input("🔑 数据键", value="df")
                 extra_params["key"] = key
-            elif file_extension == "db":
-                query = st.text_input("🔍 SQL查询", value="SELECT * FROM table_name")
-                extra_params["query"] = query
 
+            # 列类型转换按文件记录在会话中，页面重新运行后仍然生效，并写入转换后的 Parquet
+            transforms = st.session_state.setdefault("dtype_transforms", {}).setdefault(file.name, {})
             try:
-                # 使用load_data加载数据
-                df = load_data(path=file_path, **extra_params)
-                display_data_info(df)
+                sqlite_source = None
+                if file_extension == "db":
+                    # 数据库只在服务端采样，不把整张表读入内存
+                    df, sqlite_source = configure_sqlite_source(file_path)
+                    if df is None:
+                        return {}
+                else:
+                    # 使用load_data加载数据，并重新应用用户之前做过的类型转换
+                    df = apply_dtype_transforms(load_table(file_path, **extra_params), transforms)
+                display_data_info(df, None if sqlite_source else transforms)
                 display_data_visualization(df)
 
                 # 让用户设置基本配置并配置任务类型和评价指标
@@ -1008,6 +1296,13 @@ def ml_uploader() -> Dict[str, Any]:
                     threshold,
                     requirements,
                 ) = configure_metrics_ui(df, None, None, {}, file.name.split(".")[0].replace(" ", "_"))
+                baseline_settings = configure_baseline_mode_ui()
+                action_settings = configure_action_evaluation_ui()
+                trial_settings = configure_trial_budget_ui()
+                timeout_settings = configure_run_timeouts_ui()
+                dev_sample_settings = configure_dev_sample_ui(
+                    total_rows=sqlite_source["total_rows"] if sqlite_source else len(df)
+                )
 
                 # 创建配置数据
                 config_data = {
@@ -1029,10 +1324,34 @@ def ml_uploader() -> Dict[str, Any]:
                     "need_time": need_time,
                     "threshold": threshold,
                     "requirements": requirements,
+                    **baseline_settings,
+                    **action_settings,
+                    **trial_settings,
+                    **timeout_settings,
+                    **dev_sample_settings,
                 }
 
-                # 使用create_ml_config创建标准配置
-                return create_ml_config(config_data)
+                if sqlite_source is None:
+                    # 上传文件（已应用类型转换）只转换一次为 Parquet，智能体生成的代码以内存映射方式读取，
+                    # 不再每次重新解析原始文件
+                    columnar_path = columnar_copy(df, file_path, save_path / "columnar", transforms)
+                    config_data.update(
+                        {"path": str(columnar_path), "source_path": str(file_path), "schema": table_schema(df)}
+                    )
+                    # 使用create_ml_config创建标准配置
+                    return create_ml_config(config_data)
+
+                # 数据库数据源：先用采样数据生成数据预览，完整数据在开始训练时再导出为 Parquet
+                source_name = sqlite_source["table"]
+                if not source_name:
+                    source_name = f"query_{hashlib.md5(sqlite_source['query'].encode()).hexdigest()[:8]}"
+                sample_path = save_path / f"{file_path.stem}_{source_name}_sample.parquet"
+                df.to_parquet(sample_path, index=False)
+                config = create_ml_config({**config_data, "path": str(sample_path)})
+                config["configurable"]["path"] = str(save_path / f"{file_path.stem}_{source_name}.parquet")
+                config["configurable"]["data_size"] = sqlite_source["total_rows"]
+                config["configurable"]["sqlite_source"] = sqlite_source
+                return config
 
             except Exception as e:
                 st.error(f"加载数据时出错: {str(e)}")
@@ -1122,6 +1441,11 @@ def ml_uploader() -> Dict[str, Any]:
             ) = configure_metrics_ui(
                 df, None, config_data.get("classification"), config_data, config_data.get("name")
             )
+            baseline_settings = configure_baseline_mode_ui(config_data)
+            action_settings = configure_action_evaluation_ui(config_data)
+            trial_settings = configure_trial_budget_ui(config_data)
+            timeout_settings = configure_run_timeouts_ui(config_data)
+            dev_sample_settings = configure_dev_sample_ui(config_data, total_rows=len(df))
 
             # 创建配置数据
             config_data = {
@@ -1143,6 +1467,11 @@ def ml_uploader() -> Dict[str, Any]:
                 "need_time": need_time,
                 "threshold": threshold,
                 "requirements": requirements,
+                **baseline_settings,
+                **action_settings,
+                **trial_settings,
+                **timeout_settings,
+                **dev_sample_settings,
             }
 
             # 使用create_ml_config创建标准配置
@@ -0,0 +1,101 @@
+from typing import Any, Dict, List
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from baicai_webui.services import (
+    RunEvents,
+    epoch_metrics_frame,
+    llm_usage_frame,
+    node_timeline_frame,
+    resource_frame,
+)
+
+PROCESS_LABELS = {"webui": "界面进程", "kernel": "解释器内核"}
+
+
+def render_run_events(events: RunEvents) -> None:
+    """显示训练指标曲线、节点时间线、代码运行结果和资源使用"""
+    records = events.events()
+
+    metrics = epoch_metrics_frame(records)
+    if not metrics.empty:
+        curves = metrics.drop(columns=["seconds"], errors="ignore")
+        st.markdown("**训练指标**")
+        st.line_chart(curves)
+        if "seconds" in metrics.columns and metrics["seconds"].notna().any():
+            col1, col2 = st.columns(2)
+            col1.metric("已完成 epoch", len(metrics))
+            col2.metric("平均每个 epoch 用时", f"{metrics['seconds'].mean():.1f} 秒")
+
+    timeline = node_timeline_frame(records)
+    if not timeline.empty:
+        st.markdown("**节点时间线**")
+        chart = (
+            alt.Chart(timeline)
+            .mark_bar()
+            .encode(
+                x=alt.X("start:Q", title="开始（秒）"),
+                x2="end:Q",
+                y=alt.Y("node:N", title="节点", sort=None),
+                color=alt.Color("status:N", title="状态"),
+                tooltip=["node", "step", "duration", "status"],
+            )
+        )
+        st.altair_chart(chart, use_container_width=True)
+
+    results = [e for e in records if e["event"] == "code_result"]
+    if results:
+        succeeded = sum(e["success"] for e in results)
+        st.caption(f"代码运行：成功 {succeeded} 次，失败 {len(results) - succeeded} 次")
+
+    render_resource_usage(records)
+
+
+def render_resource_usage(records: List[Dict[str, Any]]) -> None:
+    """显示资源时间线（各进程的内存和 CPU）、磁盘读写和按节点汇总的 LLM 调用"""
+    resources = resource_frame(records)
+    if not resources.empty:
+        resources["process"] = resources["process"].map(PROCESS_LABELS).fillna(resources["process"])
+        st.markdown("**资源时间线**")
+        base = alt.Chart(resources).encode(
+            x=alt.X("elapsed:Q", title="运行时间（秒）"), color=alt.Color("process:N", title="进程")
+        )
+        memory = base.mark_line().encode(
+            y=alt.Y("rss_mb:Q", title="内存（MB）"), tooltip=["process", "elapsed", "rss_mb", "peak_mb"]
+        )
+        cpu = base.mark_line(strokeDash=[4, 2]).encode(
+            y=alt.Y("cpu:Q", title="CPU（%）"), tooltip=["process", "elapsed", "cpu"]
+        )
+        st.altair_chart(
+            alt.hconcat(memory.properties(height=180), cpu.properties(height=180)), use_container_width=True
+        )
+        latest = resources.groupby("process", sort=False).last()
+        cols = st.columns(len(latest))
+        for i, (process, row) in enumerate(latest.iterrows()):
+            io = "" if pd.isna(row["read_mb"]) else f"，读 {row['read_mb']:.0f} MB / 写 {row['write_mb']:.0f} MB"
+            cols[i].metric(
+                f"{process}内存峰值",
+                f"{row['peak_mb']:.0f} MB",
+                help=f"CPU 平均 {resources.loc[resources['process'] == process, 'cpu'].mean():.0f}%{io}",
+            )
+
+    usage = llm_usage_frame(records)
+    if not usage.empty:
+        st.markdown("**LLM 调用（按节点）**")
+        st.dataframe(
+            usage.rename(
+                columns={
+                    "node": "节点",
+                    "calls": "调用次数",
+                    "errors": "出错",
+                    "prompt_tokens": "输入 token",
+                    "completion_tokens": "输出 token",
+                    "seconds": "总耗时（秒）",
+                    "mean_seconds": "平均耗时（秒）",
+                }
+            ).round(2),
+            hide_index=True,
+            use_container_width=True,
+        )
@@ -1,22 +1,75 @@
-from typing import Any, Dict
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import streamlit as st
-from baicai_dev.agents.graphs.action_builder import ActionBuilder
 from baicai_dev.agents.graphs.baseline_builder import BaselineBuilder
 from baicai_dev.agents.graphs.dl_builder.dl_builder import DLBuilder
 from baicai_dev.agents.graphs.ml_graph import MLGraph
-from baicai_dev.agents.graphs.optimization_builder import OptimizationBuilder
 from baicai_dev.agents.graphs.workflow_builder import WorkflowBuilder
 from baicai_dev.utils.data import TaskType
 from baicai_dev.utils.setups import create_dl_config
 
+from baicai_webui.components.model.concurrent_actions import ConcurrentActionBuilder
+from baicai_webui.components.model.parallel_baseline import ParallelBaselineBuilder
+from baicai_webui.components.model.trial_optimization import TrialOptimizationBuilder
+from baicai_webui.services import GraphEventCallback, RunEvents, SQLiteCheckpointSaver, get_checkpointer
+
 
 class GraphExecutor:
-    """Handles execution of ML and DL graphs"""
+    """Handles execution of ML and DL graphs
+
+    Builders are compiled once and cached per builder class, interpreter, checkpointer and step
+    inputs; the per-run config is only passed when the app is invoked, so repeated runs reuse the
+    compiled topology instead of rebuilding nodes and recompiling the LangGraph app.
+    """
 
-    def __init__(self, llm=None):
+    def __init__(self, llm=None, cache_size: int = 8):
         """Initialize GraphExecutor with optional LLM instance"""
         self.llm = llm
+        self.cache_size = cache_size
+        self._graphs: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._graphs_lock = threading.Lock()
+
+    def _cached_graph(self, key: Tuple, factory: Callable[[], Any]):
+        """Return the cached builder for ``key``, building and compiling it on a miss"""
+        key = (id(self.llm), *key)
+        with self._graphs_lock:
+            graph = self._graphs.get(key)
+            if graph is not None:
+                self._graphs.move_to_end(key)
+                return graph
+        graph = factory()
+        _ = graph.app  # 在缓存前完成编译
+        with self._graphs_lock:
+            self._graphs[key] = graph
+            while len(self._graphs) > self.cache_size:
+                self._graphs.popitem(last=False)
+        return graph
+
+    @staticmethod
+    def _inputs_digest(**inputs) -> str:
+        payload = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.md5(payload.encode()).hexdigest()
+
+    def release_run(self, graph, config: Optional[Dict[str, Any]]) -> None:
+        """Drop a finished run's checkpoints from a cached graph's memory
+
+        In-memory checkpoints are deleted so a cached graph does not grow with every run;
+        the SQLite checkpointer only releases its in-memory copy and keeps the rows for resuming.
+        """
+        if graph is None or not config:
+            return
+        thread_id = config.get("configurable", {}).get("thread_id")
+        memory = getattr(graph, "memory", None)
+        if thread_id is None or memory is None:
+            return
+        if isinstance(memory, SQLiteCheckpointSaver):
+            memory.release(thread_id)
+        elif hasattr(memory, "delete_thread"):
+            memory.delete_thread(thread_id)
 
     def execute_ml_graph(
         self,
@@ -28,7 +81,15 @@ class GraphExecutor:
         workflow_codes=None,
         actions=None,
     ):
-        """Execute ML graph with given configuration"""
+        """Execute ML graph with given configuration
+
+        Manual-mode builders share the SQLite-backed checkpointer, so a step keyed by the same
+        thread id resumes from its last completed node instead of starting over. With
+        ``baseline_mode == "parallel"`` the manual baseline step runs several candidate model
+        families side by side and keeps the best one. The manual action step evaluates its
+        feature-engineering actions concurrently in isolated interpreters, and the manual optimization
+        step evaluates hyperparameter trials in a process pool within the configured trial budget.
+        """
         # 验证必要参数
         configurable = config.get("configurable", config)  # 如果没有 configurable 字段，使用原始配置
         required_fields = ["path", "target"]
@@ -38,45 +99,66 @@ class GraphExecutor:
 
         try:
             if auto:
-                graph = MLGraph(
-                    config=config,
-                    start_builder=start_builder,
-                    code_interpreter=code_interpreter,
-                    need_helper=True,
-                    llm=self.llm,
-                )
-                return graph
-            else:
-                if start_builder == "baseline_builder":
-                    graph = BaselineBuilder(
-                        config=config, need_helper=True, code_interpreter=code_interpreter, llm=self.llm
-                    )
-                elif start_builder == "action_builder":
-                    graph = ActionBuilder(
+                key = ("MLGraph", start_builder, id(code_interpreter))
+                return self._cached_graph(
+                    key,
+                    lambda: MLGraph(
                         config=config,
-                        need_helper=True,
+                        start_builder=start_builder,
                         code_interpreter=code_interpreter,
-                        baseline_codes=baseline_codes,
-                        llm=self.llm,
-                    )
-                elif start_builder == "workflow_builder":
-                    graph = WorkflowBuilder(
-                        config=config,
                         need_helper=True,
-                        code_interpreter=code_interpreter,
-                        baseline_codes=baseline_codes,
-                        actions=actions,
                         llm=self.llm,
-                    )
-                elif start_builder == "optimization_builder":
-                    graph = OptimizationBuilder(
-                        config=config,
-                        need_helper=True,
-                        code_interpreter=code_interpreter,
-                        workflow_codes=workflow_codes,
-                        llm=self.llm,
-                    )
-                return graph
+                    ),
+                )
+
+            memory = get_checkpointer()
+            if start_builder == "baseline_builder" and configurable.get("baseline_mode") == "parallel":
+                start_builder = "parallel_baseline_builder"
+            builders = {
+                "baseline_builder": lambda: BaselineBuilder(
+                    config=config,
+                    need_helper=True,
+                    code_interpreter=code_interpreter,
+                    llm=self.llm,
+                    memory=memory,
+                ),
+                "parallel_baseline_builder": lambda: ParallelBaselineBuilder(
+                    config=config,
+                    need_helper=True,
+                    code_interpreter=code_interpreter,
+                    llm=self.llm,
+                    memory=memory,
+                ),
+                "action_builder": lambda: ConcurrentActionBuilder(
+                    config=config,
+                    need_helper=True,
+                    code_interpreter=code_interpreter,
+                    baseline_codes=baseline_codes,
+                    llm=self.llm,
+                    memory=memory,
+                ),
+                "workflow_builder": lambda: WorkflowBuilder(
+                    config=config,
+                    need_helper=True,
+                    code_interpreter=code_interpreter,
+                    baseline_codes=baseline_codes,
+                    actions=actions,
+                    llm=self.llm,
+                    memory=memory,
+                ),
+                "optimization_builder": lambda: TrialOptimizationBuilder(
+                    config=config,
+                    need_helper=True,
+                    code_interpreter=code_interpreter,
+                    workflow_codes=workflow_codes,
+                    llm=self.llm,
+                    memory=memory,
+                ),
+            }
+            # 步骤输入在构建时写入节点，因此也是缓存键的一部分
+            digest = self._inputs_digest(baseline_codes=baseline_codes, actions=actions, workflow_codes=workflow_codes)
+            key = (start_builder, id(code_interpreter), id(memory), digest)
+            return self._cached_graph(key, builders[start_builder])
         except Exception as e:
             raise ValueError(f"配置参数错误: {str(e)}")
 
@@ -86,12 +168,20 @@ class GraphExecutor:
             # 使用create_dl_config创建标准配置
             dl_config = create_dl_config(config)
 
-            # 创建DLBuilder并返回其app
-            builder = DLBuilder(config=dl_config, need_helper=True, code_interpreter=code_interpreter, llm=self.llm)
-            return builder
+            # 复用已编译的DLBuilder，本次运行的配置在调用时传入
+            return self._cached_graph(
+                ("DLBuilder", id(code_interpreter)),
+                lambda: DLBuilder(config=dl_config, need_helper=True, code_interpreter=code_interpreter, llm=self.llm),
+            )
         except Exception as e:
             raise ValueError(f"配置参数错误: {str(e)}")
 
+    def with_events(self, config: Dict[str, Any], events: RunEvents) -> Dict[str, Any]:
+        """Return a copy of the run config whose callbacks record node events to ``events``"""
+        callbacks = list(config.get("callbacks") or [])
+        callbacks.append(GraphEventCallback(events))
+        return {**config, "callbacks": callbacks}
+
     def get_graph_for_task(self, task_type: str):
         """Get appropriate graph executor for task type"""
         task_map = {
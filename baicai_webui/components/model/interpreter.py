@@ -0,0 +1,42 @@
+import streamlit as st
+
+from baicai_webui.components.model.training import get_client_id
+from baicai_webui.services import get_interpreter_pool
+
+
+def ensure_code_interpreter():
+    """当前会话的代码解释器，首次使用时从进程级预热池中租用
+
+    会话长时间没有访问时池会回收并关闭解释器，此时重新租用一个，并提示之前内核中的变量已清空。
+    """
+    pool = get_interpreter_pool()
+    interpreter = st.session_state.get("code_interpreter")
+    if interpreter is not None and not pool.is_leased(interpreter):
+        st.warning("代码解释器因长时间没有使用已被回收，已重新分配，之前运行中生成的变量已清空")
+        interpreter = None
+    if interpreter is None:
+        st.session_state.code_interpreter = pool.lease(owner=get_client_id())
+    else:
+        pool.touch(interpreter)
+    return st.session_state.code_interpreter
+
+
+def release_code_interpreter() -> None:
+    """把会话的解释器归还预热池，重置后给其他会话使用；下次使用时重新租用"""
+    interpreter = st.session_state.pop("code_interpreter", None)
+    if interpreter is not None:
+        get_interpreter_pool().release(interpreter)
+
+
+def render_interpreter_pool_stats() -> None:
+    """在侧边栏显示解释器池的大小、空闲和租用情况"""
+    stats = get_interpreter_pool().stats()
+    with st.sidebar.expander("🧮 代码解释器池", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("空闲", stats["idle"], help=f"目标 {stats['size']} 个，正在启动 {stats['starting']} 个")
+        col2.metric("租用中", stats["leased"])
+        col3.metric("预热命中", f"{stats['hits']}/{stats['hits'] + stats['misses']}")
+        st.caption(
+            f"已回收重用 {stats['recycled']} 个，已关闭 {stats['retired']} 个，超时回收 {stats['expired']} 个；"
+            f"最长租用 {stats['oldest_lease_seconds'] / 60:.0f} 分钟"
+        )
@@ -0,0 +1,66 @@
+import streamlit as st
+
+from baicai_webui.services import RunLog
+
+# 页面上保留的日志行数，超过后只显示最近的部分，更早的日志按需加载
+LOG_WINDOW_LINES = 2000
+LOG_CONTAINER_HEIGHT = 800
+
+
+class LogView:
+    """追加式日志视图
+
+    每条日志记录渲染为滚动容器中的一个元素，更新时只追加新增的记录，而不是把累积的
+    全部日志重新发送到浏览器。页面上最多保留 ``window_lines`` 行，追加超过一倍窗口后重新
+    渲染最近的窗口；更早的日志通过"加载更早的日志"按钮按页加载。
+    """
+
+    def __init__(self, run_log: RunLog, placeholder, window_lines: int = LOG_WINDOW_LINES):
+        self.run_log = run_log
+        self.placeholder = placeholder
+        self.window_lines = window_lines
+        self._container = None
+        self._cursor = 0
+        self._live_lines = 0
+
+    @property
+    def _history_key(self) -> str:
+        return f"log_history_{self.run_log.run_id}"
+
+    def _load_older(self) -> None:
+        st.session_state[self._history_key] = st.session_state.get(self._history_key, 0) + self.window_lines
+
+    def render(self) -> None:
+        """渲染最近的日志窗口（以及已加载的更早日志）"""
+        end = self.run_log.entry_count
+        extra = st.session_state.get(self._history_key, 0)
+        start = self.run_log.window_start(self.window_lines + extra, end)
+
+        self._container = self.placeholder.container(height=LOG_CONTAINER_HEIGHT)
+        if start > 0:
+            self._container.caption(f"已折叠更早的 {start} 条日志")
+            self._container.button(
+                "加载更早的日志", key=f"{self._history_key}_{start}_{end}", on_click=self._load_older
+            )
+        entries = self.run_log.entries(start, end)
+        for entry in entries:
+            self._container.markdown(entry)
+        self._cursor = end
+        self._live_lines = sum(entry.count("\n") for entry in entries)
+
+    def update(self) -> bool:
+        """追加新增的日志，返回是否有新内容"""
+        if self._container is None:
+            self.render()
+            return True
+        entries = self.run_log.entries(self._cursor)
+        if not entries:
+            return False
+        self._cursor += len(entries)
+        self._live_lines += sum(entry.count("\n") for entry in entries)
+        if self._live_lines > 2 * self.window_lines:
+            self.render()
+        else:
+            for entry in entries:
+                self._container.markdown(entry)
+        return True
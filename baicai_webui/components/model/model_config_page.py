@@ -2,6 +2,7 @@ import streamlit as st
 from baicai_base.configs import ConfigManager, LLMConfig
 from baicai_base.services.llms import LLM
 from baicai_webui.components.model.model_config_form import render_model_config_form
+from baicai_webui.services import instrument_llm
 import os
 
 
@@ -95,5 +96,5 @@ def get_page_llm(
         # Save the default configuration as global
         config_manager.save_config("global", config)
 
-    # Create and return LLM instance with just the config_id
-    return LLM(config_id=config_id or "global").llm
+    # Create and return LLM instance with just the config_id, tagged for call accounting
+    return instrument_llm(LLM(config_id=config_id or "global").llm, config_id or "global")
@@ -0,0 +1,128 @@
+from pathlib import Path
+from typing import Any, Dict, List
+
+from baicai_base.agents.graphs.nodes import BaseNode
+from baicai_base.utils.data import extract_code
+from baicai_dev.agents.graphs.baseline_builder import BaselineBuilder
+from baicai_dev.agents.graphs.baseline_builder.state import BaselineState
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END, START, StateGraph
+
+from baicai_webui.services import (
+    COLUMNAR_LOADER_PRELUDE,
+    COLUMNAR_SUFFIXES,
+    DEFAULT_CANDIDATES,
+    candidate_code,
+    get_interpreter_pool,
+    get_job_manager,
+    leaderboard_markdown,
+    promote_winner,
+    rank_candidates,
+    run_candidates,
+)
+
+
+class ParallelBaselineState(BaselineState):
+    """在基线状态上增加候选模型排行榜"""
+
+    baseline_leaderboard: List[Dict[str, Any]]
+
+
+class CandidatesNode(BaseNode):
+    """并行运行多个候选模型族，选出验证集指标最好的作为基线"""
+
+    def __init__(self, coder_node, pool=None, logger=None) -> None:
+        super().__init__(logger=logger, name="Baseline Candidates", graph_name="Baseline")
+        self.coder_node = coder_node
+        self.pool = pool
+
+    async def __call__(self, state: Dict, config: RunnableConfig) -> Dict:
+        configurable = config["configurable"]
+        classification = configurable.get("classification", True)
+        families = list(configurable.get("baseline_candidates") or DEFAULT_CANDIDATES)
+
+        # 候选代码由基线模板生成，只替换模型，保证各候选的数据处理和评估方式一致
+        params = self.coder_node._get_invoke_params(state, config)
+        baseline_code = extract_code((await self.coder_node.runnable.ainvoke(params)).content)
+        try:
+            codes = {family: candidate_code(baseline_code, family, classification) for family in families}
+        except ValueError as e:
+            self.logger.warning(f"#### <font color='red'>无法生成候选模型代码，改为运行单个基线：{e}</font>")
+            return {"baseline_success": False, "baseline_leaderboard": []}
+
+        self.logger.info(f"## 并行运行候选模型：{', '.join(families)}")
+        columnar = Path(configurable.get("path", "")).suffix.lower() in COLUMNAR_SUFFIXES
+        prelude = COLUMNAR_LOADER_PRELUDE if columnar else ""
+        results = await run_candidates(
+            codes, self.pool or get_interpreter_pool(), prelude=prelude, scheduler=get_job_manager().scheduler
+        )
+        leaderboard = rank_candidates(results, classification)
+        self.logger.info(f"### 候选模型排行榜\n\n{leaderboard_markdown(leaderboard)}\n")
+
+        winner = leaderboard[0] if leaderboard and leaderboard[0]["success"] else None
+        if winner is None:
+            self.logger.warning("#### <font color='red'>所有候选模型都运行失败，改为运行单个基线</font>")
+            return {"baseline_success": False, "baseline_leaderboard": leaderboard}
+
+        output = results[winner["family"]]["output"]
+        promoted = promote_winner(output)
+        self.logger.info(
+            f"#### <font color='green'>最优候选：{winner['label']}，{winner['metric']} = {winner['score']:.4f}</font>"
+        )
+        summary = "\n".join(
+            f"Candidate {row['family']}: validation {row['metric']} = {row['score']}" for row in leaderboard
+        )
+        saved = "\n".join(f"The {kind} is promoted to {path}" for kind, path in promoted.items())
+        return {
+            "baseline_codes": [
+                {
+                    "code": codes[winner["family"]],
+                    "result": f"{output}\n{summary}\n{saved}".strip(),
+                    "success": True,
+                    "error": "",
+                }
+            ],
+            "baseline_success": True,
+            "baseline_leaderboard": leaderboard,
+        }
+
+
+class ParallelBaselineBuilder(BaselineBuilder):
+    """并行候选模型的基线构建器
+
+    先把线性、树和提升等候选模型族分别放到独立的解释器中同时运行，选出最优候选作为基线，
+    其保存的模型和数据会复制为 baseline 前缀，后续步骤无需改动。所有候选都失败时，
+    退回到原来的单个基线流程（生成、运行、调试）。
+    """
+
+    def __init__(self, pool=None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.state_class = ParallelBaselineState
+        self.graph = StateGraph(ParallelBaselineState)
+        self.candidates_node = CandidatesNode(self.coder_node, pool=pool, logger=self.logger)
+
+    def route_candidates(self, state):
+        return "helper" if state.get("baseline_success") else "coder"
+
+    def build(self):
+        """候选节点成功时直接进入问答节点，否则进入单个基线的生成、运行、调试循环"""
+        candidates = "baseline_candidates"
+        coder = "baseline_coder"
+        runner = "run_baseline"
+        debugger = "baseline_debugger"
+        helper = "baseline_helper"
+
+        self.graph.add_node(candidates, self.candidates_node)
+        self.graph.add_node(coder, self.coder_node)
+        self.graph.add_node(runner, self.run_node)
+        self.graph.add_node(debugger, self.debugger_node)
+        self.graph.add_node(helper, self.helper_node)
+
+        self.graph.add_edge(START, candidates)
+        self.graph.add_conditional_edges(candidates, self.route_candidates, {"helper": helper, "coder": coder})
+        self.graph.add_conditional_edges(coder, self.route_coder, {runner: runner, "helper": helper})
+        self.graph.add_conditional_edges(runner, self.route_run, {debugger: debugger, "helper": helper})
+        self.graph.add_conditional_edges(debugger, self.route_debugger, {runner: runner, "helper": helper})
+        self.graph.add_edge(helper, END)
+
+        return self.graph.compile(checkpointer=self.memory)
@@ -1,3 +1,4 @@
+import pandas as pd
 import streamlit as st
 import streamlit_mermaid as stmd
 
@@ -78,6 +79,100 @@ def display_action_items(actions):
                 st.text(action.get("result", ""))
 
 
+def display_leaderboard(leaderboard):
+    """显示并行候选模型的排行榜"""
+    st.subheader("🏆 候选模型排行榜")
+    metric = leaderboard[0]["metric"]
+    df = pd.DataFrame(leaderboard)
+    df["score"] = pd.to_numeric(df["score"]).round(4)
+    df["train_score"] = pd.to_numeric(df["train_score"]).round(4)
+    df["success"] = df["success"].map({True: "✅", False: "❌"})
+    df = df[["rank", "label", "score", "train_score", "seconds", "success", "error"]].rename(
+        columns={
+            "rank": "排名",
+            "label": "模型",
+            "score": f"验证集 {metric}",
+            "train_score": f"训练集 {metric}",
+            "seconds": "耗时（秒）",
+            "success": "是否成功",
+            "error": "错误",
+        }
+    )
+    st.dataframe(df, hide_index=True, use_container_width=True)
+    st.caption(f"各候选在独立的解释器中同时运行，按验证集 {metric} 选出最优模型作为基线")
+
+
+def display_full_data_run(run):
+    """显示开发采样模式下采样数据上的开发耗时和完整数据重新训练的耗时"""
+    st.subheader("📦 完整数据重新训练")
+    col1, col2 = st.columns(2)
+    rows = f"（{run['sample_rows']} 行采样）" if run.get("sample_rows") else ""
+    col1.metric(f"采样数据开发耗时{rows}", f"{run.get('dev_seconds', 0):.1f} 秒")
+    col2.metric("完整数据训练耗时", f"{run.get('full_seconds', 0):.1f} 秒")
+    if run.get("success"):
+        st.success(f"最终工作流已在完整数据上重新训练：{run.get('full_path', '')}")
+    else:
+        st.error("最终工作流在完整数据上运行失败，保存的模型来自采样数据")
+    if run.get("result"):
+        with st.expander("完整数据运行结果"):
+            st.text(run["result"])
+
+
+def display_trials(records):
+    """显示模型优化阶段超参数搜索的全部试验及其得分"""
+    st.subheader("🔬 超参数搜索试验")
+    reasons = {
+        "completed": "全部评估",
+        "max_trials": "达到试验上限",
+        "time_budget": "达到时长上限",
+        "early_stopped": "提前停止",
+    }
+    searches = pd.DataFrame(records.get("searches", []))
+    if not searches.empty:
+        searches["stop_reason"] = searches["stop_reason"].map(lambda x: reasons.get(x, x))
+        searches["best_score"] = pd.to_numeric(searches["best_score"]).round(4)
+        st.dataframe(
+            searches[
+                ["search", "estimator", "evaluated", "candidates", "workers", "best_score", "stop_reason", "seconds"]
+            ].rename(
+                columns={
+                    "search": "搜索",
+                    "estimator": "模型",
+                    "evaluated": "已评估",
+                    "candidates": "候选组合",
+                    "workers": "进程数",
+                    "best_score": "最优得分",
+                    "stop_reason": "结束原因",
+                    "seconds": "耗时（秒）",
+                }
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+    trials = pd.DataFrame(records.get("trials", []))
+    if trials.empty:
+        return
+    trials["params"] = trials["params"].map(lambda x: ", ".join(f"{k}={v}" for k, v in x.items()))
+    trials["score"] = pd.to_numeric(trials["score"]).round(4)
+    for estimator, group in trials.groupby("estimator", sort=False):
+        with st.expander(f"{estimator}：{len(group)} 个试验"):
+            st.line_chart(group["score"].reset_index(drop=True))
+            st.dataframe(
+                group[["trial", "params", "score", "fit_time", "elapsed"]].rename(
+                    columns={
+                        "trial": "试验",
+                        "params": "参数",
+                        "score": "交叉验证得分",
+                        "fit_time": "平均训练耗时（秒）",
+                        "elapsed": "开始后（秒）",
+                    }
+                ),
+                hide_index=True,
+                use_container_width=True,
+            )
+
+
 def display_results(state, graph=None):
     """显示机器学习流程的结果
 
@@ -160,8 +255,14 @@ def show_tab(state, graph):
 
     if graph == "baseline" or graph == "dl":
         stmd.st_mermaid(BASELINE_STRUCTURE, key=f"{graph}_structure", show_controls=False)
+        if state.get("baseline_leaderboard"):
+            display_leaderboard(state["baseline_leaderboard"])
     elif graph == "workflow" or graph == "optimization":
         stmd.st_mermaid(WORKFLOW_STRUCTURE, key=f"{graph}_structure", show_controls=False)
+        if graph == "workflow" and state.get("full_data_run"):
+            display_full_data_run(state["full_data_run"])
+        if graph == "optimization" and state.get("optimization_trials"):
+            display_trials(state["optimization_trials"])
 
     if codes:
         total_codes = len(codes)
@@ -0,0 +1,46 @@
+import time
+from typing import Callable
+
+import pandas as pd
+import streamlit as st
+
+from baicai_webui.components.model.training import get_client_id
+from baicai_webui.services import get_run_store
+
+STATUS_LABELS = {"succeeded": "✅ 成功", "failed": "❌ 失败", "cancelled": "⏹ 已取消"}
+
+
+def render_run_history(task_type: str, on_load: Callable[[str], None], key: str = "run_history") -> None:
+    """显示历史运行列表，选择成功的运行后可以直接加载结果
+
+    Args:
+        task_type: 任务类型，只列出该类型的运行
+        on_load: 点击加载按钮时的回调，参数为运行 id
+        key: 组件 key 前缀
+    """
+    with st.expander("📜 历史运行", expanded=False):
+        show_all = st.checkbox("显示所有用户的运行", key=f"{key}_all")
+        records = get_run_store().list(task_type=task_type, owner=None if show_all else get_client_id())
+        if not records:
+            st.info("暂无历史运行")
+            return
+
+        table = pd.DataFrame(
+            [
+                {
+                    "时间": time.strftime("%Y-%m-%d %H:%M", time.localtime(record.created_at)),
+                    "数据集": record.name,
+                    "状态": STATUS_LABELS.get(record.status, record.status),
+                    "用时（秒）": round(record.duration or 0),
+                    "结果": ", ".join(f"{k}={v}" for k, v in record.summary.items()),
+                }
+                for record in records
+            ]
+        )
+        st.dataframe(table, hide_index=True, use_container_width=True)
+
+        loadable = {record.id: record.label for record in records if record.status == "succeeded"}
+        if not loadable:
+            return
+        run_id = st.selectbox("选择要加载的运行", list(loadable), format_func=loadable.get, key=f"{key}_select")
+        st.button("加载该运行", key=f"{key}_load", on_click=on_load, args=(run_id,))
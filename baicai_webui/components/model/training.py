@@ -1,32 +1,57 @@
 import asyncio
-import glob
-import os
+import gc
+import hashlib
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple
 
 import streamlit as st
-from baicai_base.utils.data import get_tmp_folder
 from baicai_dev.utils.data import TaskType
 
 from baicai_webui.components.model import create_graph_executor
+from baicai_webui.components.model.event_charts import render_resource_usage, render_run_events
+from baicai_webui.components.model.log_view import LogView
+from baicai_webui.services import (
+    CHECKPOINT_TTL,
+    COLUMNAR_LOADER_PRELUDE,
+    COLUMNAR_SUFFIXES,
+    AdmissionError,
+    Job,
+    JobStatus,
+    ResourceSampler,
+    RunEvents,
+    RunLog,
+    RunRecord,
+    RunTimeouts,
+    cell_timeout,
+    collect_pickles,
+    ensure_parquet_snapshot,
+    ensure_sqlite_extract,
+    full_data_code,
+    full_data_path,
+    full_data_workflow_code,
+    get_checkpointer,
+    get_interpreter_pool,
+    get_job_manager,
+    get_run_store,
+    job_class_for,
+    llm_scope,
+    load_run_events,
+    run_with_deadline,
+    saved_data_path,
+    usage_summary,
+    use_dev_sample,
+)
+
+# 后台任务进度中训练指标和节点时间线的重绘间隔（秒）
+JOB_CHART_REFRESH = 5.0
 
 
 class TrainingMonitor:
     """训练监控组件"""
 
-    # 定义滚动容器样式为类属性
-    SCROLL_CONTAINER_TEMPLATE = """
-        <div style="height: 800px;
-                    overflow-y: scroll;
-                    padding: 10px;
-                    border: 1px solid #ccc;
-                    border-radius: 5px;
-                    background-color: #f5f5f5;
-                    resize: vertical;
-                    min-height: 200px;
-                    max-height: 1200px;">
-            {content}
-        </div>
-    """
-
     def __init__(self, llm=None):
         self.graph_executor = create_graph_executor(llm=llm)
         self.result = None
@@ -34,7 +59,13 @@ class TrainingMonitor:
         self.app = None
         self._training_lock = asyncio.Lock()  # 添加异步锁
         self._is_training = False  # 添加训练状态标志
-        self._current_log_file = None  # 添加当前日志文件路径
+        self.run_log: Optional[RunLog] = None  # 最近一次运行的日志
+        self.run_events: Optional[RunEvents] = None  # 最近一次运行的结构化事件（含资源采样和 LLM 调用）
+        self.run_config: Optional[dict] = None  # 最近一次运行使用的图配置（手动模式为带检查点 thread_id 的副本）
+        self.full_data_run: Optional[dict] = None  # 开发采样模式下最终工作流在完整数据上的重新训练结果
+        self.loaded_events: List[dict] = []  # 加载的历史运行保存的事件
+        self._queued_slot: Optional[str] = None  # 手动步骤正在调度器中排队时的槽位 id
+        self._step_started_at: Optional[float] = None  # 手动步骤分配到资源、开始运行的时间
 
     async def start_training(
         self,
@@ -46,9 +77,13 @@ class TrainingMonitor:
         baseline_codes=None,
         workflow_codes=None,
         actions=None,
+        run_id: Optional[str] = None,
+        owner: Optional[str] = None,
     ):
         """启动训练过程
 
+        与后台任务一样先在服务器级调度器中排队，资源空闲时才开始运行，超过个人限额时提示后返回 None。
+
         Args:
             task_type: 任务类型（如 'vision', 'text' 等）
             config: 训练配置
@@ -58,24 +93,67 @@ class TrainingMonitor:
             baseline_codes: 基准代码
             workflow_codes: 工作流代码
             actions: 动作列表
+            run_id: 手动模式的运行 id，给出时步骤的检查点持久保存，中断后可以继续
+            owner: 客户端标识，用于调度器按用户限额
         """
         if self._is_training:
             st.error("当前已有训练任务在运行中，请等待完成后再试")
             return None
 
+        scheduler = get_job_manager().scheduler
+        slot_id = f"step:{uuid.uuid4().hex}"
         async with self._training_lock:
             try:
                 self._is_training = True
-                result = await self._start_training_async(
-                    task_type, config, code_interpreter, auto, start_builder, baseline_codes, workflow_codes, actions
-                )
+                if scheduler is not None:
+                    job_class = job_class_for(task_type)
+                    scheduler.admit(owner, job_class, slot_id)
+                    self._queued_slot = slot_id
+                    await scheduler.acquire(slot_id, owner, job_class)
+                    self._queued_slot = None
+                self._step_started_at = time.time()
+                node_timeout = RunTimeouts.from_config(config.get("configurable", config)).node
+                pool = get_interpreter_pool()
+                # 运行期间解释器不会因会话无访问而被池回收
+                with pool.in_use(code_interpreter), cell_timeout(code_interpreter, node_timeout):
+                    result = await self._start_training_async(
+                        task_type,
+                        config,
+                        code_interpreter,
+                        auto,
+                        start_builder,
+                        baseline_codes,
+                        workflow_codes,
+                        actions,
+                        run_id,
+                    )
+                if run_id and not auto and result is not None:
+                    # 手动模式的后续步骤在同一内核中继续，与步骤检查点保留同样长的时间
+                    pool.keep(code_interpreter, CHECKPOINT_TTL)
                 return result
+            except AdmissionError as e:
+                st.warning(str(e))
+                return None
             except Exception as e:
                 st.error(f"训练启动失败：{str(e)}")
                 return None
             finally:
+                if scheduler is not None:
+                    scheduler.release(slot_id)
+                self._queued_slot = self._step_started_at = None
                 self._is_training = False
 
+    def step_progress(self) -> str:
+        """手动步骤的状态：排队时显示前面的任务数，分配到资源后显示已运行时长"""
+        slot_id = self._queued_slot
+        scheduler = get_job_manager().scheduler
+        if slot_id is not None and scheduler is not None:
+            position = scheduler.position(slot_id)
+            return f"排队中，前面还有 {max(position - 1, 0)} 个任务，资源空闲时自动开始"
+        if self._step_started_at is not None:
+            return f"已运行 {time.time() - self._step_started_at:.0f} 秒"
+        return "正在启动"
+
     async def _start_training_async(
         self,
         task_type: str,
@@ -86,19 +164,31 @@ class TrainingMonitor:
         baseline_codes=None,
         workflow_codes=None,
         actions=None,
+        run_id: Optional[str] = None,
     ):
-        """异步执行训练过程"""
+        """异步执行训练过程
+
+        图运行超过配置的 run_timeout 或整个协程被取消（页面上点击取消）时，中断解释器内核，
+        并在运行记录库中保存一条已取消的记录；步骤的检查点仍然保留，重新运行会从中断处继续。
+        """
         executor = self.graph_executor.get_graph_for_task(task_type)
         if not executor:
             st.error(f"未找到任务类型 {task_type} 对应的执行器")
             return None
 
+        self.run_log = RunLog(uuid.uuid4().hex[:12])
+        self.run_events = None
+        self.run_config = config
+        self.full_data_run = None
+        started = time.perf_counter()
+        started_at = time.time()
+        interrupted: Optional[str] = None
+        sampler: Optional[ResourceSampler] = None
         try:
-            # 重置当前日志文件
-            self._current_log_file = None
-
             # 根据任务类型选择不同的执行器配置
             if task_type == TaskType.ML.value:  # 机器学习任务
+                with st.spinner("正在准备数据..."):
+                    await self._prepare_ml_data(config, code_interpreter)
                 self.graph = executor(
                     config,
                     code_interpreter,
@@ -108,31 +198,74 @@ class TrainingMonitor:
                     workflow_codes=workflow_codes,
                     actions=actions,
                 )
+                if run_id and not auto:
+                    thread_id = step_thread_id(
+                        run_id,
+                        start_builder,
+                        config,
+                        baseline_codes=baseline_codes,
+                        workflow_codes=workflow_codes,
+                        actions=actions,
+                    )
+                    self.run_config = {**config, "configurable": {**config["configurable"], "thread_id": thread_id}}
             else:  # 深度学习任务
                 self.graph = executor(
                     config,
                     code_interpreter,
                 )
             self.app = self.graph.app
-            log_container = st.empty()
-            md_log_container = log_container.empty()
-
-            # 创建任务
-            graph_task = asyncio.create_task(self.app.ainvoke({"messages": []}, config))
 
-            # 等待一小段时间确保任务已经开始运行
-            await asyncio.sleep(0.5)
+            # 同一步骤已有检查点时：已完成则直接使用保存的结果，中断过则从最后完成的节点继续
+            graph_input = {"messages": []}
+            if self.run_config is not config:
+                snapshot = self.app.get_state(self.run_config)
+                if snapshot.values and not snapshot.next:
+                    st.info("该步骤已完成，直接使用保存的结果")
+                    self.result = snapshot.values
+                    return self.result
+                if snapshot.next:
+                    graph_input = None
+                    self.run_log.append(f"## 从检查点继续：{', '.join(snapshot.next)}\n\n")
 
-            # 获取当前最新的日志文件
-            self._current_log_file = self._get_latest_log_file()
+            log_container = st.empty()
+            md_log_container = log_container.empty()
 
-            # 监控日志直到任务完成
-            await self._monitor_log_updates(graph_task, md_log_container)
+            # 创建任务，任务继承绑定了本次运行日志的上下文
+            self.run_events = RunEvents(self.run_log.run_id)
+            self.run_log.subscribe(self.run_events.observe_log)
+            sampler = ResourceSampler(self.run_events, code_interpreter).start()
+            run_config = self.graph_executor.with_events(self.run_config, self.run_events)
+            run_timeout = RunTimeouts.from_config(config.get("configurable", config)).run
+            with self.run_log.bind(), llm_scope(feature=f"{task_type}_graph"):
+                graph_task = asyncio.create_task(
+                    run_with_deadline(self.app.ainvoke(graph_input, run_config), run_timeout, code_interpreter)
+                )
+            graph_task.add_done_callback(lambda _: self.run_log.close())
 
-            # 获取结果
-            result = await graph_task
+            try:
+                # 监控日志直到任务完成
+                await self._monitor_log_updates(self.run_log, md_log_container)
+
+                # 获取结果
+                result = await graph_task
+            except asyncio.CancelledError:
+                # 取消传递给图任务，由 run_with_deadline 中断解释器内核
+                interrupted = "运行已取消"
+                graph_task.cancel()
+                await asyncio.wait([graph_task], timeout=10)
+                raise
+            except asyncio.TimeoutError as e:
+                interrupted = str(e)
+                st.error(interrupted)
+                return None
             self.result = result
 
+            if task_type == TaskType.ML.value and start_builder == "workflow_builder":
+                with st.spinner("正在用完整数据重新训练最终工作流..."):
+                    self.full_data_run = await self._retrain_full_data(
+                        config, code_interpreter, self.state_values(), time.perf_counter() - started, baseline_codes
+                    )
+
             # 显示最终日志
             self._display_final_log(md_log_container)
 
@@ -149,11 +282,17 @@ class TrainingMonitor:
             st.code(traceback.format_exc(), language="python")
             return None
         finally:
-            # 清理当前日志文件引用
-            self._current_log_file = None
-            
+            self.run_log.close()
+            if sampler is not None:
+                sampler.stop()
+            if self.run_events is not None:
+                self.run_events.close()
+            # 缓存的图会被后续运行复用，清理本次运行在内存中的检查点
+            self.graph_executor.release_run(self.graph, self.run_config)
+            if interrupted:
+                self._record_interrupted_step(task_type, config, started_at, interrupted)
+
             # 强制清理内存
-            import gc
             gc.collect()
             
             # 清理matplotlib缓存
@@ -163,85 +302,388 @@ class TrainingMonitor:
             except:
                 pass
 
-    def _get_latest_log_file(self):
-        """获取最新的非空日志文件路径"""
-        log_dir = get_tmp_folder("log")
-        if not os.path.exists(log_dir):
-            return None
+    async def _prepare_ml_data(self, config: dict, code_interpreter=None) -> None:
+        """训练开始前准备数据：导出数据库数据源，开发采样模式下切换到分层采样数据，并让代码解释器能读取列式文件"""
+        configurable = config.get("configurable", config)
+        if configurable.get("sqlite_source"):
+            await asyncio.to_thread(ensure_sqlite_extract, {**configurable, "path": full_data_path(configurable)})
+        if configurable.get("dev_sample"):
+            await asyncio.to_thread(use_dev_sample, configurable)
 
-        log_files = glob.glob(os.path.join(log_dir, "app_log_*.md"))
-        if not log_files:
-            return None
+        if code_interpreter is not None and Path(configurable.get("path", "")).suffix.lower() in COLUMNAR_SUFFIXES:
+            await code_interpreter.run(COLUMNAR_LOADER_PRELUDE)
 
-        # 按修改时间排序，最新的在前
-        log_files.sort(key=os.path.getmtime, reverse=True)
+    async def _retrain_full_data(
+        self, config: dict, code_interpreter, state: Optional[dict], dev_seconds: float, baseline_codes=None
+    ) -> Optional[dict]:
+        """开发采样模式下，用完整数据重新运行最终通过的基线和工作流代码
 
-        # 如果是第一次获取日志文件，记录当前最新的文件
-        if self._current_log_file is None:
-            for log_file in log_files:
-                if os.path.getsize(log_file) > 0:
-                    self._current_log_file = log_file
-                    return log_file
+        工作流读取的是基线代码保存的预处理数据，所以先把基线代码的数据路径换成完整数据重新运行，
+        再让工作流代码读取新保存的数据。完整数据只转换一次为 Parquet 快照，代码解释器以内存映射方式读取。
+
+        Returns:
+            采样开发耗时、完整数据训练耗时和运行结果，未开启开发采样或工作流未成功时返回 None
+        """
+        configurable = config.get("configurable", config)
+        if not configurable.get("dev_sample") or code_interpreter is None or not state:
+            return None
+        baselines = [code for code in state.get("baseline_codes") or baseline_codes or [] if code.get("success")]
+        accepted = [code for code in state.get("workflow_codes") or [] if code.get("success")]
+        if not state.get("workflow_success") or not accepted or not baselines:
             return None
 
-        # 如果已经有当前日志文件，检查是否有更新的文件
-        for log_file in log_files:
-            if log_file == self._current_log_file:
-                return log_file
-            if os.path.getsize(log_file) > 0:
-                self._current_log_file = log_file
-                return log_file
+        started = time.perf_counter()
+        run = {
+            "sample_path": configurable["path"],
+            "sample_rows": configurable.get("dev_sample_rows"),
+            "dev_seconds": round(dev_seconds, 2),
+        }
+        try:
+            snapshot = await asyncio.to_thread(ensure_parquet_snapshot, configurable)
+            run["full_path"] = str(snapshot)
+            baseline = full_data_code(baselines[-1]["code"], configurable["path"], snapshot)
+            await code_interpreter.run(COLUMNAR_LOADER_PRELUDE)
+            output, success = await code_interpreter.run(baseline)
+            clean_data = saved_data_path(output) if success else None
+            if clean_data is None:
+                run.update({"code": baseline, "result": output, "success": False})
+            else:
+                code = full_data_workflow_code(accepted[-1]["code"], clean_data)
+                output, success = await code_interpreter.run(code)
+                run.update({"code": f"{baseline}\n\n{code}", "result": output, "success": success})
+        except Exception as e:
+            run.update({"result": f"{type(e).__name__}: {e}", "success": False})
+        run["full_seconds"] = round(time.perf_counter() - started, 2)
+        return run
 
-        return self._current_log_file
+    def _build_graph(self, task_type: str, config: dict, code_interpreter=None, **graph_kwargs):
+        """按任务类型创建图"""
+        executor = self.graph_executor.get_graph_for_task(task_type)
+        if not executor:
+            raise ValueError(f"未找到任务类型 {task_type} 对应的执行器")
+        if task_type == TaskType.ML.value:
+            return executor(config, code_interpreter, **graph_kwargs)
+        return executor(config, code_interpreter)
 
-    def _display_log_content(self, content: str, md_log_container) -> None:
-        """显示带滚动条的日志内容"""
-        formatted_content = self.SCROLL_CONTAINER_TEMPLATE.format(content=content)
-        md_log_container.markdown(formatted_content, unsafe_allow_html=True)
+    def submit_training(
+        self,
+        task_type: str,
+        config: dict,
+        code_interpreter=None,
+        owner: Optional[str] = None,
+        job_class: Optional[str] = None,
+        **graph_kwargs,
+    ) -> Job:
+        """以后台任务的方式启动训练，立即返回任务
 
-    def _read_log_file(self, file_path: str, start_pos: int = 0) -> tuple[str, int]:
-        """读取日志文件内容
+        训练在共享的后台事件循环中运行，与当前脚本线程无关：刷新浏览器或与页面交互都不会中断训练。
+        任务先在服务器级调度器中排队，资源空闲时才开始运行；超过个人限额等情况会抛出 AdmissionError。
+        页面通过 show_job_progress 轮询进度，任务结束后调用 attach_job 取回图和结果。
 
         Args:
-            file_path: 日志文件路径
-            start_pos: 开始读取位置
-
-        Returns:
-            tuple[str, int]: (文件内容, 当前文件位置)
+            task_type: 任务类型
+            config: 训练配置
+            code_interpreter: 代码解释器
+            owner: 客户端标识，用于刷新页面后重新连接和按用户限额
+            job_class: 调度器中的任务类别，默认按任务类型推断
+            **graph_kwargs: 传给机器学习图的参数（auto、start_builder 等）
         """
+
+        async def _train(job: Job):
+            run_log = RunLog(job.id)
+            events = RunEvents(job.id)
+            run_log.subscribe(events.observe_log)
+            job.context["log"] = run_log
+            job.context["events"] = events
+            job.meta["log_file"] = str(run_log.path)
+            job.meta["events_file"] = str(events.path)
+            job.emit("log_file", path=str(run_log.path))
+            events.emit("run_start", task_type=task_type)
+            sampler = ResourceSampler(events, code_interpreter).start()
+            status, state, error, graph = "error", None, None, None
+            started = time.perf_counter()
+            timeouts = RunTimeouts.from_config(config.get("configurable", config))
+
+            async def _execute():
+                nonlocal state, graph
+                with run_log.bind(), llm_scope(feature=f"{task_type}_graph"):
+                    if task_type == TaskType.ML.value:
+                        job.emit("stage", message="正在准备数据")
+                        await self._prepare_ml_data(config, code_interpreter)
+
+                    graph = self._build_graph(task_type, config, code_interpreter, **graph_kwargs)
+                    job.context["graph"] = graph
+                    job.emit("stage", message="智能体运行中")
+
+                    result = await graph.app.ainvoke(
+                        {"messages": []}, self.graph_executor.with_events(config, events)
+                    )
+                state = graph.app.get_state(config).values
+                if task_type == TaskType.ML.value and config.get("configurable", config).get("dev_sample"):
+                    job.emit("stage", message="正在用完整数据重新训练最终工作流")
+                    full_data_run = await self._retrain_full_data(
+                        config, code_interpreter, state, time.perf_counter() - started
+                    )
+                    if full_data_run:
+                        state = {**state, "full_data_run": full_data_run}
+                return result
+
+            try:
+                # 取消任务或超过运行时长上限时中断解释器内核，调度器的资源槽位在任务结束时释放
+                # 页面关闭后任务仍在运行，运行期间解释器不会因会话无访问而被池回收
+                with get_interpreter_pool().in_use(code_interpreter), cell_timeout(code_interpreter, timeouts.node):
+                    result = await run_with_deadline(_execute(), timeouts.run, code_interpreter)
+                status = "ok"
+                return {"output": result, "state": state}
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+            except asyncio.TimeoutError as e:
+                status, error = "cancelled", str(e)
+                job.emit("stage", message=error)
+                raise
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                self.graph_executor.release_run(graph, config)
+                gc.collect()
+                run_log.close()
+                await asyncio.to_thread(sampler.stop)
+                events.emit("run_end", status=status)
+                events.close()
+                usage = usage_summary(events.events())
+                await asyncio.to_thread(self._record_run, job, config, state, status, error, usage)
+
+        return get_job_manager().submit(
+            _train, kind=task_type, owner=owner, job_class=job_class or job_class_for(task_type)
+        )
+
+    @staticmethod
+    def _record_run(
+        job: Job, config: dict, state: Optional[dict], status: str, error: Optional[str], usage: Optional[dict] = None
+    ) -> None:
+        """把运行结果、日志、事件（含资源时间线）、资源摘要和本次生成的 pickle 保存到运行记录库"""
+        started_at = job.started_at or job.created_at
+        files = {"log": job.meta.get("log_file"), "events": job.meta.get("events_file")}
+        files.update(collect_pickles(config.get("configurable", config).get("name"), since=started_at))
+        try:
+            get_run_store().record(
+                job.id,
+                job.kind,
+                config,
+                state=state,
+                owner=job.owner,
+                status={"ok": "succeeded", "cancelled": "cancelled"}.get(status, "failed"),
+                started_at=started_at,
+                files=files,
+                error=error,
+                usage=usage,
+            )
+            # 运行已保存到运行记录库，顺带清理已废弃会话留下的检查点
+            get_checkpointer().maybe_prune()
+        except Exception as e:
+            job.emit("stage", message=f"保存运行记录失败：{e}")
+
+    def _record_interrupted_step(self, task_type: str, config: dict, started_at: float, error: str) -> None:
+        """手动模式的步骤被取消或超时中断时，把日志和事件作为一条已取消的运行保存到运行记录库"""
+        files, usage = {"log": str(self.run_log.path)}, None
+        if self.run_events is not None:
+            files["events"] = str(self.run_events.path)
+            usage = usage_summary(self.run_events.events())
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                if start_pos:
-                    f.seek(start_pos)
-                content = f.read()
-                return content, f.tell()
+            get_run_store().record(
+                self.run_log.run_id,
+                task_type,
+                self.run_config or config,
+                owner=st.session_state.get("client_id"),
+                status="cancelled",
+                started_at=started_at,
+                files=files,
+                error=error,
+                usage=usage,
+            )
         except Exception as e:
-            st.error(f"读取日志文件时出错: {str(e)}")
-            return "", start_pos
-
-    async def _monitor_log_updates(self, graph_task, md_log_container):
-        """监控日志文件更新并显示"""
-        latest_log = self._get_latest_log_file()
-        last_size = 0
-        all_log_content = ""
-
-        while not graph_task.done():
-            if latest_log and os.path.exists(latest_log):
-                current_size = os.path.getsize(latest_log)
-                if current_size > last_size:
-                    new_content, last_size = self._read_log_file(latest_log, last_size)
-                    if new_content:
-                        all_log_content += new_content
-                        self._display_log_content(all_log_content, md_log_container)
-            await asyncio.sleep(0.1)
+            st.warning(f"保存运行记录失败：{e}")
+
+    def restore_run(self, run_id: str, code_interpreter=None) -> Optional[Tuple[RunRecord, dict]]:
+        """加载已保存的运行：读取图状态和日志，并重建图以便 AI 助手使用，不会重新运行流程
+
+        Returns:
+            (运行记录, 图状态)，记录不存在或没有保存状态时返回 None
+        """
+        store = get_run_store()
+        record = store.get(run_id)
+        state = store.load_state(run_id) if record else None
+        if state is None:
+            return None
+        graph_kwargs = {"auto": True} if record.task_type == TaskType.ML.value else {}
+        self.graph = self._build_graph(record.task_type, record.config, code_interpreter, **graph_kwargs)
+        self.app = self.graph.app
+        self.result = state
+        log_file = record.artifacts.get("log")
+        self.run_log = RunLog.from_file(log_file, run_id) if log_file else None
+        self.run_events = None
+        events_file = record.artifacts.get("events")
+        self.loaded_events = load_run_events(events_file) if events_file else []
+        return record, state
+
+    def attach_job(self, job: Job) -> Optional[dict]:
+        """把已结束任务的图和结果挂到当前监控器上，返回图的最终状态"""
+        self.run_log = job.context.get("log")
+        self.run_events = job.context.get("events")
+        graph = job.context.get("graph")
+        if graph is not None:
+            self.graph = graph
+            self.app = graph.app
+        if job.status != JobStatus.SUCCEEDED or not job.result:
+            return None
+        self.result = job.result["output"]
+        return job.result["state"]
+
+    def run_event_records(self) -> List[dict]:
+        """最近一次运行（或加载的历史运行）的结构化事件"""
+        if self.run_events is not None:
+            return self.run_events.events()
+        return self.loaded_events
+
+    def show_resource_usage(self) -> None:
+        """在结果页显示最近一次运行的资源时间线和按节点汇总的 LLM 调用"""
+        records = self.run_event_records()
+        if any(e["event"] in ("resource", "llm_call") for e in records):
+            with st.expander("💻 资源使用", expanded=False):
+                render_resource_usage(records)
+
+    def state_values(self) -> dict:
+        """最近一次运行的图状态"""
+        return self.app.get_state(self.run_config).values
+
+    def show_job_progress(self, job: Job) -> None:
+        """显示后台任务的状态和日志，任务结束后重新运行整个页面
+
+        任务运行期间片段在一次运行中持续等待，而不是每秒重新运行：日志只追加新增的记录，
+        状态每秒更新，训练指标和节点时间线在有新事件时每隔几秒重绘。页面上的操作
+        （取消任务、加载更早的日志）会在下一次更新时打断等待并重新运行片段。
+        """
+
+        @st.fragment
+        def _progress():
+            was_running = not job.finished
+            col1, col2 = st.columns([4, 1])
+            status = col1.empty()
+            if was_running and col2.button("取消任务", key=f"cancel_job_{job.id}"):
+                job.cancel()
+            charts = st.empty()
+            run_log = job.context.get("log")
+            view = LogView(run_log, st.empty()) if run_log is not None else None
+            if view is not None:
+                view.render()
+
+            charted, charted_at = -1, 0.0
+            while True:
+                self._render_job_status(status, job)
+                events = job.context.get("events")
+                if (
+                    events is not None
+                    and len(events) not in (0, charted)
+                    and (job.finished or time.monotonic() - charted_at >= JOB_CHART_REFRESH)
+                ):
+                    charted, charted_at = len(events), time.monotonic()
+                    with charts.container():
+                        with st.expander("训练指标与节点时间线", expanded=True):
+                            render_run_events(events)
+                if job.finished:
+                    break
+                if view is not None and not run_log.closed:
+                    # 在两次状态更新之间等待新日志，有新内容时立即追加
+                    self._tail_log(view, budget=1.0)
+                else:
+                    job.wait(1.0)
+
+            if view is not None:
+                view.update()
+            if was_running:
+                # 任务在等待期间结束：重新运行整个页面，让页面处理结果
+                st.rerun()
+
+        _progress()
+
+    @staticmethod
+    def _render_job_status(placeholder, job: Job) -> None:
+        if job.status == JobStatus.SUCCEEDED:
+            placeholder.success(f"任务已完成，用时 {job.elapsed:.0f} 秒")
+        elif job.status == JobStatus.CANCELLED:
+            placeholder.warning("任务已取消")
+        elif job.finished:
+            placeholder.error(f"任务失败：{job.error}")
+        elif job.status == JobStatus.QUEUED:
+            position = get_job_manager().queue_position(job)
+            placeholder.info(f"排队中，前面还有 {max(position - 1, 0)} 个任务（任务 {job.id}）")
+        else:
+            stages = [e for e in job.events() if e["event"] == "stage"]
+            stage = stages[-1]["message"] if stages else "正在启动"
+            placeholder.info(f"{stage}（已运行 {job.elapsed:.0f} 秒，任务 {job.id}）")
+
+    def _tail_log(self, view: LogView, budget: float) -> None:
+        """在 budget 秒内等待并追加新日志，日志关闭时提前返回"""
+        run_log = view.run_log
+        deadline = time.monotonic() + budget
+        while not run_log.closed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if run_log.wait(run_log.size, remaining):
+                view.update()
+
+    async def _monitor_log_updates(self, run_log: RunLog, md_log_container):
+        """等待日志更新并追加显示，日志关闭（任务结束）时返回"""
+        view = LogView(run_log, md_log_container)
+        view.render()
+        while not run_log.closed:
+            if await asyncio.to_thread(run_log.wait, run_log.size, 1.0):
+                view.update()
+        view.update()
 
     def _display_final_log(self, md_log_container):
-        """显示最终的完整日志"""
-        latest_log = self._get_latest_log_file()
-        if latest_log and os.path.exists(latest_log):
-            content, _ = self._read_log_file(latest_log)
-            if content:
-                self._display_log_content(content, md_log_container)
+        """显示最终日志的最近窗口"""
+        if self.run_log is not None and self.run_log.entry_count:
+            LogView(self.run_log, md_log_container).render()
+
+
+def get_client_id() -> str:
+    """当前浏览器客户端的标识
+
+    同时保存在会话状态和页面地址的查询参数中：切换页面会清空查询参数，刷新页面会清空会话状态，
+    两者互相补齐，用于重新连接后台任务。
+    """
+    client_id = st.session_state.get("client_id") or st.query_params.get("client") or uuid.uuid4().hex[:12]
+    st.session_state.client_id = client_id
+    if st.query_params.get("client") != client_id:
+        st.query_params["client"] = client_id
+    return client_id
+
+
+def step_thread_id(run_id: str, start_builder: str, config: dict, **inputs) -> str:
+    """手动模式步骤的检查点 thread_id
+
+    同一运行中，配置和上一步结果都相同的步骤共用一个 thread：中断后重新点击会从检查点继续，
+    上一步重新运行产生了不同结果时则使用新的 thread。
+    """
+    configurable = config.get("configurable", config)
+    configurable = {k: v for k, v in configurable.items() if k not in ("thread_id", "from_web_ui")}
+    payload = json.dumps({"config": configurable, **inputs}, sort_keys=True, ensure_ascii=False, default=str)
+    return f"{run_id}:{start_builder}:{hashlib.md5(payload.encode()).hexdigest()[:12]}"
+
+
+def saved_step_values(run_id: str, start_builder: str) -> Optional[dict]:
+    """运行中某个步骤最近一次检查点的图状态，没有检查点时返回 None"""
+    checkpointer = get_checkpointer()
+    threads = checkpointer.threads(f"{run_id}:{start_builder}:")
+    if not threads:
+        return None
+    checkpoint = checkpointer.get_tuple({"configurable": {"thread_id": threads[-1], "checkpoint_ns": ""}})
+    checkpointer.release(threads[-1])
+    return checkpoint.checkpoint["channel_values"] if checkpoint else None
 
 
 def create_training_monitor(llm=None) -> TrainingMonitor:
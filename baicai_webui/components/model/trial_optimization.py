@@ -0,0 +1,83 @@
+import uuid
+from typing import Any, Dict, List
+
+from baicai_base.agents.graphs.nodes import RunCodeNode
+from baicai_base.utils.data import get_tmp_folder
+from baicai_dev.agents.graphs.optimization_builder import OptimizationBuilder
+from baicai_dev.agents.graphs.optimization_builder.state import OptimizationState
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import StateGraph
+
+from baicai_webui.services import TRIAL_TEARDOWN, TrialBudget, load_trials, trial_prelude, trials_markdown
+
+
+class TrialOptimizationState(OptimizationState):
+    """在模型优化状态上增加超参数搜索的试验记录"""
+
+    optimization_trials: Dict[str, List[Dict[str, Any]]]
+
+
+class TrialRunCodeNode(RunCodeNode):
+    """按预算并行评估超参数搜索的运行节点
+
+    运行优化代码前，先在会话的解释器中执行试验预置代码：生成代码里的 GridSearchCV/RandomizedSearchCV
+    会分批把参数组合交给进程池评估，受配置中的 CPU、内存、试验数量和总时长约束，并在连续多批没有提升时
+    提前停止。每次运行的试验记录写入单独的文件，运行结束后读入状态的 ``optimization_trials``。
+    """
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.budget = TrialBudget()
+        self.trials_path = None
+
+    async def __call__(self, state, config: RunnableConfig) -> Dict[str, Any]:
+        configurable = config.get("configurable", {})
+        self.budget = TrialBudget.from_config(configurable)
+        trials_folder = get_tmp_folder("data") / configurable.get("name", "default") / "trials"
+        trials_folder.mkdir(parents=True, exist_ok=True)
+        self.trials_path = trials_folder / f"trials_{uuid.uuid4().hex[:12]}.jsonl"
+        return await super().__call__(state, config)
+
+    async def _execute_code(self):
+        """先启用按预算评估的超参数搜索，再运行优化代码，结束后恢复搜索类的原方法
+
+        解释器会在会话间复用，不恢复的话之后在同一内核中运行的代码（AI 助手、其他步骤、
+        其他会话）会沿用本次的预算，并继续写入本次的试验记录文件。
+        """
+        try:
+            output, success = await self.code_interpreter.run(trial_prelude(self.trials_path, self.budget))
+            if not success:
+                self.logger.warning(f"#### <font color='red'>无法启用并行试验评估，按原方式运行：{output}</font>")
+        except Exception as e:
+            self.logger.warning(f"#### <font color='red'>无法启用并行试验评估，按原方式运行：{e}</font>")
+        try:
+            return await super()._execute_code()
+        finally:
+            try:
+                await self.code_interpreter.run(TRIAL_TEARDOWN)
+            except Exception as e:
+                self.logger.warning(f"#### <font color='red'>恢复超参数搜索类失败：{e}</font>")
+
+    def _finalize_result(self):
+        result = super()._finalize_result()
+        records = load_trials(self.trials_path) if self.trials_path else {"trials": [], "searches": []}
+        if records["searches"]:
+            self.logger.info(f"### 超参数搜索试验\n\n{trials_markdown(records)}\n")
+        if not self.fail_fast:
+            result["optimization_trials"] = records
+        return result
+
+
+class TrialOptimizationBuilder(OptimizationBuilder):
+    """模型优化构建器，超参数搜索的试验按预算在进程池中并行评估并全部记录"""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.state_class = TrialOptimizationState
+        self.graph = StateGraph(TrialOptimizationState)
+        self.run_node = TrialRunCodeNode(
+            code_interpreter=self.code_interpreter,
+            name=self.graph_name,
+            graph_name=self.graph_name,
+            one_pass_graph=True,
+        )
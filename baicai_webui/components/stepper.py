@@ -1,10 +1,13 @@
-import asyncio
+import concurrent.futures
+import time
 from enum import Enum
 from typing import Callable
 
 import streamlit as st
 from streamlit_mermaid import st_mermaid
 
+from baicai_webui.services import get_async_runner, wait_interruptible
+
 
 class StepState(Enum):
     """步骤状态枚举"""
@@ -28,7 +31,13 @@ class StepperBar:
     一个可自定义的步骤条组件，使用有限状态机管理状态
     """
 
-    def __init__(self, steps: list[tuple[str, Callable, str]], current_step: int, reset_func: Callable = None):
+    def __init__(
+        self,
+        steps: list[tuple[str, Callable, str]],
+        current_step: int,
+        reset_func: Callable = None,
+        progress_func: Callable[[], str] = None,
+    ):
         """
         初始化步骤条
 
@@ -37,6 +46,8 @@ class StepperBar:
                 步骤列表，每个元素是一个包含步骤名称、执行函数和mermaid图形的元组
             current_step: int
                 当前步骤的索引
+            progress_func: Callable[[], str]
+                返回正在运行的步骤状态（如排队位置、已运行时长），默认显示步骤启动后的时长
         """
         if "step_states" not in st.session_state:
             st.session_state.step_states = [StepState.PENDING] * len(steps)
@@ -56,6 +67,7 @@ class StepperBar:
         self.step_container_margin = 10
         self.steps = steps
         self.reset_func = reset_func
+        self.progress_func = progress_func
         # 定义颜色主题
         self.inactive_color = "#BDBDBD"
         self.inactive_text_color = "#666666"
@@ -118,6 +130,20 @@ class StepperBar:
         elif state == StepState.DISABLED:
             return self.inactive_color, self.inactive_text_color, True
 
+    def _step_progress(self) -> str:
+        if self.progress_func is not None:
+            return self.progress_func()
+        return f"已运行 {time.time() - st.session_state.step_started_at:.0f} 秒"
+
+    def cancel_step(self):
+        """取消正在运行的步骤，协程在取消时中断解释器并释放调度器槽位"""
+        future = st.session_state.get("step_future")
+        if future is None:
+            return
+        future.cancel()
+        st.session_state.step_future = None
+        self.run_transition(st.session_state.current_running_step, success=False)
+
     async def run_task(self, func, step_index: int):
         """运行任务"""
         try:
@@ -297,6 +323,8 @@ class StepperBar:
             with control_cols[2]:
                 st.markdown("<div style='margin-top: 20px; text-align: right;'></div>", unsafe_allow_html=True)
                 if st.button("重启步骤", key="reset_button", use_container_width=True):
+                    # 重启会释放解释器，先取消仍在运行的步骤
+                    self.cancel_step()
                     self.reset_states()
                     if self.reset_func:
                         self.reset_func()
@@ -306,8 +334,33 @@ class StepperBar:
         # 处理异步任务执行
         if hasattr(st.session_state, "should_run_task") and st.session_state.should_run_task:
             step_index = st.session_state.current_running_step
-            asyncio.run(self.run_task(self.steps[step_index][1], step_index))
+            # 先清除标记，重新运行时不会再次启动
             st.session_state.should_run_task = False
+            task = self.run_task(self.steps[step_index][1], step_index)
+            st.session_state.step_future = get_async_runner().submit(task)
+            st.session_state.step_started_at = time.time()
+
+        # 步骤在后台事件循环中运行：打开 AI 助手、操作侧边栏等使页面重新运行时不会中断步骤，
+        # 重新运行后继续等待仍在运行的步骤，只有点击取消按钮才取消步骤并中断解释器
+        future = st.session_state.get("step_future")
+        if future is not None:
+            step_index = st.session_state.current_running_step
+            status_cols = st.columns([4, 1])
+            elapsed = status_cols[0].empty()
+            if status_cols[1].button("取消当前步骤", key="cancel_step_button", use_container_width=True):
+                self.cancel_step()
+                st.rerun()
+            try:
+                wait_interruptible(
+                    future,
+                    lambda _: elapsed.caption(
+                        f"{self._step_progress()}。取消后已完成的节点保存在检查点中，重新运行会从中断处继续"
+                    ),
+                    cancel_on_exit=False,
+                )
+            except concurrent.futures.CancelledError:
+                self.run_transition(step_index, success=False)
+            st.session_state.step_future = None
             st.rerun()
 
         # 如果任务完成，触发重新渲染以更新最终状态
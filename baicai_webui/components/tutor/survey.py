@@ -5,6 +5,8 @@ from baicai_base.services import LLM
 from baicai_base.utils.data import get_tmp_folder, safe_extract_json
 from baicai_tutor.agents.roles import analyst, surveyor
 
+from baicai_webui.services import instrument_llm, llm_scope
+
 survey_template = {
     "questions": [
         {
@@ -195,13 +197,14 @@ def collect_user_info():
 
 def generate_survey(user_info, llm):
     """Generate survey based on user information."""
-    original_result, extracted_result, reflections, failed = safe_extract_json(
-        surveyor(llm),
-        {
-            "messages": [],
-            **user_info,
-        },
-    )
+    with llm_scope(feature="surveyor"):
+        original_result, extracted_result, reflections, failed = safe_extract_json(
+            surveyor(llm),
+            {
+                "messages": [],
+                **user_info,
+            },
+        )
     return extracted_result
 
 
@@ -274,20 +277,21 @@ def display_survey(questions=None):
 def analyze_survey_results(questions, llm):
     """Analyze survey results using the analyst agent."""
     # Get analysis from the analyst agent
-    original_result, extracted_result, reflections, failed = safe_extract_json(
-        analyst(llm),
-        {
-            "messages": [
-                ("user", "用户问卷反馈数据：\n" + str(questions)),
-            ],
-        },
-    )
+    with llm_scope(feature="analyst"):
+        original_result, extracted_result, reflections, failed = safe_extract_json(
+            analyst(llm),
+            {
+                "messages": [
+                    ("user", "用户问卷反馈数据：\n" + str(questions)),
+                ],
+            },
+        )
 
     return extracted_result
 
 
 def survey_flow():
-    llm = LLM().llm
+    llm = instrument_llm(LLM().llm, "survey")
     """Main survey flow that handles user info collection and survey display."""
     # Initialize session state for survey if not exists
     if "generated_survey" not in st.session_state:
@@ -7,6 +7,7 @@ import streamlit as st
 from baicai_tutor.agents.roles.text_rewriter import rewriter
 from baicai_tutor.utils.md_process import MarkdownProcessor, generate_output_filenames
 
+from baicai_webui.services import llm_scope
 from baicai_webui.utils import (
     create_chapter_selector,
     find_selected_chapter_file,
@@ -35,12 +36,13 @@ def get_user_profile():
 def process_single_chunk_with_llm(chunk, profile_summary, personalized_recommendations):
     """使用LLM处理单个chunk"""
     try:
-        result = rewriter().invoke({
-            "messages": [],
-            "textbook": chunk["content"],
-            "profile": profile_summary,
-            "personalized_recommendations": "\n".join(personalized_recommendations) if personalized_recommendations else "使用更多生活化的例子来解释AI概念"
-        })
+        with llm_scope(feature="rewriter"):
+            result = rewriter().invoke({
+                "messages": [],
+                "textbook": chunk["content"],
+                "profile": profile_summary,
+                "personalized_recommendations": "\n".join(personalized_recommendations) if personalized_recommendations else "使用更多生活化的例子来解释AI概念"
+            })
 
         # 提取重写后的内容
         content = result.content
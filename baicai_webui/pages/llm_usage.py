@@ -0,0 +1,95 @@
+import time
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from baicai_webui.services import get_llm_call_log, llm_call_frame, llm_usage_summary
+
+SUMMARY_LABELS = {
+    "page": "页面",
+    "feature": "功能",
+    "model": "模型",
+    "calls": "调用次数",
+    "errors": "出错",
+    "prompt_tokens": "输入 token",
+    "completion_tokens": "输出 token",
+    "cache_hit_rate": "缓存命中率",
+    "p50": "耗时 P50（秒）",
+    "p95": "耗时 P95（秒）",
+    "ttft": "首 token（秒）",
+}
+
+PERIODS = {"最近 1 小时": 3600, "最近 24 小时": 86400, "最近 7 天": 7 * 86400, "全部": None}
+
+
+def show_summary(frame, by):
+    st.dataframe(
+        llm_usage_summary(frame, by).rename(columns=SUMMARY_LABELS).round(3),
+        hide_index=True,
+        use_container_width=True,
+    )
+
+
+def show():
+    st.title("LLM 调用统计")
+    st.caption("记录本服务中每次大模型调用的耗时、首个 token 时间、token 用量、提示缓存命中和错误，按页面和功能汇总")
+
+    log = get_llm_call_log()
+    period = st.radio("时间范围", list(PERIODS), index=1, horizontal=True)
+    seconds = PERIODS[period]
+    frame = llm_call_frame(log.records(since=time.time() - seconds if seconds else None))
+    if frame.empty:
+        st.info("该时间范围内没有大模型调用记录")
+        return
+
+    col1, col2 = st.columns(2)
+    pages = col1.multiselect("页面", sorted(frame["page"].dropna().unique()))
+    features = col2.multiselect("功能", sorted(frame["feature"].dropna().unique()))
+    if pages:
+        frame = frame[frame["page"].isin(pages)]
+    if features:
+        frame = frame[frame["feature"].isin(features)]
+    if frame.empty:
+        st.info("没有符合筛选条件的调用记录")
+        return
+
+    cols = st.columns(5)
+    cols[0].metric("调用次数", len(frame), help=f"出错 {int(frame['error'].notna().sum())} 次")
+    cols[1].metric("输入 / 输出 token", f"{frame['prompt_tokens'].sum():.0f} / {frame['completion_tokens'].sum():.0f}")
+    cols[2].metric("耗时 P50", f"{frame['latency'].median():.2f} 秒")
+    cols[3].metric("耗时 P95", f"{frame['latency'].quantile(0.95):.2f} 秒")
+    ttft = frame["ttft"].median()
+    cols[4].metric("首 token P50", "-" if pd.isna(ttft) else f"{ttft:.2f} 秒", help="只统计流式输出的调用")
+
+    st.subheader("按页面和功能")
+    show_summary(frame, ["page", "feature"])
+    st.subheader("按模型")
+    show_summary(frame, ["model"])
+
+    st.subheader("调用耗时")
+    chart = (
+        alt.Chart(frame.assign(failed=frame["error"].notna()))
+        .mark_circle(size=40)
+        .encode(
+            x=alt.X("time:T", title="时间"),
+            y=alt.Y("latency:Q", title="耗时（秒）"),
+            color=alt.Color("feature:N", title="功能"),
+            shape=alt.Shape("failed:N", title="出错"),
+            tooltip=["time", "page", "feature", "node", "model", "latency", "ttft", "prompt_tokens", "error"],
+        )
+    )
+    st.altair_chart(chart, use_container_width=True)
+
+    with st.expander("调用明细"):
+        st.dataframe(frame.sort_values("time", ascending=False), hide_index=True, use_container_width=True)
+
+    st.download_button(
+        "导出 CSV",
+        frame.to_csv(index=False).encode("utf-8-sig"),
+        file_name=f"llm_calls_{time.strftime('%Y%m%d_%H%M%S')}.csv",
+        mime="text/csv",
+    )
+
+
+show()
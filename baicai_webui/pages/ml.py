@@ -1,19 +1,26 @@
-import asyncio
+import uuid
 
 import streamlit as st
 from baicai_base.utils.data import get_saved_pickle_path
-from baicai_base.utils.setups import setup_code_interpreter
 from baicai_dev.utils.data import TaskType
 
+from baicai_webui.components.artifacts import get_artifact_store
 from baicai_webui.components.chat import ai_assistant
 from baicai_webui.components.model import (
     create_shap_analysis,
     create_training_monitor,
     display_results,
+    ensure_code_interpreter,
+    get_client_id,
     get_page_llm,
     ml_uploader,
+    release_code_interpreter,
+    render_interpreter_pool_stats,
+    render_run_history,
+    saved_step_values,
 )
 from baicai_webui.components.stepper import StepperBar
+from baicai_webui.services import AdmissionError, get_checkpointer, get_job_manager, get_run_store, latest_artifact
 
 NORMAL_GRAPH = """
 graph LR;
@@ -63,6 +70,14 @@ graph LR;
 	classDef last fill:#bfb6fc
 """
 
+# 手动模式的步骤：构建器、结果代码和成功标志在图状态中的键
+MANUAL_STEPS = [
+    ("baseline_builder", "baseline_codes", "baseline_success"),
+    ("action_builder", "actions", "action_success"),
+    ("workflow_builder", "workflow_codes", "workflow_success"),
+    ("optimization_builder", "optimization_codes", "optimization_success"),
+]
+
 
 def run():
     st.session_state.running = True
@@ -75,6 +90,21 @@ def restart():
     st.session_state.messages = []
     st.session_state.graph_state = None
     st.session_state.running = False
+    st.session_state.ml_job_id = None
+    st.session_state.loaded_run_id = None
+    st.query_params.pop("job", None)
+    # 删除手动模式的检查点，下次运行使用新的运行 id
+    if st.session_state.get("manual_run_id"):
+        checkpointer = get_checkpointer()
+        for thread_id in checkpointer.threads(f"{st.session_state.manual_run_id}:"):
+            checkpointer.delete_thread(thread_id)
+        checkpointer.maybe_prune()
+    st.session_state.manual_run_id = None
+    st.query_params.pop("run", None)
+    # 归还解释器（清空其中的变量），下次运行时重新租用
+    release_code_interpreter()
+    # 删除本会话生成的图表和数据产物，对话已清空，不再引用
+    get_artifact_store().clear()
     # 重置 stepper 相关状态
     if "stepper" in st.session_state:
         st.session_state.stepper.reset_states()
@@ -84,12 +114,15 @@ def restart():
     # 重置保存的模型代码
     st.session_state.baseline_codes = None
     st.session_state.baseline_success = False
+    st.session_state.baseline_leaderboard = None
     st.session_state.actions = None
     st.session_state.action_success = False
     st.session_state.workflow_codes = None
     st.session_state.workflow_success = False
+    st.session_state.full_data_run = None
     st.session_state.optimization_codes = None
     st.session_state.optimization_success = False
+    st.session_state.optimization_trials = None
     # 清理消息占位符
     if "message_placeholders" in st.session_state:
         st.session_state.message_placeholders = {}
@@ -97,6 +130,111 @@ def restart():
     st.rerun()
 
 
+def _store_state_values(state_values):
+    """把图状态中的各模型结果保存到会话状态"""
+    st.session_state.baseline_codes = state_values.get("baseline_codes", [])
+    st.session_state.baseline_success = state_values.get("baseline_success", False)
+    st.session_state.baseline_leaderboard = state_values.get("baseline_leaderboard", [])
+    st.session_state.actions = state_values.get("actions", [])
+    st.session_state.action_success = state_values.get("action_success", False)
+    st.session_state.workflow_codes = state_values.get("workflow_codes", [])
+    st.session_state.workflow_success = state_values.get("workflow_success", False)
+    st.session_state.full_data_run = state_values.get("full_data_run")
+    st.session_state.optimization_codes = state_values.get("optimization_codes", [])
+    st.session_state.optimization_success = state_values.get("optimization_success", False)
+    st.session_state.optimization_trials = state_values.get("optimization_trials", {})
+
+
+def _store_graph_state():
+    st.session_state.graph_state = {
+        "messages": [],
+        "baseline_codes": st.session_state.baseline_codes,
+        "baseline_success": st.session_state.baseline_success,
+        "baseline_leaderboard": st.session_state.baseline_leaderboard,
+        "actions": st.session_state.actions,
+        "action_success": st.session_state.action_success,
+        "workflow_codes": st.session_state.workflow_codes,
+        "workflow_success": st.session_state.workflow_success,
+        "full_data_run": st.session_state.full_data_run,
+        "optimization_codes": st.session_state.optimization_codes,
+        "optimization_success": st.session_state.optimization_success,
+        "optimization_trials": st.session_state.optimization_trials,
+    }
+
+
+def load_previous_run(run_id):
+    """加载已保存的运行结果，恢复结果查看、模型解释和 AI 助手，不重新运行流程"""
+    try:
+        restored = st.session_state.monitor.restore_run(run_id, st.session_state.code_interpreter)
+    except Exception as e:
+        st.toast(f"加载运行失败：{str(e)}", icon="❌")
+        return
+    if restored is None:
+        st.toast("该运行没有保存结果", icon="⚠️")
+        return
+
+    _, state_values = restored
+    _store_state_values(state_values)
+    _store_graph_state()
+    st.session_state.result = state_values
+    st.session_state.runned = True
+    st.session_state.running = False
+    st.session_state.helper_ready = True
+    st.session_state.run_mode = "auto"
+    st.session_state.run_mode_radio = "自动模式"
+    st.session_state.loaded_run_id = run_id
+    st.session_state.ml_job_id = None
+    st.session_state.messages = []
+    st.query_params.pop("job", None)
+
+
+def _manual_run_id():
+    """手动模式的运行 id，同时保存在查询参数中，刷新页面后可以从检查点恢复各步骤"""
+    run_id = st.session_state.get("manual_run_id") or st.query_params.get("run") or uuid.uuid4().hex[:12]
+    st.session_state.manual_run_id = run_id
+    if st.query_params.get("run") != run_id:
+        st.query_params["run"] = run_id
+    return run_id
+
+
+def _restore_manual_steps(monitor):
+    """刷新页面后从检查点恢复手动模式已完成的步骤，返回已完成的步骤数"""
+    run_id = st.query_params.get("run")
+    if not run_id:
+        return 0
+
+    completed, inputs = 0, {}
+    for builder, codes_key, success_key in MANUAL_STEPS:
+        values = saved_step_values(run_id, builder)
+        if not values or not values.get(success_key):
+            break
+        setattr(st.session_state, codes_key, values.get(codes_key, []))
+        setattr(st.session_state, success_key, True)
+        st.session_state.step_status[completed] = True
+        if builder == "baseline_builder":
+            st.session_state.baseline_leaderboard = values.get("baseline_leaderboard", [])
+        if builder == "optimization_builder":
+            st.session_state.optimization_trials = values.get("optimization_trials", {})
+        st.session_state.result = values
+        inputs = {"start_builder": builder}
+        for key in ("baseline_codes", "actions", "workflow_codes"):
+            if key in values:
+                inputs[key] = values[key]
+        completed += 1
+
+    if completed:
+        st.session_state.runned = True
+        # 重建最后完成步骤的图，AI 助手需要使用其中的问答节点
+        try:
+            monitor.graph = monitor.graph_executor.execute_ml_graph(
+                st.session_state.data_config, st.session_state.code_interpreter, auto=False, **inputs
+            )
+            monitor.app = monitor.graph.app
+        except ValueError as e:
+            st.warning(f"已恢复步骤结果，但无法重建智能体：{str(e)}")
+    return completed
+
+
 def _init_session_state():
     # Initialize LLM with the new configuration method
     llm = get_page_llm(
@@ -108,8 +246,7 @@ def _init_session_state():
         st.session_state.monitor = create_training_monitor(llm=llm)
     monitor = st.session_state.monitor
 
-    if "code_interpreter" not in st.session_state:
-        st.session_state.code_interpreter = setup_code_interpreter()
+    ensure_code_interpreter()
 
     if "running" not in st.session_state:
         st.session_state.running = False
@@ -126,6 +263,9 @@ def _init_session_state():
     if "baseline_success" not in st.session_state:
         st.session_state.baseline_success = False
 
+    if "baseline_leaderboard" not in st.session_state:
+        st.session_state.baseline_leaderboard = None
+
     if "actions" not in st.session_state:
         st.session_state.actions = None
 
@@ -138,12 +278,18 @@ def _init_session_state():
     if "workflow_success" not in st.session_state:
         st.session_state.workflow_success = False
 
+    if "full_data_run" not in st.session_state:
+        st.session_state.full_data_run = None
+
     if "optimization_codes" not in st.session_state:
         st.session_state.optimization_codes = None
 
     if "optimization_success" not in st.session_state:
         st.session_state.optimization_success = False
 
+    if "optimization_trials" not in st.session_state:
+        st.session_state.optimization_trials = None
+
     # 初始化错误消息状态
     if "error_message" not in st.session_state:
         st.session_state.error_message = None
@@ -165,6 +311,7 @@ def show():
     monitor = _init_session_state()
 
     st.title("传统机器学习")
+    render_interpreter_pool_stats()
 
     # 创建选项卡
     tab1, tab2, tab3, tab4 = st.tabs(["🤖 智能体配置", "📈结果查看", "🔍 模型解释", "💬 AI助手"])
@@ -190,6 +337,8 @@ def show():
 
         st.session_state.data_config = data_config
 
+        render_run_history(TaskType.ML.value, on_load=load_previous_run, key="ml_run_history")
+
         # 选择运行模式
         st.subheader("运行模式")
 
@@ -222,6 +371,7 @@ def show():
         # 显示结果组件
         if "graph_state" in st.session_state:
             display_results(st.session_state.graph_state)
+            monitor.show_resource_usage()
         else:
             st.warning("请先上传数据并运行训练过程")
 
@@ -245,8 +395,14 @@ def show():
                 model_prefix = "best"
                 data_prefix = "workflow"
 
-        data_path = get_saved_pickle_path(name=name, file_prefix=data_prefix, type="data")
-        model_path = get_saved_pickle_path(name=name, file_prefix=model_prefix, type="model")
+        # 加载的历史运行使用随运行保存的 pickle 副本
+        record = get_run_store().get(st.session_state.loaded_run_id) if st.session_state.get("loaded_run_id") else None
+        data_path = (record and latest_artifact(record, "data", data_prefix)) or get_saved_pickle_path(
+            name=name, file_prefix=data_prefix, type="data"
+        )
+        model_path = (record and latest_artifact(record, "model", model_prefix)) or get_saved_pickle_path(
+            name=name, file_prefix=model_prefix, type="model"
+        )
         create_shap_analysis(
             title=title,
             model_path=model_path,
@@ -285,12 +441,8 @@ def _display_logs(monitor, md_log_container, require_result=False):
         md_log_container: 日志显示容器
         require_result: 是否需要等待结果完成才显示日志
     """
-    if st.session_state.runned:
-        latest_log = monitor._get_latest_log_file()
-        if latest_log and (not require_result or st.session_state.result):
-            content, _ = monitor._read_log_file(latest_log)
-        if content:
-            monitor._display_log_content(content, md_log_container)
+    if st.session_state.runned and (not require_result or st.session_state.result):
+        monitor._display_final_log(md_log_container)
 
 
 def show_auto_mode(monitor, lock, run, restart):
@@ -307,48 +459,54 @@ def show_auto_mode(monitor, lock, run, restart):
     log_container = st.empty()
     md_log_container = log_container.empty()
 
-    if st.session_state.running:
-        if st.session_state.result is None:
-            st.success("智能体已启动！")
-
-        # 显示实时日志
-        _display_logs(monitor, md_log_container, require_result=False)
-
-        st.session_state.result = asyncio.run(
-            monitor.start_training(
+    manager = get_job_manager()
+    job = manager.get(st.session_state.get("ml_job_id")) or manager.get(st.query_params.get("job"))
+    if job is None and not st.session_state.running:
+        # 刷新页面后重新连接仍在运行的任务
+        job = manager.latest(owner=get_client_id(), kind=TaskType.ML.value, active_only=True)
+    if st.session_state.running and (job is None or job.id == st.session_state.get("ml_handled_job_id")):
+        try:
+            job = monitor.submit_training(
                 task_type=TaskType.ML.value,
                 config=st.session_state.data_config,
                 code_interpreter=st.session_state.code_interpreter,
+                owner=get_client_id(),
                 auto=True,  # 自动模式
             )
-        )
+        except AdmissionError as e:
+            st.warning(str(e))
+            st.session_state.running = False
+            return
+        st.query_params["job"] = job.id
+    if job is not None:
+        st.session_state.ml_job_id = job.id
+        st.session_state.running = job.id != st.session_state.get("ml_handled_job_id")
+
+    if st.session_state.running:
+        if st.session_state.result is None:
+            st.success("智能体已启动！")
+
+        # 显示任务状态和实时日志，任务结束后页面会自动重新运行
+        with md_log_container.container():
+            monitor.show_job_progress(job)
+        if not job.finished:
+            return
+
+        st.session_state.ml_handled_job_id = job.id
+        st.session_state.result = None
+        state_values = monitor.attach_job(job)
+        if state_values is not None:
+            st.session_state.result = monitor.result
 
         st.session_state.runned = True
 
         # 提取并保存各个模型状态
         if st.session_state.result:
-            state_values = monitor.app.get_state(st.session_state.data_config).values
-            st.session_state.baseline_codes = state_values.get("baseline_codes", [])
-            st.session_state.baseline_success = state_values.get("baseline_success", False)
-            st.session_state.actions = state_values.get("actions", [])
-            st.session_state.action_success = state_values.get("action_success", False)
-            st.session_state.workflow_codes = state_values.get("workflow_codes", [])
-            st.session_state.workflow_success = state_values.get("workflow_success", False)
-            st.session_state.optimization_codes = state_values.get("optimization_codes", [])
-            st.session_state.optimization_success = state_values.get("optimization_success", False)
+            _store_state_values(state_values)
+            st.session_state.loaded_run_id = None
 
         # Store the graph state
-        st.session_state.graph_state = {
-            "messages": [],
-            "baseline_codes": st.session_state.baseline_codes,
-            "baseline_success": st.session_state.baseline_success,
-            "actions": st.session_state.actions,
-            "action_success": st.session_state.action_success,
-            "workflow_codes": st.session_state.workflow_codes,
-            "workflow_success": st.session_state.workflow_success,
-            "optimization_codes": st.session_state.optimization_codes,
-            "optimization_success": st.session_state.optimization_success,
-        }
+        _store_graph_state()
         st.session_state.running = False
         st.session_state.helper_ready = True
     else:
@@ -373,12 +531,15 @@ def show_manual_mode(monitor, lock, restart):
     st.markdown("### 手动模式")
     st.markdown("手动逐步执行机器学习流程")
 
-    # 初始化状态
+    # 初始化状态，刷新页面后从检查点恢复已完成的步骤
     if "current_step" not in st.session_state:
-        st.session_state.current_step = 0
+        st.session_state.step_status = [False] * 4
+        st.session_state.current_step = _restore_manual_steps(monitor)
     if "step_status" not in st.session_state:
         st.session_state.step_status = [False] * 4  # 4个步骤的状态
 
+    _manual_run_id()
+
     # 显示错误消息（如果存在）
     if st.session_state.error_message:
         st.error(st.session_state.error_message)
@@ -390,6 +551,7 @@ def show_manual_mode(monitor, lock, restart):
             "messages": [],
             "baseline_codes": st.session_state.baseline_codes,
             "baseline_success": st.session_state.baseline_success,
+            "baseline_leaderboard": st.session_state.baseline_leaderboard or [],
             "actions": st.session_state.actions or [],
             "workflow_codes": st.session_state.workflow_codes or [],
         }
@@ -404,7 +566,12 @@ def show_manual_mode(monitor, lock, restart):
 
     # 创建步骤条
     if "stepper" not in st.session_state:
-        st.session_state.stepper = StepperBar(steps, 0, reset_func=restart)
+        st.session_state.stepper = StepperBar(
+            steps,
+            st.session_state.current_step,
+            reset_func=restart,
+            progress_func=lambda: st.session_state.monitor.step_progress(),
+        )
 
     # 显示步骤条
     stepper = st.session_state.stepper
@@ -444,19 +611,24 @@ async def run_baseline_builder():
                 code_interpreter=st.session_state.code_interpreter,
                 auto=False,
                 start_builder="baseline_builder",
+                run_id=st.session_state.manual_run_id,
+                owner=get_client_id(),
             )
             st.session_state.runned = True
             if result:
                 # 保存基线模型的状态
-                state_values = st.session_state.monitor.app.get_state(st.session_state.data_config).values
+                state_values = st.session_state.monitor.state_values()
                 st.session_state.baseline_codes = state_values.get("baseline_codes", [])
                 st.session_state.baseline_success = state_values.get("baseline_success", False)
+                # 并行候选模式下的排行榜，单个基线时为空
+                st.session_state.baseline_leaderboard = state_values.get("baseline_leaderboard", [])
 
                 # 初始化 graph_state
                 st.session_state.graph_state = {
                     "messages": [],
                     "baseline_codes": st.session_state.baseline_codes,
                     "baseline_success": st.session_state.baseline_success,
+                    "baseline_leaderboard": st.session_state.baseline_leaderboard,
                 }
                 st.session_state.helper_ready = True
                 st.session_state.result = result
@@ -488,12 +660,14 @@ async def run_action_builder():
                 code_interpreter=st.session_state.code_interpreter,
                 auto=False,
                 start_builder="action_builder",
+                run_id=st.session_state.manual_run_id,
                 baseline_codes=st.session_state.baseline_codes,
+                owner=get_client_id(),
             )
             st.session_state.runned = True
             if result:
                 # 保存行动构建器的状态
-                state_values = st.session_state.monitor.app.get_state(st.session_state.data_config).values
+                state_values = st.session_state.monitor.state_values()
                 st.session_state.actions = state_values.get("actions", [])
                 st.session_state.action_success = state_values.get("action_success", False)
 
@@ -538,15 +712,18 @@ async def run_workflow_builder():
                 code_interpreter=st.session_state.code_interpreter,
                 auto=False,
                 start_builder="workflow_builder",
+                run_id=st.session_state.manual_run_id,
                 baseline_codes=st.session_state.baseline_codes,
                 actions=st.session_state.actions,
+                owner=get_client_id(),
             )
             st.session_state.runned = True
             if result:
                 # 保存工作流构建器的状态
-                state_values = st.session_state.monitor.app.get_state(st.session_state.data_config).values
+                state_values = st.session_state.monitor.state_values()
                 st.session_state.workflow_codes = state_values.get("workflow_codes", [])
                 st.session_state.workflow_success = state_values.get("workflow_success", False)
+                st.session_state.full_data_run = st.session_state.monitor.full_data_run
 
                 # 更新 graph_state
                 if "graph_state" in st.session_state:
@@ -554,6 +731,7 @@ async def run_workflow_builder():
                         {
                             "workflow_codes": st.session_state.workflow_codes,
                             "workflow_success": st.session_state.workflow_success,
+                            "full_data_run": st.session_state.full_data_run,
                         }
                     )
                 st.session_state.result = result
@@ -585,20 +763,24 @@ async def run_optimization_builder():
                 code_interpreter=st.session_state.code_interpreter,
                 auto=False,
                 start_builder="optimization_builder",
+                run_id=st.session_state.manual_run_id,
                 workflow_codes=st.session_state.workflow_codes,
+                owner=get_client_id(),
             )
 
             st.session_state.runned = True
             if result:
-                state_values = st.session_state.monitor.app.get_state(st.session_state.data_config).values
+                state_values = st.session_state.monitor.state_values()
                 st.session_state.optimization_codes = state_values.get("optimization_codes", [])
                 st.session_state.optimization_success = state_values.get("optimization_success", False)
+                st.session_state.optimization_trials = state_values.get("optimization_trials", {})
                 # 更新 graph_state
                 if "graph_state" in st.session_state:
                     st.session_state.graph_state.update(
                         {
                             "optimization_codes": st.session_state.optimization_codes,
                             "optimization_success": st.session_state.optimization_success,
+                            "optimization_trials": st.session_state.optimization_trials,
                         }
                     )
                 st.session_state.result = result
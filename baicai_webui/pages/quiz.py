@@ -6,6 +6,7 @@ from baicai_base.utils.data import get_saved_user_info_path
 from baicai_webui.components.model import get_page_llm
 from baicai_webui.components.right_sidebar import show_right_sidebar
 from baicai_webui.components.tutor import multi_choice_questions, select_book_chapters
+from baicai_webui.services import llm_scope
 
 
 def show():
@@ -58,16 +59,17 @@ def show():
                 st.session_state.generated_questions = None
                 st.rerun()
 
-        multi_choice_questions(
-            llm=llm,
-            subject=st.session_state.subject,
-            grade=st.session_state.grade,
-            background=st.session_state.background,
-            profile=st.session_state.profile,
-            charpt_name=st.session_state.chapter_name,
-            keywords=st.session_state.keywords,
-            summary=st.session_state.summary,
-        )
+        with llm_scope(feature="tutor"):
+            multi_choice_questions(
+                llm=llm,
+                subject=st.session_state.subject,
+                grade=st.session_state.grade,
+                background=st.session_state.background,
+                profile=st.session_state.profile,
+                charpt_name=st.session_state.chapter_name,
+                keywords=st.session_state.keywords,
+                summary=st.session_state.summary,
+            )
 
     # Right sidebar
     with right_sidebar:
@@ -1,11 +1,18 @@
+import hashlib
+import io
+import json
+import os
+
 import matplotlib.pyplot as plt
 import streamlit as st
 from baicai_dev.utils.data import TaskType
 from fastai.vision.all import *
 
+from baicai_webui.components.artifacts import get_artifact_store, run_with_artifacts
 from baicai_webui.components.base_page import BasePage
-from baicai_webui.components.image_viewer import ImageViewer
+from baicai_webui.components.image_viewer import ImageViewer, get_dataset_index
 from baicai_webui.components.model import vision_uploader
+from baicai_webui.services import label_files, summarize_validation, validate_images
 
 
 def get_config(key=None):
@@ -45,6 +52,52 @@ def check_original_images():
         image_viewer.show()
 
 
+def check_dataset_quality():
+    """检查数据集中的损坏文件、尺寸分布、通道模式、重复图片和类别不平衡"""
+    image_path = get_config("path")
+    if not image_path or not os.path.isdir(image_path):
+        return
+
+    with st.expander("数据集检查"):
+        strict = st.checkbox("完整解码图片（更慢，但能发现截断的文件）", value=False)
+        if st.button("检查数据集", key="validate_dataset_button"):
+            index = get_dataset_index(image_path)
+            with st.spinner("正在检查图片..."):
+                st.session_state.validation_report = (image_path, strict, validate_images(index, strict=strict))
+
+        cached = st.session_state.get("validation_report")
+        if not cached or cached[0] != image_path or cached[1] != strict:
+            return
+
+        report = cached[2]
+        summary = summarize_validation(report, get_dataset_index(image_path).class_counts())
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("图片数量", summary["num_images"])
+        col2.metric("损坏/不支持", len(summary["invalid"]))
+        col3.metric("重复图片", len(summary["duplicates"]))
+        col4.metric("类别不平衡比", f"{summary['imbalance']:.1f}" if summary["imbalance"] else "-")
+
+        if not summary["invalid"].empty:
+            st.error("以下文件无法读取，训练时可能出错：")
+            st.dataframe(summary["invalid"], use_container_width=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("宽高比分布")
+            st.bar_chart(summary["aspect_ratios"])
+        with col2:
+            st.write("通道模式")
+            st.bar_chart(summary["modes"])
+
+        st.write("最常见的图片尺寸（宽 × 高）")
+        st.dataframe(summary["sizes"].head(10).reset_index(), use_container_width=True)
+
+        if not summary["duplicates"].empty:
+            st.warning("以下图片内容完全相同：")
+            st.dataframe(summary["duplicates"], use_container_width=True)
+
+
 def check_dls(train=True, batch_size=4):
     # 使用 session_state 来保持展开状态
     if "show_dls_expander" not in st.session_state:
@@ -61,35 +114,81 @@ def check_dls(train=True, batch_size=4):
             nrows = st.number_input("行数", value=1, min_value=1, max_value=batch_size // max_n, step=1)
             image_size = st.number_input("图片大小", value=28, min_value=1, max_value=228, step=1)
 
-            resize_method = None
-            pad_mode = None
-            min_scale = None
-            item_tfms = None
             unique = False
             if resize == "固定缩放":
                 resize_method = st.radio("缩放方法", ["squish", "pad", "crop", "mro"], horizontal=True)
                 pad_mode = st.radio("填充模式", ["zeros", "reflection"], horizontal=True)
-                item_tfms = Resize(image_size, resize_method, pad_mode)
+                tfms_spec = ("resize", image_size, resize_method, pad_mode)
 
             elif resize == "随机剪裁":
                 unique = st.checkbox("显示同一张图片的变换", value=True)
                 min_scale = st.number_input("最小缩放比例", value=0.3, min_value=0.1, max_value=1.0, step=0.01)
-                item_tfms = RandomResizedCrop(image_size, min_scale=min_scale)
+                tfms_spec = ("crop", image_size, min_scale)
 
             if st.form_submit_button("Show Batch"):
-                dls = load_data(item_tfms=item_tfms)
-                # Get the appropriate dataloader
-                loader = dls.train if train else dls.valid
+                image_path = get_config("path")
+                index_version = get_dataset_index(image_path).version if os.path.isdir(image_path) else ""
+                try:
+                    png = render_batch(index_version, get_config_key(), tfms_spec, train, max_n, nrows, unique)
+                except ValueError as e:
+                    st.error(str(e))
+                    return
+                st.image(png, use_container_width=True)
+
+
+def get_config_key() -> str:
+    """当前数据配置的稳定哈希，用作 DataLoaders 缓存的键"""
+    return hashlib.md5(json.dumps(get_config(), sort_keys=True, default=str).encode()).hexdigest()
+
+
+def build_item_tfms(tfms_spec: tuple) -> list:
+    """根据缩放设置创建 item_tfms"""
+    kind, image_size, *params = tfms_spec
+    if kind == "resize":
+        resize_method, pad_mode = params
+        return [Resize(image_size, resize_method, pad_mode)]
+    return [RandomResizedCrop(image_size, min_scale=params[0])]
 
-                # Create a figure and axes
-                fig, ax = plt.subplots(nrows, max_n // nrows)
 
-                # Use fastai's show_batch with our custom figure
-                loader.show_batch(max_n=max_n, nrows=nrows, ctxs=ax, unique=unique)
+@st.cache_resource(show_spinner="正在加载数据...", max_entries=4)
+def load_base_dls(index_version: str, config_key: str):
+    """按 (索引版本, 数据配置) 缓存不含 item_tfms 的 DataLoaders
 
-                # Display in Streamlit
-                st.pyplot(fig)
-                plt.close(fig)
+    标签、数据集划分等耗时步骤只做一次，调整缩放方式时只替换 item 变换。
+    """
+    return load_data()
+
+
+def with_item_tfms(loader, tfms_spec: tuple):
+    """基于已缓存的 DataLoader 替换 item 变换，不重新构建数据集"""
+    return loader.new(after_item=Pipeline([*build_item_tfms(tfms_spec), ToTensor()]))
+
+
+@st.cache_data(show_spinner="正在生成批次预览...", max_entries=32)
+def render_batch(
+    index_version: str, config_key: str, tfms_spec: tuple, train: bool, max_n: int, nrows: int, unique: bool
+) -> bytes:
+    """按缩放设置和显示参数缓存批次预览图片（PNG）"""
+    dls = load_base_dls(index_version, config_key)
+    # Get the appropriate dataloader
+    loader = with_item_tfms(dls.train if train else dls.valid, tfms_spec)
+
+    # Create a figure and axes
+    fig, ax = plt.subplots(nrows, max_n // nrows)
+    try:
+        # Use fastai's show_batch with our custom figure
+        loader.show_batch(max_n=max_n, nrows=nrows, ctxs=ax, unique=unique)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", bbox_inches="tight")
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+@st.cache_data(show_spinner="正在标注图片...", max_entries=8)
+def get_file_labels(image_path: str, index_version: str, label_func: str) -> dict:
+    """按 (数据集, 索引版本, 标注函数) 缓存全部图片的标签"""
+    return label_files(label_func, get_dataset_index(image_path).image_files())
 
 
 def load_data(item_tfms=None):
@@ -137,23 +236,17 @@ def load_data(item_tfms=None):
         )
     elif task_type == TaskType.VISION_FUNC.value:
         # 函数标注的分类 - 使用自定义函数从文件名或路径提取标签
-
-        def label_func(x):
-            func_str = get_config("label_func")
-            # Create a function from the string and execute it
-            func_code = f"def temp_func(x):\n    {func_str}\n"
-            namespace = {}
-            exec(func_code, namespace)
-            return namespace["temp_func"](x)
-
+        # 标注函数只编译一次，并对全部图片预先标注，DataLoaders 直接查表
+        index = get_dataset_index(image_path)
+        labels = get_file_labels(image_path, index.version, get_config("label_func"))
         dls = ImageDataLoaders.from_path_func(
-            path=image_path, fnames=get_image_files(image_path), label_func=label_func, **common_params
+            path=image_path, fnames=list(labels), label_func=labels.__getitem__, **common_params
         )
     elif task_type == TaskType.VISION_RE.value:
         # 正则表达式标注的分类 - 使用正则表达式从文件名提取标签
         dls = ImageDataLoaders.from_name_re(
             path=image_path,
-            fnames=get_image_files(image_path),
+            fnames=get_dataset_index(image_path).image_files(),
             pat=get_config("pat"),
             **common_params,
         )
@@ -175,6 +268,7 @@ def pre_train():
     with container.container():
         if st.session_state.data_config:
             check_original_images()
+            check_dataset_quality()
             check_dls(batch_size=get_config("batch_size"))
 
 
@@ -195,19 +289,6 @@ async def post_train(code_interpreter):
             gc.collect()
             
             code = """
-import base64
-from io import BytesIO
-def fig_to_base64(fig):
-    # Save the figure to a temporary buffer with high DPI
-    buf = BytesIO()
-    fig.savefig(buf, format='png', dpi=300, bbox_inches='tight', pad_inches=0.1)
-    buf.seek(0)
-    # Encode the bytes as base64
-    img_base64 = base64.b64encode(buf.getvalue()).decode('utf-8')
-    buf.close()
-    return img_base64
-
-
 import torch
 import matplotlib.pyplot as plt
 import numpy as np
@@ -275,10 +356,7 @@ def visualize_tensor_images(tensor_images, titles=None, rows=1, cols=1):
     # Adjust layout
     plt.tight_layout()
 
-    base64_string = fig_to_base64(fig)
-    print("START_BASE64")
-    print(base64_string)
-    print("END_BASE64")
+    save_artifact(fig, name="top_losses")
     plt.close(fig)
 
 try:
@@ -300,35 +378,21 @@ except Exception as e:
             import asyncio
             try:
                 result = await asyncio.wait_for(
-                    code_interpreter.run(code, ignore_keep_len=True),
+                    run_with_artifacts(code_interpreter, code, ignore_keep_len=True),
                     timeout=60.0  # 60秒超时
                 )
-                
-                # 检查结果是否包含base64数据
+
+                # 图片通过产物目录返回，输出中只包含图片路径
                 if result and len(result) > 0:
-                    base64_start = result[0].find("START_BASE64")
-                    base64_end = result[0].find("END_BASE64")
-                    
-                    if base64_start != -1 and base64_end != -1:
-                        base64_string = result[0][base64_start + len("START_BASE64") : base64_end].strip()
-                        
-                        if base64_string:
-                            img_container = f"""
-                                <div style="width:100%; overflow:auto; margin:10px 0;">
-                                    <img src="data:image/png;base64,{base64_string}"
-                                            style="max-width:100%; height:auto; display:block; margin:0 auto;"
-                                            onerror="this.style.display='none'"/>
-                                </div>
-                                """
-                            st.subheader("损失值最大的若干图片")
-                            st.markdown(img_container, unsafe_allow_html=True)
-                        else:
-                            st.warning("未能生成图片数据")
+                    figures = get_artifact_store().figures(result[0])
+                    if figures:
+                        st.subheader("损失值最大的若干图片")
+                        st.image(str(figures[-1]), use_container_width=True)
                     else:
                         st.warning("代码执行完成，但未找到图片数据")
                 else:
                     st.warning("代码执行完成，但未返回结果")
-                    
+
             except asyncio.TimeoutError:
                 st.error("代码执行超时，请检查代码是否有死循环或长时间运行的操作")
             except Exception as e:
@@ -0,0 +1,201 @@
+from .artifacts import (
+    ARTIFACT_MARKER,
+    ARTIFACT_TTL,
+    DEFAULT_FIGURE_DPI,
+    DEFAULT_FIGURE_FORMAT,
+    ArtifactStore,
+    artifact_prelude,
+    load_artifact,
+    parse_artifact_handles,
+    strip_artifact_handles,
+    sweep_artifacts,
+)
+from .async_runner import AsyncRunner, get_async_runner, run_async
+from .cancellation import RunTimeouts, cell_timeout, interrupt_interpreter, run_with_deadline, wait_interruptible
+from .candidates import (
+    CANDIDATE_FAMILIES,
+    DEFAULT_CANDIDATES,
+    candidate_code,
+    leaderboard_markdown,
+    parse_metrics,
+    promote_winner,
+    rank_candidates,
+    run_candidates,
+)
+from .checkpoints import CHECKPOINT_TTL, SQLiteCheckpointSaver, get_checkpointer
+from .dataset_index import IMAGE_EXTENSIONS, ImageDatasetIndex
+from .dev_sample import (
+    DEFAULT_DEV_SAMPLE_ROWS,
+    DEV_SAMPLE_THRESHOLD,
+    ensure_dev_sample,
+    ensure_parquet_snapshot,
+    full_data_code,
+    full_data_path,
+    full_data_workflow_code,
+    saved_data_path,
+    stratified_sample,
+    use_dev_sample,
+)
+from .fanout import DEFAULT_FANOUT_CONCURRENCY, DEFAULT_FANOUT_TIMEOUT, run_isolated
+from .image_validation import summarize_validation, validate_image, validate_images
+from .interpreter_pool import InterpreterPool, get_interpreter_pool
+from .jobs import Job, JobManager, JobStatus, get_job_manager
+from .labeling import compile_label_func, label_files, validate_label_func
+from .llm_accounting import (
+    LLM_CALL_COLUMNS,
+    LLMCallLog,
+    LLMCallRecorder,
+    get_llm_call_log,
+    install_llm_accounting,
+    instrument_llm,
+    llm_call_frame,
+    llm_scope,
+    llm_usage_summary,
+)
+from .loaders import (
+    COLUMNAR_LOADER_PRELUDE,
+    COLUMNAR_SUFFIXES,
+    DTYPE_TRANSFORMS,
+    apply_dtype_transforms,
+    columnar_copy,
+    load_table,
+    register_columnar_loaders,
+    table_schema,
+)
+from .resources import DEFAULT_SAMPLE_INTERVAL, ResourceSampler, kernel_pid, resource_frame, usage_summary
+from .run_events import (
+    GraphEventCallback,
+    RunEvents,
+    epoch_metrics_frame,
+    llm_usage_frame,
+    load_run_events,
+    node_timeline_frame,
+    parse_epoch_metrics,
+)
+from .run_logs import RunLog, current_run_log, install_run_log_capture
+from .run_store import (
+    RunRecord,
+    RunStore,
+    collect_pickles,
+    dataset_fingerprint,
+    get_run_store,
+    latest_artifact,
+    summarize_state,
+)
+from .scheduler import DEFAULT_JOB_CLASSES, AdmissionError, JobClass, ResourceScheduler, job_class_for
+from .sqlite_source import SQLiteSource, ensure_sqlite_extract
+from .thumbnails import THUMBNAIL_MAX_EDGE, ThumbnailCache, make_thumbnail
+from .trials import TRIAL_TEARDOWN, TrialBudget, load_trials, trial_prelude, trials_markdown
+
+__all__ = [
+    "ARTIFACT_MARKER",
+    "ARTIFACT_TTL",
+    "AdmissionError",
+    "ArtifactStore",
+    "AsyncRunner",
+    "CANDIDATE_FAMILIES",
+    "CHECKPOINT_TTL",
+    "COLUMNAR_LOADER_PRELUDE",
+    "COLUMNAR_SUFFIXES",
+    "DEFAULT_CANDIDATES",
+    "DEFAULT_DEV_SAMPLE_ROWS",
+    "DEFAULT_FANOUT_CONCURRENCY",
+    "DEFAULT_FANOUT_TIMEOUT",
+    "DEFAULT_FIGURE_DPI",
+    "DEFAULT_FIGURE_FORMAT",
+    "DEFAULT_JOB_CLASSES",
+    "DEFAULT_SAMPLE_INTERVAL",
+    "DEV_SAMPLE_THRESHOLD",
+    "DTYPE_TRANSFORMS",
+    "GraphEventCallback",
+    "IMAGE_EXTENSIONS",
+    "ImageDatasetIndex",
+    "InterpreterPool",
+    "Job",
+    "JobClass",
+    "JobManager",
+    "JobStatus",
+    "LLMCallLog",
+    "LLMCallRecorder",
+    "LLM_CALL_COLUMNS",
+    "ResourceSampler",
+    "ResourceScheduler",
+    "RunEvents",
+    "RunLog",
+    "RunRecord",
+    "RunStore",
+    "RunTimeouts",
+    "SQLiteCheckpointSaver",
+    "SQLiteSource",
+    "THUMBNAIL_MAX_EDGE",
+    "TRIAL_TEARDOWN",
+    "ThumbnailCache",
+    "TrialBudget",
+    "apply_dtype_transforms",
+    "artifact_prelude",
+    "candidate_code",
+    "cell_timeout",
+    "collect_pickles",
+    "columnar_copy",
+    "compile_label_func",
+    "current_run_log",
+    "dataset_fingerprint",
+    "ensure_dev_sample",
+    "ensure_parquet_snapshot",
+    "ensure_sqlite_extract",
+    "epoch_metrics_frame",
+    "full_data_code",
+    "full_data_path",
+    "full_data_workflow_code",
+    "get_async_runner",
+    "get_checkpointer",
+    "get_interpreter_pool",
+    "get_job_manager",
+    "get_llm_call_log",
+    "get_run_store",
+    "install_llm_accounting",
+    "install_run_log_capture",
+    "instrument_llm",
+    "interrupt_interpreter",
+    "job_class_for",
+    "kernel_pid",
+    "label_files",
+    "latest_artifact",
+    "leaderboard_markdown",
+    "llm_call_frame",
+    "llm_scope",
+    "llm_usage_frame",
+    "llm_usage_summary",
+    "load_artifact",
+    "load_run_events",
+    "load_table",
+    "load_trials",
+    "make_thumbnail",
+    "node_timeline_frame",
+    "parse_artifact_handles",
+    "parse_epoch_metrics",
+    "parse_metrics",
+    "promote_winner",
+    "rank_candidates",
+    "register_columnar_loaders",
+    "resource_frame",
+    "run_async",
+    "run_candidates",
+    "run_isolated",
+    "run_with_deadline",
+    "saved_data_path",
+    "stratified_sample",
+    "strip_artifact_handles",
+    "summarize_state",
+    "summarize_validation",
+    "sweep_artifacts",
+    "table_schema",
+    "trial_prelude",
+    "trials_markdown",
+    "usage_summary",
+    "use_dev_sample",
+    "validate_image",
+    "validate_images",
+    "validate_label_func",
+    "wait_interruptible",
+]
@@ -0,0 +1,180 @@
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ARTIFACT_MARKER = "BAICAI_ARTIFACT::"
+
+DEFAULT_FIGURE_DPI = 150
+DEFAULT_FIGURE_FORMAT = "png"
+# 会话产物目录超过该时长（秒）没有新产物时视为已废弃，由 sweep_artifacts 删除
+ARTIFACT_TTL = float(os.environ.get("BAICAI_ARTIFACT_TTL", 24 * 3600))
+
+# 在代码解释器内核中执行，定义 save_artifact/save_current_figure
+# 产物直接写入共享的产物目录，标准输出中只打印一行句柄（路径和类型），不再传输 base64
+_PRELUDE_TEMPLATE = '''
+def _baicai_artifact_setup(artifact_dir, dpi, fmt, marker):
+    import json as _json
+    import uuid as _uuid
+    from pathlib import Path as _Path
+
+    _dir = _Path(artifact_dir)
+
+    def _figure_of(obj):
+        """obj 本身或其 figure/fig 属性中可以 savefig 的图表，没有时返回 None"""
+        for candidate in (obj, getattr(obj, "figure", None), getattr(obj, "fig", None)):
+            if candidate is not None and hasattr(candidate, "savefig"):
+                return candidate
+        return None
+
+    def save_artifact(obj, name=None, dpi=dpi, format=fmt):
+        """把图表、DataFrame 或数组写入产物目录，并打印句柄"""
+        _dir.mkdir(parents=True, exist_ok=True)
+        stem = name or _uuid.uuid4().hex[:12]
+        figure = _figure_of(obj)
+        if figure is not None:
+            path = _dir / f"{{stem}}.{{format}}"
+            figure.savefig(path, format=format, dpi=dpi, bbox_inches="tight", pad_inches=0.1)
+            handle = {{"kind": "figure", "path": str(path), "format": format}}
+        elif hasattr(obj, "to_parquet") and hasattr(obj, "columns"):
+            import pyarrow as _pa
+
+            path = _dir / f"{{stem}}.arrow"
+            table = _pa.Table.from_pandas(obj)
+            with _pa.OSFile(str(path), "wb") as sink, _pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            handle = {{"kind": "table", "path": str(path), "format": "arrow"}}
+        else:
+            import numpy as _np
+
+            path = _dir / f"{{stem}}.npy"
+            _np.save(path, _np.asarray(obj))
+            handle = {{"kind": "array", "path": str(path), "format": "npy"}}
+        print(marker + _json.dumps(handle))
+        return handle
+
+    def save_current_figure(*candidates, **kwargs):
+        """保存第一个可用的图表，没有时保存当前 matplotlib 图表"""
+        for candidate in candidates:
+            if _figure_of(candidate) is not None:
+                return save_artifact(candidate, **kwargs)
+        import matplotlib.pyplot as _plt
+
+        if _plt.get_fignums():
+            return save_artifact(_plt.gcf(), **kwargs)
+        return None
+
+    return save_artifact, save_current_figure
+
+
+save_artifact, save_current_figure = _baicai_artifact_setup({artifact_dir!r}, {dpi!r}, {fmt!r}, {marker!r})
+del _baicai_artifact_setup
+'''
+
+
+def artifact_prelude(artifact_dir, dpi: int = DEFAULT_FIGURE_DPI, fmt: str = DEFAULT_FIGURE_FORMAT) -> str:
+    """生成在代码解释器中定义 save_artifact/save_current_figure 的代码
+
+    Args:
+        artifact_dir: 产物目录，需与界面进程共享同一文件系统
+        dpi: 图表分辨率
+        fmt: 图表格式，如 png、jpg、svg
+    """
+    return _PRELUDE_TEMPLATE.format(artifact_dir=str(artifact_dir), dpi=dpi, fmt=fmt, marker=ARTIFACT_MARKER)
+
+
+def parse_artifact_handles(output: str) -> List[Dict[str, Any]]:
+    """从代码解释器的输出中提取产物句柄"""
+    handles = []
+    for line in (output or "").splitlines():
+        line = line.strip()
+        if line.startswith(ARTIFACT_MARKER):
+            try:
+                handles.append(json.loads(line[len(ARTIFACT_MARKER) :]))
+            except json.JSONDecodeError:
+                continue
+    return handles
+
+
+def strip_artifact_handles(output: str) -> str:
+    """去掉输出中的产物句柄行，保留其余文本"""
+    return "\n".join(line for line in (output or "").splitlines() if not line.strip().startswith(ARTIFACT_MARKER))
+
+
+def load_artifact(handle: Dict[str, Any]) -> Any:
+    """读取产物
+
+    - figure: 返回图片路径，可直接传给 st.image
+    - table: 以内存映射方式读取 Arrow IPC 文件并转换为 DataFrame
+    - array: 以内存映射方式读取 npy 文件
+    """
+    path = Path(handle["path"])
+    kind = handle.get("kind")
+    if kind == "figure":
+        return path
+    if kind == "table":
+        import pyarrow as pa
+
+        with pa.memory_map(str(path), "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+    if kind == "array":
+        import numpy as np
+
+        return np.load(path, mmap_mode="r")
+    raise ValueError(f"不支持的产物类型: {kind}")
+
+
+def _artifact_root() -> Path:
+    from baicai_base.utils.data import get_tmp_folder
+
+    return Path(get_tmp_folder("data")) / "artifacts"
+
+
+def sweep_artifacts(root=None, max_age: float = ARTIFACT_TTL) -> int:
+    """删除超过 ``max_age`` 秒没有新产物的会话目录（浏览器已关闭、不会再调用 clear 的会话）
+
+    目录的修改时间在其中新建文件时更新，因此仍在使用的会话不会被删除。
+
+    Returns:
+        int: 删除的目录数
+    """
+    root = Path(root) if root is not None else _artifact_root()
+    if not root.is_dir():
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in root.iterdir():
+        try:
+            expired = path.is_dir() and path.stat().st_mtime < cutoff
+        except FileNotFoundError:
+            continue
+        if expired:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+class ArtifactStore:
+    """会话级产物目录"""
+
+    def __init__(self, session_id: str, root=None):
+        self.path = Path(root if root is not None else _artifact_root()) / session_id
+
+    def prelude(self, dpi: int = DEFAULT_FIGURE_DPI, fmt: str = DEFAULT_FIGURE_FORMAT) -> str:
+        """生成写入本目录的解释器前置代码"""
+        return artifact_prelude(self.path, dpi=dpi, fmt=fmt)
+
+    def figures(self, output: str) -> List[Path]:
+        """从输出中取出本次生成的图表路径"""
+        return [load_artifact(h) for h in parse_artifact_handles(output) if h.get("kind") == "figure"]
+
+    def latest(self, output: str, kind: Optional[str] = None) -> Any:
+        """读取输出中最后一个（指定类型的）产物，没有时返回 None"""
+        handles = [h for h in parse_artifact_handles(output) if kind is None or h.get("kind") == kind]
+        return load_artifact(handles[-1]) if handles else None
+
+    def clear(self) -> None:
+        """删除本会话的全部产物"""
+        shutil.rmtree(self.path, ignore_errors=True)
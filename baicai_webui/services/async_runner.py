@@ -0,0 +1,128 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+from typing import Any, Awaitable, Coroutine, Optional
+
+try:
+    from streamlit.runtime.scriptrunner_utils.script_run_context import SCRIPT_RUN_CONTEXT_ATTR_NAME
+except ImportError:  # pragma: no cover - 旧版本 Streamlit
+    SCRIPT_RUN_CONTEXT_ATTR_NAME = "streamlit_script_run_ctx"
+
+
+class _ScriptContextBound:
+    """在每次恢复协程执行前把调用方的 ScriptRunContext 绑定到事件循环线程
+
+    Streamlit 通过线程属性查找当前会话，多个会话的协程在同一个事件循环线程中
+    交替执行，因此需要在每一步切换，执行完后恢复原值。
+    """
+
+    def __init__(self, coro: Coroutine, script_ctx: Any):
+        self._coro = coro
+        self._script_ctx = script_ctx
+
+    def __await__(self):
+        thread = threading.current_thread()
+        value, error = None, None
+        while True:
+            previous = getattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+            setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, self._script_ctx)
+            try:
+                yielded = self._coro.throw(error) if error is not None else self._coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, previous)
+            try:
+                value, error = (yield yielded), None
+            except BaseException as e:
+                value, error = None, e
+
+
+async def _bound(coro: Coroutine, script_ctx: Any):
+    return await _ScriptContextBound(coro, script_ctx)
+
+
+class AsyncRunner:
+    """进程级后台事件循环
+
+    所有组件共用一个常驻事件循环线程来执行 LLM 调用、图运行和代码解释器调用，
+    这样 HTTP 客户端、解释器连接等异步资源可以在多次重新运行、多个会话之间复用，
+    而不是每次 ``asyncio.run`` 都新建并关闭事件循环。
+    """
+
+    def __init__(self, name: str = "baicai-async-runner"):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name=name, daemon=True)
+        self._thread.start()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def submit(self, coro: Coroutine, bind_script_ctx: bool = True) -> concurrent.futures.Future:
+        """提交协程，立即返回 concurrent.futures.Future
+
+        Args:
+            coro: 要执行的协程
+            bind_script_ctx: 是否让协程中的 Streamlit 调用写入调用方所在的会话
+
+        协程在调用方 contextvars 的副本中运行；取消返回的 Future 会取消协程。
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("不能在事件循环线程中同步等待协程，请直接 await")
+
+        script_ctx = None
+        if bind_script_ctx:
+            script_ctx = getattr(threading.current_thread(), SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+        if script_ctx is not None:
+            coro = _bound(coro, script_ctx)
+
+        context = contextvars.copy_context()
+
+        async def _run():
+            return await asyncio.get_running_loop().create_task(coro, context=context)
+
+        return asyncio.run_coroutine_threadsafe(_run(), self._loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """提交协程并阻塞等待结果，用于替代 ``asyncio.run``"""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self) -> None:
+        """停止事件循环线程"""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+_runner: Optional[AsyncRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_async_runner() -> AsyncRunner:
+    """获取进程级共享的事件循环"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = AsyncRunner()
+        return _runner
+
+
+def run_async(awaitable: Awaitable, timeout: Optional[float] = None) -> Any:
+    """在共享事件循环中运行协程并等待结果"""
+    if not asyncio.iscoroutine(awaitable):
+        awaitable = _await(awaitable)
+    return get_async_runner().run(awaitable, timeout=timeout)
+
+
+async def _await(awaitable: Awaitable) -> Any:
+    return await awaitable
@@ -0,0 +1,120 @@
+import asyncio
+import concurrent.futures
+import inspect
+import logging
+import os
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Mapping, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class RunTimeouts(NamedTuple):
+    """运行的墙钟时长上限
+
+    Attributes:
+        run: 整个运行（数据准备、图运行和完整数据重新训练）的时长上限（秒），0 表示不限制
+        node: 解释器中单次代码执行（一个节点运行的代码单元）的时长上限（秒），0 表示不限制
+    """
+
+    run: float = float(os.environ.get("BAICAI_RUN_TIMEOUT", 0))
+    node: float = float(os.environ.get("BAICAI_NODE_TIMEOUT", 600))
+
+    @classmethod
+    def from_config(cls, configurable: Mapping[str, Any]) -> "RunTimeouts":
+        """从运行配置读取 run_timeout、node_timeout，缺省时使用环境变量 BAICAI_RUN_TIMEOUT、BAICAI_NODE_TIMEOUT"""
+        default = cls()
+        return cls(
+            run=max(0.0, float(configurable.get("run_timeout", default.run) or 0)),
+            node=max(0.0, float(configurable.get("node_timeout", default.node) or 0)),
+        )
+
+
+@contextmanager
+def cell_timeout(interpreter: Any, seconds: float):
+    """在上下文中把解释器单个代码单元的超时设为 ``seconds`` 秒，退出时恢复原值
+
+    超时后解释器会中断内核并返回失败，节点可以据此进入调试或结束。``seconds`` 为 0 时不限制。
+    """
+    client = getattr(interpreter, "nb_client", None)
+    if client is None:
+        yield
+        return
+    timeout = seconds or None
+    previous = (getattr(interpreter, "timeout", None), client.timeout)
+    interpreter.timeout, client.timeout = timeout, timeout
+    try:
+        yield
+    finally:
+        # 内核崩溃后解释器会新建 nb_client，恢复到当前的客户端上
+        interpreter.timeout, interpreter.nb_client.timeout = previous
+
+
+async def interrupt_interpreter(interpreter: Any, timeout: float = 5.0) -> bool:
+    """中断解释器内核中正在执行的代码，内核和其中的变量保留，之后可以继续使用
+
+    Returns:
+        bool: 是否发出了中断
+    """
+    kernel_manager = getattr(getattr(interpreter, "nb_client", None), "km", None)
+    if kernel_manager is None:
+        return False
+    try:
+        result = kernel_manager.interrupt_kernel()
+        if inspect.isawaitable(result):
+            await asyncio.wait_for(result, timeout)
+        return True
+    except Exception as e:
+        logger.warning("中断解释器内核失败：%s", e)
+        return False
+
+
+async def run_with_deadline(awaitable: Awaitable, timeout: float = 0, interpreter: Any = None) -> Any:
+    """运行协程，超过 ``timeout`` 秒或被取消时中断解释器内核，让失控的生成代码立即停止占用 CPU
+
+    Args:
+        awaitable: 要运行的协程
+        timeout: 时长上限（秒），0 表示不限制
+        interpreter: 运行中使用的代码解释器
+
+    Raises:
+        asyncio.TimeoutError: 超过时长上限
+        asyncio.CancelledError: 运行被取消
+    """
+    try:
+        return await asyncio.wait_for(awaitable, timeout or None)
+    except asyncio.CancelledError:
+        if interpreter is not None:
+            await interrupt_interpreter(interpreter)
+        raise
+    except asyncio.TimeoutError:
+        if not timeout:
+            raise
+        if interpreter is not None:
+            await interrupt_interpreter(interpreter)
+        raise asyncio.TimeoutError(f"运行超过 {timeout:g} 秒的时长上限，已中断") from None
+
+
+def wait_interruptible(
+    future: concurrent.futures.Future,
+    on_poll: Callable[[float], None],
+    interval: float = 1.0,
+    cancel_on_exit: bool = True,
+) -> Any:
+    """在脚本线程中等待后台协程，每隔 ``interval`` 秒调用一次 ``on_poll(已等待秒数)``
+
+    ``on_poll`` 中的 Streamlit 调用让脚本线程有机会响应页面操作：点击取消按钮等操作使脚本重新运行时，
+    Streamlit 在这里抛出的异常会取消后台协程，协程在取消时中断解释器并保存运行记录。
+    ``cancel_on_exit`` 为 False 时脚本重新运行不会取消协程，调用方保存 future，在下次运行时重新等待。
+    """
+    waited = 0.0
+    try:
+        # 用 wait 而不是 result(timeout)：协程自身抛出的 TimeoutError 不能被当作轮询超时
+        while not concurrent.futures.wait([future], timeout=interval).done:
+            waited += interval
+            on_poll(waited)
+        return future.result()
+    except BaseException:
+        if cancel_on_exit:
+            future.cancel()
+        raise
@@ -0,0 +1,173 @@
+import re
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .fanout import run_isolated
+from .scheduler import ResourceScheduler
+
+# 候选模型族：名称、导入语句，以及分类/回归任务使用的模型表达式
+CANDIDATE_FAMILIES: Dict[str, Dict[str, str]] = {
+    "linear": {
+        "label": "线性模型",
+        "imports": (
+            "from sklearn.linear_model import LogisticRegression, Ridge\n"
+            "from sklearn.pipeline import make_pipeline\n"
+            "from sklearn.preprocessing import StandardScaler"
+        ),
+        "classifier": "make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000))",
+        "regressor": "make_pipeline(StandardScaler(), Ridge(alpha=1.0))",
+    },
+    "tree": {
+        "label": "随机森林",
+        "imports": "from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor",
+        "classifier": "RandomForestClassifier(n_estimators=100, random_state=42, min_samples_leaf=5)",
+        "regressor": "RandomForestRegressor(n_estimators=100, random_state=42, min_samples_leaf=5)",
+    },
+    "boosting": {
+        "label": "梯度提升",
+        "imports": "from sklearn.ensemble import HistGradientBoostingClassifier, HistGradientBoostingRegressor",
+        "classifier": "HistGradientBoostingClassifier(random_state=42)",
+        "regressor": "HistGradientBoostingRegressor(random_state=42)",
+    },
+}
+
+DEFAULT_CANDIDATES = ("linear", "tree", "boosting")
+
+# 选出最优候选时使用的验证集指标：分类越大越好，回归越小越好
+PRIMARY_METRICS = {True: ("f1_score", True), False: ("root_mean_squared_error", False)}
+
+_MODEL_LINE = re.compile(r"^rf_model = RandomForest\(.*\)$", re.MULTILINE)
+_FILE_PREFIX = 'f"baseline_{timestamp}.pkl"'
+_METRIC_LINE = re.compile(r"^(Training|Validation) (\w+): (\S+)$", re.MULTILINE)
+_SAVED_LINE = re.compile(r"^The (model|pickled data) is saved to (.+)$", re.MULTILINE)
+
+
+def candidate_code(baseline_code: str, family: str, classification: bool) -> str:
+    """把基线代码中的随机森林替换为候选模型族，模型和数据保存为 candidate_<族>_<时间戳>.pkl
+
+    候选之间只有模型不同，数据加载、预处理、切分和评估代码与基线完全一致，指标可以直接比较。
+    """
+    if family not in CANDIDATE_FAMILIES:
+        raise ValueError(f"未知的候选模型: {family}")
+    if not _MODEL_LINE.search(baseline_code) or _FILE_PREFIX not in baseline_code:
+        raise ValueError("基线代码中没有找到模型定义或保存路径，无法生成候选模型代码")
+
+    spec = CANDIDATE_FAMILIES[family]
+    model = spec["classifier" if classification else "regressor"]
+    code = _MODEL_LINE.sub(lambda _: f"{spec['imports']}\n\nrf_model = {model}", baseline_code, count=1)
+    return code.replace(_FILE_PREFIX, f'f"candidate_{family}_{{timestamp}}.pkl"')
+
+
+def parse_metrics(output: str) -> Dict[str, Dict[str, float]]:
+    """从运行输出中解析 "Training/Validation <指标>: <值>" 行"""
+    metrics: Dict[str, Dict[str, float]] = {"train": {}, "valid": {}}
+    for split, name, value in _METRIC_LINE.findall(output or ""):
+        try:
+            metrics["train" if split == "Training" else "valid"][name] = float(value)
+        except ValueError:
+            continue
+    return metrics
+
+
+def rank_candidates(results: Dict[str, Dict[str, Any]], classification: bool) -> List[Dict[str, Any]]:
+    """按验证集主指标给候选模型排名，运行失败或没有指标的候选排在最后
+
+    Args:
+        results: ``run_candidates`` 的返回值
+        classification: 是否为分类任务，决定主指标及其方向
+
+    Returns:
+        排行榜，每行包含 rank、family、label、metric、score、train_score、seconds、success、error
+    """
+    metric, higher_is_better = PRIMARY_METRICS[bool(classification)]
+    rows = []
+    for family, result in results.items():
+        metrics = parse_metrics(result.get("output", ""))
+        score = metrics["valid"].get(metric) if result.get("success") else None
+        rows.append(
+            {
+                "family": family,
+                "label": CANDIDATE_FAMILIES.get(family, {}).get("label", family),
+                "metric": metric,
+                "score": score,
+                "train_score": metrics["train"].get(metric),
+                "seconds": round(result.get("seconds", 0.0), 2),
+                "success": score is not None,
+                "error": None if score is not None else _error_summary(result),
+            }
+        )
+
+    def _sort_key(row):
+        if row["score"] is None:
+            return (1, 0.0)
+        return (0, -row["score"] if higher_is_better else row["score"])
+
+    rows.sort(key=_sort_key)
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
+    return rows
+
+
+def _error_summary(result: Dict[str, Any]) -> str:
+    if result.get("success"):
+        return "输出中没有验证集指标"
+    lines = [line for line in str(result.get("output", "")).strip().splitlines() if line.strip()]
+    return lines[-1][:200] if lines else "运行失败"
+
+
+async def run_candidates(
+    codes: Dict[str, str],
+    pool,
+    prelude: str = "",
+    owner: Optional[str] = None,
+    scheduler: Optional[ResourceScheduler] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """在各自独立的解释器中并发运行候选模型代码
+
+    每个候选从解释器池租用一个解释器（独立的内核进程），运行结束后归还，
+    因此总耗时接近最慢的单个候选，而不是所有候选之和。
+
+    Args:
+        codes: 候选模型族到代码的映射
+        pool: ``InterpreterPool``
+        prelude: 在候选代码之前运行的代码，例如列式文件加载器
+        owner: 记录在租用信息中的所有者
+        scheduler: 服务器级调度器，给出时额外的解释器需要借到空闲槽位才并发运行
+
+    Returns:
+        候选模型族到 ``{"output", "success", "seconds", "timed_out"}`` 的映射
+    """
+    results = await run_isolated(
+        list(codes.values()),
+        pool,
+        setup_code=prelude,
+        max_concurrency=len(codes),
+        timeout=None,
+        owner=owner or "candidates",
+        scheduler=scheduler,
+    )
+    return dict(zip(codes, results, strict=True))
+
+
+def promote_winner(output: str, prefix: str = "baseline") -> Dict[str, Path]:
+    """把最优候选保存的模型和数据复制为 <prefix>_<时间戳>.pkl，后续步骤按基线前缀读取"""
+    promoted = {}
+    for kind, saved in _SAVED_LINE.findall(output or ""):
+        source = Path(saved.strip())
+        if not source.exists():
+            continue
+        target = source.with_name(re.sub(r"^candidate_[a-z]+_", f"{prefix}_", source.name))
+        shutil.copy2(source, target)
+        promoted["model" if kind == "model" else "data"] = target
+    return promoted
+
+
+def leaderboard_markdown(rows: Iterable[Dict[str, Any]]) -> str:
+    """排行榜的 Markdown 表格，用于运行日志"""
+    lines = ["| 排名 | 模型 | 验证集指标 | 训练集指标 | 耗时（秒） |", "| --- | --- | --- | --- | --- |"]
+    for row in rows:
+        score = f"{row['score']:.4f}" if row["score"] is not None else f"失败：{row['error']}"
+        train = f"{row['train_score']:.4f}" if row["train_score"] is not None else "-"
+        lines.append(f"| {row['rank']} | {row['label']} | {score} | {train} | {row['seconds']} |")
+    return "\n".join(lines)
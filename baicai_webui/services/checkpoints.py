@@ -0,0 +1,270 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+
+# 超过该时长（秒）没有保存过检查点的 thread 视为已废弃，由 prune 删除
+CHECKPOINT_TTL = float(os.environ.get("BAICAI_CHECKPOINT_TTL", 7 * 24 * 3600))
+# 两次自动清理之间的最短间隔（秒）
+_PRUNE_INTERVAL = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    parent_id TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    task_path TEXT,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+"""
+
+
+class SQLiteCheckpointSaver(InMemorySaver):
+    """写穿到 SQLite 的 LangGraph checkpointer
+
+    读写逻辑沿用 InMemorySaver：每次 put / put_writes 后把新增的行同步写入 SQLite，
+    读取某个 thread 时再从 SQLite 懒加载到内存。这样刷新页面或重启服务后，
+    同一个 thread_id 的图可以从最后完成的节点继续执行，已完成的节点不会重新运行。
+    """
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._loaded = set()
+        self._pruned_at = 0.0
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """打开连接，with 块正常结束时提交，出错时回滚，最后关闭连接"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_loaded(self, thread_id: str) -> None:
+        """把 thread 的全部行从 SQLite 读入内存，每个 thread 只读一次"""
+        with self._lock:
+            if thread_id in self._loaded:
+                return
+            with self._connect() as conn:
+                checkpoints = conn.execute(
+                    "SELECT checkpoint_ns, checkpoint_id, type, checkpoint, metadata_type, metadata, parent_id "
+                    "FROM checkpoints WHERE thread_id = ?",
+                    (thread_id,),
+                ).fetchall()
+                writes = conn.execute(
+                    "SELECT checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value, task_path "
+                    "FROM writes WHERE thread_id = ?",
+                    (thread_id,),
+                ).fetchall()
+                blobs = conn.execute(
+                    "SELECT checkpoint_ns, channel, version, type, value FROM blobs WHERE thread_id = ?",
+                    (thread_id,),
+                ).fetchall()
+            for ns, checkpoint_id, type_, checkpoint, metadata_type, metadata, parent_id in checkpoints:
+                self.storage[thread_id][ns][checkpoint_id] = ((type_, checkpoint), (metadata_type, metadata), parent_id)
+            for ns, checkpoint_id, task_id, idx, channel, type_, value, task_path in writes:
+                self.writes[(thread_id, ns, checkpoint_id)][(task_id, idx)] = (
+                    task_id,
+                    channel,
+                    (type_, value),
+                    task_path,
+                )
+            for ns, channel, version, type_, value in blobs:
+                self.blobs[(thread_id, ns, channel, version)] = (type_, value)
+            self._loaded.add(thread_id)
+
+    def _ensure_all_loaded(self) -> None:
+        with self._connect() as conn:
+            thread_ids = [row[0] for row in conn.execute("SELECT DISTINCT thread_id FROM checkpoints")]
+        for thread_id in thread_ids:
+            self._ensure_loaded(thread_id)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self._lock:
+            self._ensure_loaded(config["configurable"]["thread_id"])
+            return super().get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        with self._lock:
+            if config and config["configurable"].get("thread_id"):
+                self._ensure_loaded(config["configurable"]["thread_id"])
+            else:
+                self._ensure_all_loaded()
+            # 先取出结果再释放锁，避免生成器在锁外读取被修改的字典
+            items = list(super().list(config, filter=filter, before=before, limit=limit))
+        yield from items
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            self._ensure_loaded(thread_id)
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            (type_, data), (metadata_type, metadata_data), parent_id = self.storage[thread_id][checkpoint_ns][
+                checkpoint["id"]
+            ]
+            blob_rows = []
+            for channel, version in new_versions.items():
+                blob_type, blob = self.blobs[(thread_id, checkpoint_ns, channel, version)]
+                blob_rows.append((thread_id, checkpoint_ns, channel, str(version), blob_type, blob))
+            with self._connect() as conn:
+                conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blob_rows)
+                conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        thread_id,
+                        checkpoint_ns,
+                        checkpoint["id"],
+                        type_,
+                        data,
+                        metadata_type,
+                        metadata_data,
+                        parent_id,
+                        time.time(),
+                    ),
+                )
+        return next_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        with self._lock:
+            self._ensure_loaded(thread_id)
+            super().put_writes(config, writes, task_id, task_path)
+            rows = [
+                (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, value[0], value[1], path)
+                for (write_task, idx), (_, channel, value, path) in self.writes[
+                    (thread_id, checkpoint_ns, checkpoint_id)
+                ].items()
+                if write_task == task_id
+            ]
+            with self._connect() as conn:
+                conn.executemany("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._loaded.discard(thread_id)
+            with self._connect() as conn:
+                for table in ("checkpoints", "writes", "blobs"):
+                    conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    def release(self, thread_id: str) -> None:
+        """释放 thread 在内存中的副本，数据仍保留在 SQLite 中，下次读取时重新加载"""
+        with self._lock:
+            super().delete_thread(thread_id)
+            self._loaded.discard(thread_id)
+
+    def prune(self, max_age: float = CHECKPOINT_TTL) -> List[str]:
+        """删除超过 ``max_age`` 秒没有保存过检查点的 thread（已关闭的会话留下的手动步骤和任务）
+
+        Returns:
+            List[str]: 删除的 thread_id
+        """
+        cutoff = time.time() - max_age
+        with self._lock:
+            self._pruned_at = time.time()
+            with self._connect() as conn:
+                expired = [
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(created_at) < ?", (cutoff,)
+                    )
+                ]
+            for thread_id in expired:
+                self.delete_thread(thread_id)
+        return expired
+
+    def maybe_prune(self, max_age: float = CHECKPOINT_TTL) -> List[str]:
+        """距上次清理超过一小时时执行 prune，用于在运行结束等时机顺带清理"""
+        if time.time() - self._pruned_at < _PRUNE_INTERVAL:
+            return []
+        return self.prune(max_age)
+
+    def threads(self, prefix: str = "") -> List[str]:
+        """以 prefix 开头的 thread_id，按最后一次保存的时间从早到晚排列"""
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT thread_id FROM checkpoints WHERE thread_id LIKE ? ESCAPE '\\' "
+                "GROUP BY thread_id ORDER BY MAX(created_at), MAX(rowid)",
+                (escaped + "%",),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+_checkpointer: Optional[SQLiteCheckpointSaver] = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer() -> SQLiteCheckpointSaver:
+    """获取进程级共享的 checkpointer，数据保存在 tmp/data/checkpoints.sqlite"""
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            from baicai_base.utils.data import get_tmp_folder
+
+            _checkpointer = SQLiteCheckpointSaver(get_tmp_folder("data") / "checkpoints.sqlite")
+            _checkpointer.prune()
+        return _checkpointer
@@ -0,0 +1,192 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".tif", ".tiff"}
+
+_FILE_COLUMNS = ["path", "folder", "size", "mtime"]
+
+
+def _join(folder: str, name: str) -> str:
+    return f"{folder}/{name}" if folder else name
+
+
+class ImageDatasetIndex:
+    """图片数据集索引
+
+    对一个图片根目录只遍历一次，记录每张图片的相对路径、大小和修改时间，
+    并以 Parquet 格式保存在临时文件夹中。之后的刷新按目录修改时间增量进行：
+    目录的修改时间未变时，其中的文件列表和子目录直接复用，只有新增、删除或
+    重命名过文件的目录才会被重新扫描。
+
+    原地覆盖文件不会改变目录的修改时间，这种情况需要调用 ``refresh(full=True)``。
+    """
+
+    def __init__(self, root, index_dir=None):
+        self.root = Path(root).resolve()
+        if index_dir is None:
+            from baicai_base.utils.data import get_tmp_folder
+
+            index_dir = get_tmp_folder("data") / "image_index"
+        key = hashlib.md5(str(self.root).encode()).hexdigest()[:16]
+        self.index_dir = Path(index_dir) / key
+        self._lock = threading.Lock()
+        self._dirs: Optional[Dict[str, dict]] = None
+        self._files: Optional[pd.DataFrame] = None
+        self._version: Optional[str] = None
+
+    @property
+    def files(self) -> pd.DataFrame:
+        """索引中的全部图片，列为 path、folder、size、mtime（路径均相对于根目录）"""
+        if self._files is None:
+            self.refresh()
+        return self._files
+
+    @property
+    def version(self) -> str:
+        """索引内容的哈希，任何图片新增、删除或修改后都会变化，可作为下游缓存的键"""
+        files = self.files
+        if self._version is None:
+            hashed = pd.util.hash_pandas_object(files[_FILE_COLUMNS], index=False)
+            self._version = hashlib.md5(hashed.values.tobytes()).hexdigest()[:16]
+        return self._version
+
+    def _load(self) -> None:
+        """从磁盘读取上次保存的索引"""
+        files_path = self.index_dir / "files.parquet"
+        dirs_path = self.index_dir / "dirs.parquet"
+        if not (files_path.exists() and dirs_path.exists()):
+            return
+        try:
+            files = pd.read_parquet(files_path)
+            dirs = pd.read_parquet(dirs_path)
+        except Exception:
+            # 索引文件损坏时重新构建
+            return
+        self._files = files
+        self._dirs = {
+            row.folder: {"mtime": row.mtime, "subdirs": list(row.subdirs)} for row in dirs.itertuples(index=False)
+        }
+
+    def _save(self) -> None:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        dirs = pd.DataFrame(
+            [(folder, info["mtime"], info["subdirs"]) for folder, info in self._dirs.items()],
+            columns=["folder", "mtime", "subdirs"],
+        )
+        self._files.to_parquet(self.index_dir / "files.parquet", index=False)
+        dirs.to_parquet(self.index_dir / "dirs.parquet", index=False)
+
+    def _scan_dir(self, folder: str):
+        """扫描单个目录，返回 (子目录名列表, 图片记录列表)，跳过隐藏文件和目录"""
+        subdirs, rows = [], []
+        with os.scandir(self.root / folder) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    subdirs.append(entry.name)
+                elif os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                    stat = entry.stat()
+                    rows.append((_join(folder, entry.name), folder, stat.st_size, stat.st_mtime))
+        return sorted(subdirs), rows
+
+    def refresh(self, full: bool = False) -> pd.DataFrame:
+        """增量刷新索引
+
+        Args:
+            full: 是否忽略已有索引、完整重新扫描
+
+        Returns:
+            pd.DataFrame: 刷新后的图片列表
+        """
+        with self._lock:
+            if self._dirs is None and not full:
+                self._load()
+            old_dirs = {} if full or self._dirs is None else self._dirs
+
+            dirs, scanned = {}, {}
+            stack = [""]
+            while stack:
+                folder = stack.pop()
+                try:
+                    mtime = (self.root / folder).stat().st_mtime
+                except OSError:
+                    continue
+                cached = old_dirs.get(folder)
+                if cached is not None and cached["mtime"] == mtime:
+                    subdirs = cached["subdirs"]
+                else:
+                    try:
+                        subdirs, scanned[folder] = self._scan_dir(folder)
+                    except OSError:
+                        continue
+                dirs[folder] = {"mtime": mtime, "subdirs": subdirs}
+                stack.extend(_join(folder, name) for name in subdirs)
+
+            if self._files is not None and not scanned and dirs.keys() == old_dirs.keys():
+                return self._files
+
+            frames = []
+            if self._files is not None and not full:
+                kept = set(dirs) - set(scanned)
+                frames.append(self._files[self._files["folder"].isin(kept)])
+            rows = [row for folder_rows in scanned.values() for row in folder_rows]
+            frames.append(pd.DataFrame(rows, columns=_FILE_COLUMNS))
+            files = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+            self._dirs = dirs
+            self._files = files.sort_values("path", ignore_index=True)
+            self._version = None
+            self._save()
+            return self._files
+
+    def relative(self, path) -> str:
+        """把绝对路径转换为索引中使用的相对目录，根目录为空字符串"""
+        rel = Path(path).resolve().relative_to(self.root).as_posix()
+        return "" if rel == "." else rel
+
+    def subfolders(self, folder: str = "") -> List[str]:
+        """列出目录下的直接子目录名"""
+        if self._dirs is None:
+            self.refresh()
+        info = self._dirs.get(folder)
+        return list(info["subdirs"]) if info else []
+
+    def image_files(self, folder: str = "", recursive: bool = True) -> List[Path]:
+        """列出目录下的图片绝对路径
+
+        Args:
+            folder: 相对于根目录的目录，默认根目录
+            recursive: 是否包含子目录中的图片
+        """
+        files = self.files
+        if recursive:
+            if folder:
+                files = files[(files["folder"] == folder) | files["folder"].str.startswith(folder + "/")]
+        else:
+            files = files[files["folder"] == folder]
+        return [self.root / path for path in files["path"]]
+
+    def class_counts(self, folder: str = "") -> pd.Series:
+        """按目录下的直接子目录统计图片数量（文件夹结构标注时即为每个类别的样本数）"""
+        files = self.files
+        prefix = folder + "/" if folder else ""
+        under = files["folder"] != folder
+        if folder:
+            under &= files["folder"].str.startswith(prefix)
+        classes = files.loc[under, "folder"].str.slice(len(prefix)).str.split("/").str[0]
+        return classes.value_counts().sort_index()
+
+    def summary(self) -> dict:
+        """索引概况：图片数量、总大小（字节）和目录数量"""
+        files = self.files
+        return {
+            "num_images": len(files),
+            "total_size": int(files["size"].sum()),
+            "num_folders": len(self._dirs),
+        }
@@ -0,0 +1,140 @@
+import hashlib
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from .loaders import COLUMNAR_SUFFIXES, load_table, write_columnar
+from .run_store import dataset_fingerprint
+
+DEFAULT_DEV_SAMPLE_ROWS = 20000
+# 超过该行数的数据默认开启开发采样模式
+DEV_SAMPLE_THRESHOLD = 100000
+# 回归任务按目标变量的分位数分层
+_REGRESSION_BINS = 10
+# 基线代码保存预处理后数据时的输出，工作流代码读取的就是这个文件
+_SAVED_DATA_LINE = re.compile(r"^The pickled data is saved to (.+)$", re.MULTILINE)
+_CLEAN_DATA_READ = re.compile(r"""read_pickle\(\s*r?(["'])([^"']*\.pkl)\1\s*\)""")
+# 工作流模板为了快速验证只取 1000 行，完整数据重新训练时需要跳过
+_WORKFLOW_SUBSAMPLE = re.compile(r"^if len\(X_train\) \+ len\(X_test\) > \d+:", re.MULTILINE)
+
+
+def full_data_path(configurable: Dict[str, Any]) -> str:
+    """完整数据的路径：开启开发采样后 path 指向采样文件，原路径保存在 full_data_path"""
+    return configurable.get("full_data_path") or configurable["path"]
+
+
+def _read_kwargs(path: Path, configurable: Dict[str, Any]) -> Dict[str, Any]:
+    if path.suffix.lower() in (".csv", ".txt") and configurable.get("delimiter"):
+        return {"delimiter": configurable["delimiter"]}
+    return {}
+
+
+def stratified_sample(
+    df: pd.DataFrame, target: Optional[str], rows: int, classification: bool = True, seed: int = 42
+) -> pd.DataFrame:
+    """按目标变量分层采样约 ``rows`` 行，保持类别（或回归目标的分位区间）比例
+
+    分类任务中每个类别至少保留一行，少数类不会因采样而消失；目标列不存在时退回简单随机采样。
+    """
+    if len(df) <= rows:
+        return df
+    if not target or target not in df.columns:
+        return df.sample(n=rows, random_state=seed)
+
+    strata = df[target]
+    if not classification and pd.api.types.is_numeric_dtype(strata):
+        strata = pd.qcut(strata, q=_REGRESSION_BINS, duplicates="drop")
+    strata = strata.astype("object").where(strata.notna(), "__missing__")
+
+    fraction = rows / len(df)
+    parts = [
+        group.sample(n=max(1, round(len(group) * fraction)), random_state=seed)
+        for _, group in df.groupby(strata, sort=False, observed=True)
+    ]
+    return pd.concat(parts).sample(frac=1, random_state=seed)
+
+
+def ensure_dev_sample(configurable: Dict[str, Any], folder=None) -> Path:
+    """生成（或复用）完整数据的分层采样 Parquet 文件
+
+    缓存文件名由数据集指纹、目标列、任务类型和采样行数计算，数据或设置不变时直接复用。
+
+    Args:
+        configurable: 图配置中的 configurable 字段
+        folder: 缓存目录，默认为完整数据所在目录
+
+    Returns:
+        Path: 采样数据路径
+    """
+    source = Path(full_data_path(configurable))
+    rows = int(configurable.get("dev_sample_rows") or DEFAULT_DEV_SAMPLE_ROWS)
+    target = configurable.get("target")
+    classification = bool(configurable.get("classification", True))
+    key = f"{dataset_fingerprint(source)}:{target}:{classification}:{rows}"
+    folder = Path(folder) if folder else source.parent
+    dest = folder / f"{source.stem}_dev_{hashlib.md5(key.encode()).hexdigest()[:10]}_{rows}.parquet"
+    if dest.exists():
+        return dest
+
+    df = load_table(source, **_read_kwargs(source, configurable))
+    return write_columnar(stratified_sample(df, target, rows, classification), dest)
+
+
+def use_dev_sample(configurable: Dict[str, Any], folder=None) -> Path:
+    """把配置切换到采样数据：path 指向采样文件，完整数据路径保存在 full_data_path
+
+    重复调用是幂等的，总是从完整数据生成采样。
+    """
+    configurable["full_data_path"] = full_data_path(configurable)
+    sample = ensure_dev_sample(configurable, folder=folder)
+    configurable["path"] = str(sample)
+    return sample
+
+
+def ensure_parquet_snapshot(configurable: Dict[str, Any], folder=None) -> Path:
+    """完整数据的 Parquet 快照，列式文件直接使用原文件，其他格式只转换一次并按数据集指纹复用"""
+    source = Path(full_data_path(configurable))
+    if source.suffix.lower() in COLUMNAR_SUFFIXES:
+        return source
+    fingerprint = (dataset_fingerprint(source) or "")[:10]
+    folder = Path(folder) if folder else source.parent
+    dest = folder / f"{source.stem}_full_{fingerprint}.parquet"
+    if dest.exists():
+        return dest
+
+    return write_columnar(load_table(source, **_read_kwargs(source, configurable)), dest)
+
+
+def full_data_code(code: str, sample_path, full_path) -> str:
+    """把在采样数据上生成的代码改为读取完整数据
+
+    Raises:
+        ValueError: 代码中没有出现采样数据路径
+    """
+    sample_path, full_path = str(sample_path), str(full_path)
+    if sample_path not in code:
+        raise ValueError("代码中没有找到采样数据的路径，无法切换到完整数据")
+    return code.replace(sample_path, full_path)
+
+
+def saved_data_path(output: str) -> Optional[str]:
+    """基线代码运行输出中最后保存的预处理数据路径，没有时返回 None"""
+    paths = _SAVED_DATA_LINE.findall(output or "")
+    return paths[-1].strip() if paths else None
+
+
+def full_data_workflow_code(code: str, clean_data_path) -> str:
+    """把工作流代码改为读取在完整数据上重新生成的基线数据，并跳过模板中的快速验证抽样
+
+    工作流代码不直接读取原始数据，而是读取基线代码保存的预处理数据（baseline_<时间戳>.pkl），
+    因此需要先在完整数据上重新运行基线代码，再把读取的路径换成新生成的文件。
+
+    Raises:
+        ValueError: 代码中没有读取预处理数据
+    """
+    if not _CLEAN_DATA_READ.search(code):
+        raise ValueError("工作流代码中没有找到读取基线数据的语句，无法切换到完整数据")
+    code = _CLEAN_DATA_READ.sub(lambda _: f'read_pickle(r"{clean_data_path}")', code, count=1)
+    return _WORKFLOW_SUBSAMPLE.sub("if False:", code)
@@ -0,0 +1,91 @@
+import asyncio
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+from .scheduler import ResourceScheduler
+
+DEFAULT_FANOUT_CONCURRENCY = 4
+DEFAULT_FANOUT_TIMEOUT = 600.0
+
+
+async def run_isolated(
+    codes: Sequence[str],
+    pool,
+    setup_code: str = "",
+    max_concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+    timeout: Optional[float] = DEFAULT_FANOUT_TIMEOUT,
+    owner: Optional[str] = None,
+    scheduler: Optional[ResourceScheduler] = None,
+    job_class: str = "ml",
+) -> List[Dict[str, Any]]:
+    """把多段互不依赖的代码分别放到独立的解释器中并发运行，按输入顺序返回结果
+
+    每段代码从解释器池租用一个解释器，先运行 ``setup_code``（例如加载同一份基线数据），
+    再运行自己的代码，互相之间没有共享变量。同时运行的数量不超过 ``max_concurrency``；
+    超过 ``timeout`` 秒的代码被中断，其解释器直接关闭而不归还到池中。
+
+    给出 ``scheduler`` 时，调用方所在的任务已经占用了一个槽位，第一个解释器使用这个槽位，
+    其余的解释器只在调度器有空闲资源且没有任务排队时通过 ``try_acquire`` 借用槽位，
+    借不到时降低并发数，按顺序运行，不会超出服务器容量，也不会因等待槽位而与其他任务互相阻塞。
+
+    Args:
+        codes: 要运行的代码
+        pool: ``InterpreterPool``
+        setup_code: 每个解释器在运行代码前执行的准备代码
+        max_concurrency: 最多同时运行的解释器数量
+        timeout: 每段代码（含准备代码）的超时时间（秒），None 表示不限制
+        owner: 记录在租用信息中的所有者
+        scheduler: 服务器级调度器，为空时只受 ``max_concurrency`` 限制
+        job_class: 借用槽位时使用的任务类别
+
+    Returns:
+        与 ``codes`` 一一对应的 ``{"output", "success", "seconds", "timed_out"}``
+    """
+    borrowed: List[str] = []
+    if scheduler is not None:
+        prefix = f"{owner or 'isolated'}:{uuid.uuid4().hex[:8]}"
+        for i in range(min(max_concurrency, len(codes)) - 1):
+            if not scheduler.try_acquire(f"{prefix}:{i}", None, job_class):
+                break
+            borrowed.append(f"{prefix}:{i}")
+        max_concurrency = 1 + len(borrowed)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _execute(interpreter, code: str):
+        if setup_code:
+            output, success = await interpreter.run(setup_code)
+            if not success:
+                return f"An error occurred while preparing data: {output}", False
+        return await interpreter.run(code)
+
+    async def _run(index: int, code: str) -> Dict[str, Any]:
+        async with semaphore:
+            started = time.perf_counter()
+            interpreter = pool.lease(owner=f"{owner or 'isolated'}:{index}")
+            timed_out = False
+            try:
+                output, success = await asyncio.wait_for(_execute(interpreter, code), timeout)
+            except asyncio.TimeoutError:
+                output = f"TimeoutError: the code did not finish within {timeout} seconds"
+                success, timed_out = False, True
+            except Exception as e:
+                output, success = f"An error occurred: {e}", False
+            finally:
+                # 超时的解释器可能仍在执行，不能重置后给其他会话使用
+                if timed_out:
+                    pool.discard(interpreter)
+                else:
+                    pool.release(interpreter)
+            return {
+                "output": output,
+                "success": success,
+                "seconds": time.perf_counter() - started,
+                "timed_out": timed_out,
+            }
+
+    try:
+        return list(await asyncio.gather(*(_run(index, code) for index, code in enumerate(codes))))
+    finally:
+        for slot in borrowed:
+            scheduler.release(slot)
@@ -0,0 +1,136 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from .dataset_index import ImageDatasetIndex
+
+VALIDATION_COLUMNS = ["path", "size", "mtime", "ok", "error", "format", "mode", "width", "height", "hash"]
+
+# 图片数量少于该值时直接在当前进程检查，避免进程池的启动开销
+_PARALLEL_THRESHOLD = 256
+
+
+def _file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def validate_image(path: str, strict: bool = False) -> Dict[str, Any]:
+    """检查单张图片
+
+    Args:
+        path: 图片路径
+        strict: 是否完整解码图片；默认只读取文件头
+
+    Returns:
+        dict: 格式、通道模式、宽高、文件哈希以及错误信息
+    """
+    from PIL import Image
+
+    result = {"ok": True, "error": None, "format": None, "mode": None, "width": None, "height": None, "hash": None}
+    try:
+        with Image.open(path) as img:
+            result.update(format=img.format, mode=img.mode, width=img.width, height=img.height)
+            if strict:
+                img.load()
+        result["hash"] = _file_hash(path)
+    except Exception as e:
+        result.update(ok=False, error=f"{type(e).__name__}: {e}")
+    return result
+
+
+def _validate_batch(args):
+    paths, strict = args
+    return [validate_image(path, strict) for path in paths]
+
+
+def validate_images(
+    index: ImageDatasetIndex, strict: bool = False, max_workers: Optional[int] = None, batch_size: int = 64
+) -> pd.DataFrame:
+    """并行检查索引中的全部图片，结果缓存在索引目录中
+
+    只有新增或修改过（大小、修改时间变化）的图片才会重新检查。
+
+    Args:
+        index: 图片数据集索引
+        strict: 是否完整解码图片
+        max_workers: 进程数，默认使用 CPU 核数
+        batch_size: 每个任务检查的图片数量
+
+    Returns:
+        pd.DataFrame: 每张图片的检查结果，列见 VALIDATION_COLUMNS
+    """
+    files = index.refresh()[["path", "size", "mtime"]]
+    cache_path = index.index_dir / ("validation_strict.parquet" if strict else "validation.parquet")
+
+    cached = files.iloc[:0].reindex(columns=VALIDATION_COLUMNS)
+    if cache_path.exists():
+        try:
+            cached = pd.read_parquet(cache_path)
+        except Exception:
+            pass
+
+    merged = files.merge(cached, on=["path", "size", "mtime"], how="left", indicator=True)
+    todo = merged.loc[merged["_merge"] == "left_only", "path"].tolist()
+    if not todo and len(cached) == len(files):
+        return merged.drop(columns="_merge")[VALIDATION_COLUMNS]
+
+    abs_paths = [str(index.root / path) for path in todo]
+    batches = [(abs_paths[i : i + batch_size], strict) for i in range(0, len(abs_paths), batch_size)]
+    if len(abs_paths) < _PARALLEL_THRESHOLD or (max_workers or os.cpu_count() or 1) == 1:
+        results = [row for batch in batches for row in _validate_batch(batch)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = [row for rows in executor.map(_validate_batch, batches) for row in rows]
+
+    fresh = pd.DataFrame(results, columns=VALIDATION_COLUMNS[3:])
+    fresh.insert(0, "path", todo)
+    fresh = fresh.merge(files, on="path")[VALIDATION_COLUMNS]
+    kept = merged.loc[merged["_merge"] == "both", VALIDATION_COLUMNS]
+    report = pd.concat([kept, fresh], ignore_index=True).sort_values("path", ignore_index=True)
+    # 宽高在出错时为空，统一为可空整数以便写入 Parquet
+    report = report.astype({"ok": bool, "width": "Int64", "height": "Int64"})
+
+    index.index_dir.mkdir(parents=True, exist_ok=True)
+    report.to_parquet(cache_path, index=False)
+    return report
+
+
+def summarize_validation(report: pd.DataFrame, class_counts: Optional[pd.Series] = None) -> Dict[str, Any]:
+    """汇总检查结果
+
+    Returns:
+        dict: 包含以下内容
+            - invalid: 无法读取或格式不支持的文件
+            - sizes: 按 (宽, 高) 统计的图片数量
+            - aspect_ratios: 宽高比（保留一位小数）的分布
+            - modes: 通道模式（RGB、L、RGBA 等）的分布
+            - duplicates: 内容完全相同的文件，按哈希分组
+            - imbalance: 最大类别与最小类别的样本数之比
+    """
+    valid = report[report["ok"]]
+    sizes = valid.groupby(["width", "height"]).size().sort_values(ascending=False).rename("count")
+    aspect_ratios = (valid["width"] / valid["height"]).astype(float).round(1).value_counts().sort_index()
+
+    dup_mask = valid["hash"].duplicated(keep=False)
+    duplicates = valid.loc[dup_mask, ["hash", "path"]].sort_values(["hash", "path"], ignore_index=True)
+
+    imbalance = None
+    if class_counts is not None and len(class_counts) > 1 and class_counts.min() > 0:
+        imbalance = float(class_counts.max() / class_counts.min())
+
+    return {
+        "num_images": len(report),
+        "invalid": report.loc[~report["ok"], ["path", "error"]].reset_index(drop=True),
+        "sizes": sizes,
+        "aspect_ratios": aspect_ratios,
+        "modes": valid["mode"].value_counts(),
+        "duplicates": duplicates,
+        "imbalance": imbalance,
+    }
@@ -0,0 +1,318 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from .trials import TRIAL_TEARDOWN
+
+logger = logging.getLogger(__name__)
+
+# 预热时在内核中导入的常用库，缺少的可选库直接跳过
+WARMUP_CODE = """
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import sklearn
+plt.close("all")
+for _module in ("torch", "fastai.vision.all", "fastai.text.all", "fastai.tabular.all", "fastai.collab"):
+    try:
+        __import__(_module)
+    except ImportError:
+        pass
+"""
+
+# 归还解释器时清空用户变量；已导入的模块仍在 sys.modules 中，重新导入几乎不耗时。
+# %reset 不会还原对模块的修改，同时撤销超参数搜索预置代码对 sklearn 的修改（运行被中断时可能没有恢复）
+RESET_CODE = "%reset -f\n" + TRIAL_TEARDOWN
+
+
+class _Slot:
+    """池中的一个解释器及其时间信息"""
+
+    def __init__(self, interpreter: Any, warm: bool):
+        self.interpreter = interpreter
+        self.warm = warm
+        self.created_at = time.time()
+        self.leased_at: Optional[float] = None
+        self.last_seen: Optional[float] = None
+        self.owner: Optional[str] = None
+        self.busy = 0  # 正在运行的任务数，大于 0 时不会被超时回收
+        self.keep_until: Optional[float] = None  # 在此之前不会被超时回收
+
+
+class InterpreterPool:
+    """进程级代码解释器预热池
+
+    后台预先启动若干个已导入 pandas、sklearn、torch、fastai 等库的解释器，
+    会话首次需要解释器时直接租用，省去内核启动和导入重型库的时间；池为空时退回到冷启动。
+
+    会话重启时通过 ``release`` 归还解释器，池会清空其中的变量后给其他会话使用；
+    超过最长寿命的解释器不再复用。会话超过 ``lease_timeout`` 没有访问（``touch``）时，
+    租用的解释器会被回收关闭；正在运行任务（``in_use``）或被要求保留（``keep``）的解释器除外。
+
+    ``lease``/``release`` 等方法可以在任意线程调用，启动、重置和关闭解释器在共享事件循环中进行。
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_lifetime: float = 6 * 3600,
+        lease_timeout: float = 4 * 3600,
+        warmup_code: str = WARMUP_CODE,
+        factory: Optional[Callable[[], Any]] = None,
+        runner=None,
+    ):
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.lease_timeout = lease_timeout
+        self.warmup_code = warmup_code
+        self._factory = factory
+        self._runner = runner
+        self._idle: List[_Slot] = []
+        self._leased: Dict[int, _Slot] = {}
+        self._starting = 0
+        self._counters = {"hits": 0, "misses": 0, "recycled": 0, "retired": 0, "expired": 0}
+        self._lock = threading.Lock()
+        self._tasks = set()
+
+    @classmethod
+    def from_env(cls) -> "InterpreterPool":
+        """从环境变量读取配置
+
+        - BAICAI_INTERPRETER_POOL_SIZE: 预热的解释器数量，默认 2，设为 0 关闭预热
+        - BAICAI_INTERPRETER_MAX_LIFETIME: 解释器最长寿命（秒），默认 6 小时
+        - BAICAI_INTERPRETER_LEASE_TIMEOUT: 会话无访问后回收解释器的时间（秒），默认 4 小时
+        """
+        return cls(
+            size=int(os.environ.get("BAICAI_INTERPRETER_POOL_SIZE", 2)),
+            max_lifetime=float(os.environ.get("BAICAI_INTERPRETER_MAX_LIFETIME", 6 * 3600)),
+            lease_timeout=float(os.environ.get("BAICAI_INTERPRETER_LEASE_TIMEOUT", 4 * 3600)),
+        )
+
+    def _create(self) -> Any:
+        if self._factory is not None:
+            return self._factory()
+        from baicai_base.utils.setups import setup_code_interpreter
+
+        return setup_code_interpreter()
+
+    def _submit(self, coro) -> None:
+        if self._runner is None:
+            from .async_runner import get_async_runner
+
+            self._runner = get_async_runner()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not None and running is self._runner.loop:
+            # 在事件循环线程中调用（例如图节点中租用解释器）时直接创建任务，保留引用以免被回收
+            task = running.create_task(coro)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            return
+        self._runner.submit(coro, bind_script_ctx=False)
+
+    @staticmethod
+    def _clear_cells(interpreter: Any) -> None:
+        # 预热和重置代码不应出现在会话保存的 notebook 中
+        interpreter.nb.cells.clear()
+
+    def start(self) -> None:
+        """在后台补足预热的解释器"""
+        with self._lock:
+            missing = self.size - len(self._idle) - self._starting
+            self._starting += max(missing, 0)
+        for _ in range(missing):
+            self._submit(self._spawn())
+
+    async def _spawn(self) -> None:
+        slot = None
+        try:
+            slot = _Slot(self._create(), warm=True)
+            _, success = await slot.interpreter.run(self.warmup_code)
+            if not success:
+                logger.warning("代码解释器预热失败，部分库可能未导入")
+            self._clear_cells(slot.interpreter)
+        except Exception:
+            logger.exception("启动预热解释器失败")
+            slot = None
+        with self._lock:
+            self._starting -= 1
+            if slot is not None:
+                self._idle.append(slot)
+
+    def lease(self, owner: Optional[str] = None) -> Any:
+        """租用一个解释器，池中没有空闲的预热解释器时冷启动一个"""
+        self.reap()
+        now = time.time()
+        retired = []
+        with self._lock:
+            slot = None
+            while self._idle:
+                candidate = self._idle.pop(0)
+                if now - candidate.created_at < self.max_lifetime:
+                    slot = candidate
+                    break
+                retired.append(candidate)
+            self._counters["hits" if slot else "misses"] += 1
+            self._counters["retired"] += len(retired)
+        if slot is None:
+            slot = _Slot(self._create(), warm=False)
+        slot.leased_at = slot.last_seen = now
+        slot.owner = owner
+        with self._lock:
+            self._leased[id(slot.interpreter)] = slot
+        for old in retired:
+            self._submit(self._terminate(old))
+        self.start()
+        return slot.interpreter
+
+    def touch(self, interpreter: Any) -> None:
+        """记录会话仍在使用该解释器"""
+        with self._lock:
+            slot = self._leased.get(id(interpreter))
+            if slot is not None:
+                slot.last_seen = time.time()
+
+    def is_leased(self, interpreter: Any) -> bool:
+        """解释器是否仍由池租出；被超时回收或已归还时返回 False"""
+        with self._lock:
+            return id(interpreter) in self._leased
+
+    @contextmanager
+    def in_use(self, interpreter: Any):
+        """在上下文中标记解释器正在运行任务（后台任务、手动模式的步骤），期间不会被超时回收
+
+        后台任务运行时页面可能已经关闭，不会再调用 touch；结束时记为一次访问。
+        """
+        with self._lock:
+            slot = self._leased.get(id(interpreter))
+            if slot is not None:
+                slot.busy += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                if slot is not None:
+                    slot.busy -= 1
+                    slot.last_seen = time.time()
+
+    def keep(self, interpreter: Any, seconds: float) -> None:
+        """在之后 ``seconds`` 秒内不回收解释器，用于保存了检查点、之后还要在同一内核中继续的会话"""
+        with self._lock:
+            slot = self._leased.get(id(interpreter))
+            if slot is not None:
+                slot.keep_until = max(slot.keep_until or 0.0, time.time() + seconds)
+
+    def release(self, interpreter: Any) -> None:
+        """归还解释器：未超过寿命且池未满时清空变量后放回池中，否则关闭"""
+        with self._lock:
+            slot = self._leased.pop(id(interpreter), None)
+        if slot is not None:
+            self._submit(self._recycle(slot))
+
+    def discard(self, interpreter: Any) -> None:
+        """归还并直接关闭解释器，用于中断执行或状态不可信的解释器"""
+        with self._lock:
+            slot = self._leased.pop(id(interpreter), None)
+            if slot is not None:
+                self._counters["retired"] += 1
+        if slot is not None:
+            self._submit(self._terminate(slot))
+            self.start()
+
+    async def _recycle(self, slot: _Slot) -> None:
+        with self._lock:
+            # 只看已就绪的空闲数：正在启动的解释器可能还要很久，归还的解释器重置后马上可用
+            keep = time.time() - slot.created_at < self.max_lifetime and len(self._idle) < self.size
+            if keep:
+                self._starting += 1
+        if not keep:
+            with self._lock:
+                self._counters["retired"] += 1
+            await self._terminate(slot)
+            return
+
+        try:
+            _, success = await slot.interpreter.run(RESET_CODE + self.warmup_code)
+            self._clear_cells(slot.interpreter)
+        except Exception:
+            logger.exception("重置解释器失败")
+            success = False
+        with self._lock:
+            self._starting -= 1
+            if success:
+                slot.warm = True
+                slot.leased_at = slot.last_seen = slot.owner = slot.keep_until = None
+                self._idle.append(slot)
+                self._counters["recycled"] += 1
+            else:
+                self._counters["retired"] += 1
+        if not success:
+            await self._terminate(slot)
+
+    async def _terminate(self, slot: _Slot) -> None:
+        try:
+            await slot.interpreter.terminate()
+        except Exception:
+            logger.exception("关闭解释器失败")
+
+    def reap(self) -> int:
+        """关闭超过 lease_timeout 没有访问的会话所租用的解释器，返回回收的数量
+
+        正在运行任务或仍在保留期内的解释器不回收。
+        """
+        now = time.time()
+        deadline = now - self.lease_timeout
+        with self._lock:
+            expired = [
+                key
+                for key, slot in self._leased.items()
+                if not slot.busy and slot.last_seen < deadline and (slot.keep_until or 0.0) < now
+            ]
+            slots = [self._leased.pop(key) for key in expired]
+            self._counters["expired"] += len(slots)
+        for slot in slots:
+            self._submit(self._terminate(slot))
+        if slots:
+            self.start()
+        return len(slots)
+
+    def stats(self) -> Dict[str, Any]:
+        """池的当前状态和累计计数"""
+        now = time.time()
+        with self._lock:
+            leases = [now - slot.leased_at for slot in self._leased.values()]
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "starting": self._starting,
+                "leased": len(self._leased),
+                "oldest_lease_seconds": max(leases, default=0.0),
+                **self._counters,
+            }
+
+    def shutdown(self) -> None:
+        """关闭所有空闲的解释器"""
+        with self._lock:
+            slots, self._idle = self._idle, []
+        for slot in slots:
+            self._submit(self._terminate(slot))
+
+
+_pool: Optional[InterpreterPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_interpreter_pool() -> InterpreterPool:
+    """获取进程级共享的解释器池，首次调用时在后台开始预热"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = InterpreterPool.from_env()
+            _pool.start()
+        return _pool
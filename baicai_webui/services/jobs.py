@@ -0,0 +1,226 @@
+import asyncio
+import threading
+import time
+import uuid
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .async_runner import get_async_runner
+from .scheduler import ResourceScheduler
+
+
+class JobStatus(str, Enum):
+    """后台任务状态"""
+
+    PENDING = "pending"
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    @property
+    def finished(self) -> bool:
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class Job:
+    """后台任务
+
+    任务的状态、进度事件和结果保存在进程内的 JobManager 中，而不是 st.session_state，
+    因此刷新浏览器、切换标签页或重新运行脚本都不会影响正在运行的任务，页面可以按 id 重新连接。
+
+    ``context`` 用于保存任务运行过程中产生、页面重新连接后还需要使用的对象（例如图实例）。
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        owner: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None,
+        job_class: Optional[str] = None,
+    ):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.owner = owner
+        self.job_class = job_class
+        self.meta = meta or {}
+        self.status = JobStatus.PENDING
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.context: Dict[str, Any] = {}
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._future = None
+        self._done = threading.Event()
+
+    def emit(self, event: str, **data) -> None:
+        """记录一条进度事件"""
+        with self._lock:
+            self._events.append({"seq": len(self._events), "time": time.time(), "event": event, **data})
+
+    def events(self, since: int = 0) -> List[Dict[str, Any]]:
+        """返回序号不小于 since 的事件，页面轮询时只取新增部分"""
+        with self._lock:
+            return self._events[since:]
+
+    @property
+    def finished(self) -> bool:
+        return self.status.finished
+
+    @property
+    def elapsed(self) -> float:
+        """已运行的秒数"""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def cancel(self) -> bool:
+        """请求取消任务"""
+        if self._future is None or self.finished:
+            return False
+        cancelled = self._future.cancel()
+        if cancelled and self.status == JobStatus.PENDING:
+            # 任务还没开始运行，协程不会再执行，直接标记为已取消
+            self.status = JobStatus.CANCELLED
+            self.finished_at = time.time()
+            self.emit("finished", status=self.status.value, error=None)
+            self._done.set()
+        return cancelled
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """阻塞等待任务结束并返回结果（主要用于测试和脚本）"""
+        self._done.wait(timeout)
+        return self.result
+
+
+class JobManager:
+    """进程级后台任务管理器
+
+    任务以协程形式运行在共享的后台事件循环中，与提交任务的 Streamlit 脚本线程解耦。
+    指定了任务类别的任务先经过 ``scheduler`` 的准入检查，再排队等待 CPU/内存资源。
+    已结束的任务最多保留 ``max_finished`` 个，超出后删除最早结束的。
+    """
+
+    def __init__(self, max_finished: int = 100, scheduler: Optional[ResourceScheduler] = None):
+        self.max_finished = max_finished
+        self.scheduler = scheduler
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        func: Callable[[Job], Awaitable[Any]],
+        kind: str,
+        owner: Optional[str] = None,
+        job_class: Optional[str] = None,
+        **meta,
+    ) -> Job:
+        """提交任务
+
+        Args:
+            func: 接收 Job 的异步函数，其返回值作为任务结果，可以通过 job.emit 报告进度
+            kind: 任务类型，例如 TaskType 的值
+            owner: 提交任务的客户端标识，用于重新连接和按用户查询
+            job_class: 调度器中的任务类别，例如 "ml"、"vision"；为空时不排队直接运行
+
+        Returns:
+            Job: 新建的任务
+
+        Raises:
+            AdmissionError: 调度器拒绝接纳该任务
+        """
+        scheduled = self.scheduler is not None and job_class is not None
+        job = Job(kind, owner=owner, meta=meta, job_class=job_class)
+        if scheduled:
+            # 准入时即预留名额，并发提交的任务不会同时通过个人限额检查
+            self.scheduler.admit(owner, job_class, job.id)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+
+        async def _run():
+            try:
+                if scheduled:
+                    job.status = JobStatus.QUEUED
+                    job.emit("queued")
+                    await self.scheduler.acquire(job.id, owner, job_class)
+                job.status = JobStatus.RUNNING
+                job.started_at = time.time()
+                job.emit("started")
+                job.result = await func(job)
+                job.status = JobStatus.SUCCEEDED
+            except BaseException as e:
+                if isinstance(e, asyncio.CancelledError):
+                    job.status = JobStatus.CANCELLED
+                else:
+                    job.status = JobStatus.FAILED
+                    job.error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                if scheduled:
+                    self.scheduler.release(job.id)
+                job.finished_at = time.time()
+                job.emit("finished", status=job.status.value, error=job.error)
+                job._done.set()
+
+        # 不绑定调用方的 ScriptRunContext：任务不直接写页面，只通过事件和结果与页面通信
+        job._future = get_async_runner().submit(_run(), bind_script_ctx=False)
+        if scheduled:
+            # 开始运行前就被取消的任务不会执行 _run，在这里归还预留的名额
+            job._future.add_done_callback(lambda _: self.scheduler.release(job.id))
+        return job
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        if not job_id:
+            return None
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, owner: Optional[str] = None, kind: Optional[str] = None, active_only: bool = False) -> List[Job]:
+        """按提交时间排序列出任务"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [
+            job
+            for job in sorted(jobs, key=lambda j: j.created_at)
+            if (owner is None or job.owner == owner)
+            and (kind is None or job.kind == kind)
+            and not (active_only and job.finished)
+        ]
+
+    def latest(self, owner: Optional[str], kind: Optional[str] = None, active_only: bool = False) -> Optional[Job]:
+        """某个客户端最近提交的任务，用于刷新页面后重新连接"""
+        jobs = self.list(owner=owner, kind=kind, active_only=active_only)
+        return jobs[-1] if jobs else None
+
+    def queue_position(self, job: Job) -> int:
+        """排队中的任务在队列中的位置，从 1 开始；未排队时返回 0"""
+        if self.scheduler is None or job.status != JobStatus.QUEUED:
+            return 0
+        return self.scheduler.position(job.id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        return job.cancel() if job else False
+
+    def _prune(self) -> None:
+        finished = sorted((j for j in self._jobs.values() if j.finished), key=lambda j: j.finished_at or 0)
+        for job in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.id]
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """获取进程级共享的任务管理器"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(scheduler=ResourceScheduler.from_env())
+        return _manager
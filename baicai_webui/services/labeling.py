@@ -0,0 +1,80 @@
+import textwrap
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+
+@lru_cache(maxsize=64)
+def compile_label_func(body: str) -> Callable[[Path], Any]:
+    """把配置中的标注函数体编译为函数，相同的函数体只编译一次
+
+    Args:
+        body: 函数体源码，参数名为 x（图片路径），例如 ``return x.parent.name``
+
+    Returns:
+        Callable: 标注函数
+
+    Raises:
+        ValueError: 函数体为空或存在语法错误
+    """
+    if not body or not body.strip():
+        raise ValueError("标注函数不能为空")
+
+    source = "def label_func(x):\n" + textwrap.indent(textwrap.dedent(body).strip("\n"), "    ") + "\n"
+    try:
+        code = compile(source, "<label_func>", "exec")
+    except SyntaxError as e:
+        raise ValueError(f"标注函数语法错误（第 {max((e.lineno or 1) - 1, 1)} 行）: {e.msg}") from e
+
+    namespace: Dict[str, Any] = {}
+    exec(code, namespace)
+    return namespace["label_func"]
+
+
+def validate_label_func(func: Callable[[Path], Any], fnames: Sequence[Path], sample_size: int = 20) -> List[Any]:
+    """在样本文件上试运行标注函数，尽早发现错误
+
+    Args:
+        func: 标注函数
+        fnames: 图片路径列表
+        sample_size: 试运行的文件数量（均匀抽取）
+
+    Returns:
+        List: 样本文件的标签
+
+    Raises:
+        ValueError: 标注函数在某个文件上抛出异常或返回 None，错误信息中包含出错的文件
+    """
+    if not fnames:
+        raise ValueError("没有找到可标注的图片")
+
+    step = max(1, len(fnames) // sample_size)
+    labels = []
+    for fname in list(fnames)[::step][:sample_size]:
+        label = _apply(func, fname)
+        if label is None:
+            raise ValueError(f"标注函数对文件 {fname} 返回了 None，请检查是否缺少 return")
+        labels.append(label)
+    return labels
+
+
+def label_files(body: str, fnames: Iterable[Path]) -> Dict[Path, Any]:
+    """对全部图片做一次标注
+
+    先在样本上校验，再一次性遍历全部文件，结果可按 (函数体, 索引版本) 缓存，
+    之后的 DataLoaders 直接查表，不必再为每个文件执行用户代码。
+
+    Returns:
+        Dict[Path, Any]: 图片路径到标签的映射
+    """
+    func = compile_label_func(body)
+    fnames = [Path(f) for f in fnames]
+    validate_label_func(func, fnames)
+    return {fname: _apply(func, fname) for fname in fnames}
+
+
+def _apply(func: Callable[[Path], Any], fname: Path) -> Any:
+    try:
+        return func(fname)
+    except Exception as e:
+        raise ValueError(f"标注函数处理文件 {fname} 时出错: {type(e).__name__}: {e}") from e
@@ -0,0 +1,238 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import pandas as pd
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .run_events import _token_usage
+
+LLM_CALL_COLUMNS = [
+    "time",
+    "page",
+    "feature",
+    "node",
+    "model",
+    "latency",
+    "ttft",
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+    "cache_hit",
+    "streaming",
+    "error",
+]
+
+_scope: ContextVar[Optional[Dict[str, str]]] = ContextVar("baicai_llm_scope", default=None)
+
+
+@contextmanager
+def llm_scope(page: Optional[str] = None, feature: Optional[str] = None):
+    """在上下文中为 LLM 调用打上页面和功能标签，嵌套时内层覆盖外层的同名标签
+
+    标签保存在 contextvars 中，通过 run_async、后台任务提交的协程会继承调用方的标签；
+    线程池中的调用需要在线程内重新设置。
+    """
+    scope = dict(_scope.get() or {})
+    scope.update({key: value for key, value in (("page", page), ("feature", feature)) if value})
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+
+
+def instrument_llm(llm: Any, feature: str) -> Any:
+    """给 LLM 实例打上功能标签，该实例的每次调用都会按 ``feature`` 统计（调用处的 llm_scope 优先）
+
+    只修改实例的 metadata，返回同一个对象，不改变其类型和用法。
+    """
+    if not hasattr(llm, "metadata"):
+        return llm
+    llm.metadata = {**(llm.metadata or {}), "llm_feature": feature}
+    return llm
+
+
+class LLMCallLog:
+    """进程级 LLM 调用记录
+
+    每次调用一条记录，保存在内存中（最多 ``max_records`` 条）并追加写入 JSON Lines 文件，
+    服务重启后从文件恢复最近的记录。文件行数超过 ``max_records`` 的两倍时改写为内存中的最近记录，
+    避免无限增长。
+    """
+
+    def __init__(self, path=None, max_records: int = 20000):
+        if path is None:
+            from baicai_base.utils.data import get_tmp_folder
+
+            path = Path(get_tmp_folder("log")) / "llm_calls.jsonl"
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._records: deque = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._file_lines = 0
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    self._file_lines += 1
+                    try:
+                        self._records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        if self._file_lines > len(self._records):
+            self._rewrite()
+
+    def _rewrite(self) -> None:
+        """把文件改写为内存中的记录，先写临时文件再替换，中途退出不会丢失原文件"""
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for record in self._records:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        tmp.replace(self.path)
+        self._file_lines = len(self._records)
+
+    def add(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._records.append(record)
+            if self._file_lines >= 2 * self._records.maxlen:
+                self._rewrite()
+                return
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            self._file_lines += 1
+
+    def records(self, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """返回记录，可只取 ``since`` 时间戳之后的"""
+        with self._lock:
+            records = list(self._records)
+        return [r for r in records if since is None or r["time"] >= since]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class LLMCallRecorder(BaseCallbackHandler):
+    """记录每次 LLM 调用的耗时、首个 token 时间、token 用量、缓存命中和错误
+
+    页面和功能标签依次取自调用处的 llm_scope、LLM 实例的 metadata（instrument_llm），
+    LangGraph 节点内的调用同时记录节点名。
+    """
+
+    def __init__(self, log: LLMCallLog):
+        self.log = log
+        self._calls: Dict[UUID, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, metadata, kwargs) -> None:
+        metadata = metadata or {}
+        scope = _scope.get() or {}
+        params = kwargs.get("invocation_params") or {}
+        with self._lock:
+            self._calls[run_id] = {
+                "page": scope.get("page") or metadata.get("llm_page") or "-",
+                "feature": scope.get("feature") or metadata.get("llm_feature") or "-",
+                "node": metadata.get("langgraph_node"),
+                "model": metadata.get("ls_model_name") or params.get("model_name") or params.get("model"),
+                "start": time.time(),
+                "ttft": None,
+                "streaming": False,
+            }
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        self._start(run_id, metadata, kwargs)
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs
+    ):
+        self._start(run_id, metadata, kwargs)
+
+    def on_llm_new_token(self, token, *, chunk=None, run_id, parent_run_id=None, **kwargs):
+        with self._lock:
+            call = self._calls.get(run_id)
+            if call is not None and call["ttft"] is None:
+                call["ttft"] = round(time.time() - call["start"], 3)
+                call["streaming"] = True
+
+    def _finish(self, run_id, **data) -> None:
+        with self._lock:
+            call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+        start = call.pop("start")
+        record = {"time": start, **call, "latency": round(time.time() - start, 3), **data}
+        self.log.add({column: record.get(column) for column in LLM_CALL_COLUMNS})
+
+    def on_llm_end(self, response, *, run_id, parent_run_id=None, **kwargs):
+        usage = _token_usage(response)
+        self._finish(run_id, **usage, cache_hit=bool(usage["cached_tokens"]), error=None)
+
+    def on_llm_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._finish(run_id, error=f"{type(error).__name__}: {error}")
+
+
+_log: Optional[LLMCallLog] = None
+_installed = False
+_install_lock = threading.Lock()
+
+
+def get_llm_call_log() -> LLMCallLog:
+    """获取进程级共享的 LLM 调用记录"""
+    global _log
+    with _install_lock:
+        if _log is None:
+            _log = LLMCallLog()
+        return _log
+
+
+def install_llm_accounting() -> LLMCallLog:
+    """在 LangChain 的回调配置中注册记录器，进程中所有 LLM 调用（包括各智能体内部创建的 LLM）都会被记录
+
+    重复调用是安全的，只注册一次。
+    """
+    global _installed
+    log = get_llm_call_log()
+    with _install_lock:
+        if not _installed:
+            from langchain_core.tracers.context import register_configure_hook
+
+            # 以记录器作为 ContextVar 的默认值：所有线程和上下文都能取到，无需逐个设置
+            recorder_var = ContextVar("baicai_llm_recorder", default=LLMCallRecorder(log))  # noqa: B039
+            register_configure_hook(recorder_var, inheritable=True)
+            _installed = True
+    return log
+
+
+def llm_call_frame(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """LLM 调用记录表，time 转为本地时间，token 数和耗时转为数值"""
+    frame = pd.DataFrame(records, columns=LLM_CALL_COLUMNS)
+    frame["time"] = pd.to_datetime([datetime.fromtimestamp(value) for value in frame["time"]])
+    for column in ("latency", "ttft", "prompt_tokens", "completion_tokens", "cached_tokens"):
+        frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    return frame
+
+
+def llm_usage_summary(frame: pd.DataFrame, by: List[str]) -> pd.DataFrame:
+    """按 ``by``（如 page、feature）汇总：调用次数、出错次数、token 数、缓存命中率和耗时分位数，按调用次数降序"""
+    columns = [*by, "calls", "errors", "prompt_tokens", "completion_tokens", "cache_hit_rate", "p50", "p95", "ttft"]
+    if frame.empty:
+        return pd.DataFrame(columns=columns)
+    frame = frame.assign(failed=frame["error"].notna(), cache_hit=frame["cache_hit"].fillna(False).astype(bool))
+    summary = frame.groupby(by, sort=False, dropna=False).agg(
+        calls=("latency", "size"),
+        errors=("failed", "sum"),
+        prompt_tokens=("prompt_tokens", "sum"),
+        completion_tokens=("completion_tokens", "sum"),
+        cache_hit_rate=("cache_hit", "mean"),
+        p50=("latency", "median"),
+        p95=("latency", lambda values: values.quantile(0.95)),
+        ttft=("ttft", "median"),
+    )
+    summary = summary.reset_index().sort_values("calls", ascending=False, ignore_index=True)
+    return summary.astype({"calls": int, "errors": int, "prompt_tokens": int, "completion_tokens": int})[columns]
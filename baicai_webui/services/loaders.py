@@ -0,0 +1,161 @@
+import hashlib
+import json
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+from .run_store import dataset_fingerprint
+
+COLUMNAR_SUFFIXES = {".parquet", ".feather"}
+
+# 数据预览中可以选择的列类型转换
+DTYPE_TRANSFORMS = ("object", "int64", "float64", "datetime64", "category")
+
+
+def read_columnar(path, columns=None) -> pd.DataFrame:
+    """使用内存映射读取 Parquet/Feather 文件"""
+    path = Path(path)
+    if path.suffix.lower() == ".feather":
+        import pyarrow.feather as feather
+
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+    import pyarrow.parquet as pq
+
+    return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def with_columnar_support(load_data):
+    """为 load_data 增加列式文件支持，其余格式仍交给原函数处理"""
+    if getattr(load_data, "_columnar", False):
+        return load_data
+
+    @wraps(load_data)
+    def _load_data(path=None, **kwargs):
+        if path is not None and Path(path).suffix.lower() in COLUMNAR_SUFFIXES:
+            return read_columnar(path, columns=kwargs.get("columns"))
+        return load_data(path=path, **kwargs)
+
+    _load_data._columnar = True
+    return _load_data
+
+
+def register_columnar_loaders() -> None:
+    """让 baicai_base 的 load_data 及其调用方（如 preview_data）能读取列式文件"""
+    import baicai_base.utils.data as data_module
+    from baicai_base.utils.data import loaders, preview
+
+    patched = with_columnar_support(loaders.load_data)
+    loaders.load_data = patched
+    preview.load_data = patched
+    data_module.load_data = patched
+
+
+# 在代码解释器内核中执行，使生成代码里的 `from baicai_base.utils.data import load_data` 也能读取列式文件
+COLUMNAR_LOADER_PRELUDE = """
+from pathlib import Path as _Path
+
+import baicai_base.utils.data as _data_module
+from baicai_base.utils.data import loaders as _loaders, preview as _preview
+
+if not getattr(_loaders.load_data, "_columnar", False):
+    _original_load_data = _loaders.load_data
+
+    def _columnar_load_data(path=None, **kwargs):
+        suffix = _Path(path).suffix.lower() if path is not None else ""
+        if suffix == ".parquet":
+            import pyarrow.parquet as _pq
+            return _pq.read_table(path, columns=kwargs.get("columns"), memory_map=True).to_pandas()
+        if suffix == ".feather":
+            import pyarrow.feather as _feather
+            return _feather.read_table(path, columns=kwargs.get("columns"), memory_map=True).to_pandas()
+        return _original_load_data(path=path, **kwargs)
+
+    _columnar_load_data._columnar = True
+    _loaders.load_data = _columnar_load_data
+    _preview.load_data = _columnar_load_data
+    _data_module.load_data = _columnar_load_data
+"""
+
+
+def load_table(path, **kwargs) -> pd.DataFrame:
+    """读取数据文件，支持 load_data 的全部格式以及 Parquet/Feather"""
+    from baicai_base.utils.data import load_data
+
+    return with_columnar_support(load_data)(path=path, **kwargs)
+
+
+def apply_dtype_transforms(df: pd.DataFrame, transforms: Optional[Dict[str, str]]) -> pd.DataFrame:
+    """按 ``{列名: 目标类型}`` 原地转换列类型，无法解析的值变为缺失值，不存在的列被忽略"""
+    for column, dtype in (transforms or {}).items():
+        if column not in df.columns:
+            continue
+        if dtype == "datetime64":
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+        elif dtype == "int64":
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("Int64")
+        elif dtype == "float64":
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+        elif dtype == "category":
+            df[column] = df[column].astype("category")
+        elif dtype == "object":
+            df[column] = df[column].astype("object")
+        else:
+            raise ValueError(f"不支持的数据类型: {dtype}")
+    return df
+
+
+def table_schema(df: pd.DataFrame) -> Dict[str, str]:
+    """列名到数据类型的映射"""
+    return {str(column): str(dtype) for column, dtype in df.dtypes.items()}
+
+
+def write_columnar(df: pd.DataFrame, dest) -> Path:
+    """把数据写入 Parquet/Feather 文件
+
+    混合类型的文本列（例如同时包含数字和字符串）无法直接转换为 Arrow，这些列按字符串保存。
+    先写入临时文件，成功后再替换目标文件，避免中断时留下不完整的文件。
+    """
+    import pyarrow as pa
+
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    for column in df.columns[df.dtypes == "object"]:
+        try:
+            pa.array(df[column], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df = df.assign(**{column: df[column].astype("string")})
+
+    tmp_dest = dest.with_name(dest.name + ".part")
+    if dest.suffix.lower() == ".feather":
+        df.reset_index(drop=True).to_feather(tmp_dest)
+    else:
+        df.to_parquet(tmp_dest, index=False)
+    tmp_dest.replace(dest)
+    return dest
+
+
+def columnar_copy(df: pd.DataFrame, source, folder, transforms: Optional[Dict[str, str]] = None) -> Path:
+    """把上传文件读入的数据（已应用类型转换）保存为 Parquet，供智能体生成的代码以内存映射方式读取
+
+    文件名由原文件的指纹和类型转换计算，同一文件和转换只写入一次；原文件已是列式格式且没有类型转换时直接使用原文件。
+
+    Args:
+        df: 从 ``source`` 读入并应用了 ``transforms`` 的完整数据
+        source: 上传的原始文件
+        folder: 保存目录
+        transforms: 应用过的类型转换
+
+    Returns:
+        Path: 列式文件路径
+    """
+    source = Path(source)
+    if source.suffix.lower() in COLUMNAR_SUFFIXES and not transforms:
+        return source
+    key = f"{dataset_fingerprint(source)}:{json.dumps(transforms or {}, sort_keys=True, ensure_ascii=False)}"
+    dest = Path(folder) / f"{source.stem}_{hashlib.md5(key.encode()).hexdigest()[:10]}.parquet"
+    if dest.exists():
+        return dest
+    return write_columnar(df, dest)
@@ -0,0 +1,149 @@
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .run_events import RunEvents, llm_usage_frame
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - psutil 为可选依赖
+    psutil = None
+
+DEFAULT_SAMPLE_INTERVAL = 2.0
+_MB = 1024 * 1024
+
+
+def kernel_pid(interpreter: Any) -> Optional[int]:
+    """代码解释器内核进程的 pid，内核尚未启动时返回 None"""
+    kernel_manager = getattr(getattr(interpreter, "nb_client", None), "km", None)
+    return getattr(getattr(kernel_manager, "provisioner", None), "pid", None)
+
+
+class ResourceSampler:
+    """运行期间在后台线程中定时采样进程资源，作为 ``resource`` 事件写入 RunEvents
+
+    每次采样记录界面进程（Streamlit 服务，多个会话共用）和代码解释器内核进程的 CPU 占用、
+    常驻内存、本次运行中的内存峰值和磁盘读写量。内核的数值包含其子进程（例如超参数搜索的进程池）。
+    没有安装 psutil 时不采样。
+    """
+
+    def __init__(self, events: RunEvents, interpreter: Any = None, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.events = events
+        self.interpreter = interpreter
+        self.interval = interval
+        self._processes: Dict[int, Any] = {}
+        self._io_start: Dict[str, Dict[str, float]] = {}
+        self._peaks: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _process(self, pid: int):
+        process = self._processes.get(pid)
+        if process is None or not process.is_running():
+            process = psutil.Process(pid)
+            # 第一次调用 cpu_percent 只建立基准，返回 0
+            process.cpu_percent(None)
+            self._processes[pid] = process
+        return process
+
+    def _measure(self, name: str, pid: int, include_children: bool) -> Optional[Dict[str, Any]]:
+        try:
+            root = self._process(pid)
+            processes = [root] + (root.children(recursive=True) if include_children else [])
+        except psutil.Error:
+            return None
+        cpu = rss = read = write = 0.0
+        io_available = True
+        for process in processes:
+            try:
+                process = self._process(process.pid)
+                cpu += process.cpu_percent(None)
+                rss += process.memory_info().rss
+                io = process.io_counters()
+            except AttributeError:
+                # macOS 等平台不提供磁盘读写计数
+                io_available = False
+                continue
+            except psutil.Error:
+                # 子进程可能已经退出
+                continue
+            read += io.read_bytes
+            write += io.write_bytes
+        rss_mb = rss / _MB
+        self._peaks[name] = max(self._peaks.get(name, 0.0), rss_mb)
+        start = self._io_start.setdefault(name, {"read": read, "write": write})
+        return {
+            "process": name,
+            "pid": pid,
+            "cpu": round(cpu, 1),
+            "rss_mb": round(rss_mb, 1),
+            "peak_mb": round(self._peaks[name], 1),
+            "read_mb": round(max(0.0, read - start["read"]) / _MB, 2) if io_available else None,
+            "write_mb": round(max(0.0, write - start["write"]) / _MB, 2) if io_available else None,
+        }
+
+    def sample(self) -> List[Dict[str, Any]]:
+        """采样一次并写入事件"""
+        if psutil is None:
+            return []
+        targets = [("webui", os.getpid(), False)]
+        pid = kernel_pid(self.interpreter)
+        if pid:
+            targets.append(("kernel", pid, True))
+        records = []
+        for name, target, include_children in targets:
+            values = self._measure(name, target, include_children)
+            if values is not None:
+                records.append(self.events.emit("resource", **values))
+        return records
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self) -> "ResourceSampler":
+        if psutil is None or self._thread is not None:
+            return self
+        self.sample()
+        self._thread = threading.Thread(target=self._loop, name="baicai-resource-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止采样，并在结束前再采样一次"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.sample()
+
+    def __enter__(self) -> "ResourceSampler":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def resource_frame(events: List[Dict[str, Any]]) -> pd.DataFrame:
+    """把 resource 事件整理为时间线：相对秒数、进程、CPU%、内存、内存峰值和磁盘读写（MB）"""
+    columns = ["elapsed", "process", "cpu", "rss_mb", "peak_mb", "read_mb", "write_mb"]
+    rows = [{column: e.get(column) for column in columns} for e in events if e["event"] == "resource"]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def usage_summary(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """运行资源摘要，用于运行记录的历史列表：各进程的内存峰值、平均 CPU，以及 LLM 调用次数和 token 数"""
+    summary: Dict[str, Any] = {}
+    resources = resource_frame(events)
+    for name, group in resources.groupby("process", sort=False):
+        summary[f"{name}_peak_mb"] = round(float(group["peak_mb"].max()), 1)
+        summary[f"{name}_cpu_avg"] = round(float(group["cpu"].mean()), 1)
+    llm = llm_usage_frame(events)
+    if not llm.empty:
+        summary["llm_calls"] = int(llm["calls"].sum())
+        summary["llm_tokens"] = int(llm["prompt_tokens"].sum() + llm["completion_tokens"].sum())
+        summary["llm_seconds"] = round(float(llm["seconds"].sum()), 1)
+    return summary
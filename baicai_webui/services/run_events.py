@@ -0,0 +1,284 @@
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import pandas as pd
+from langchain_core.callbacks import BaseCallbackHandler
+
+_TAG = re.compile(r"<[^>]+>")
+_CELL_END = re.compile(r"<\s*/t[dh]\s*>", re.IGNORECASE)
+_ROW_END = re.compile(r"<\s*/tr\s*>", re.IGNORECASE)
+_EPOCH_TIME = re.compile(r"^\d+:\d{2}(:\d{2})?$")
+_EPOCH_META = {"event", "time", "elapsed", "epoch", "attempt", "seconds"}
+
+
+def _to_float(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_epoch_metrics(text: str) -> List[List[Dict[str, Any]]]:
+    """从 fastai 训练进度表中解析每个 epoch 的指标
+
+    支持纯文本表格和 HTML 表格（表头以 epoch 开头，最后一列为用时）。
+
+    Returns:
+        List[List[Dict]]: 每张表一组记录，每条记录包含 epoch、各指标的值（无法解析时为 None）和 seconds
+    """
+    text = _ROW_END.sub("\n", _CELL_END.sub(" ", text))
+    text = _TAG.sub(" ", text)
+
+    tables: List[List[Dict[str, Any]]] = []
+    header: Optional[List[str]] = None
+    for line in text.splitlines():
+        tokens = line.split()
+        if not tokens:
+            continue
+        if tokens[0] == "epoch" and len(tokens) > 2:
+            header = tokens
+            tables.append([])
+            continue
+        if header is None:
+            continue
+        if len(tokens) != len(header) or not tokens[0].isdigit():
+            # 表头后的分隔线等忽略，已有数据行后遇到其他内容视为表格结束
+            if tables[-1]:
+                header = None
+            continue
+        row: Dict[str, Any] = {"epoch": int(tokens[0])}
+        for name, value in zip(header[1:], tokens[1:], strict=True):
+            if name == "time" and _EPOCH_TIME.match(value):
+                parts = [int(p) for p in value.split(":")]
+                row["seconds"] = sum(p * 60**i for i, p in enumerate(reversed(parts)))
+            else:
+                row[name] = _to_float(value)
+        tables[-1].append(row)
+    return [table for table in tables if table]
+
+
+class RunEvents:
+    """单次运行的结构化事件流
+
+    事件（节点开始/结束、epoch 指标、代码运行结果等）以 JSONL 写入日志旁边的
+    ``run_<id>.events.jsonl``，同时保存在内存中供界面绘制图表。
+    """
+
+    def __init__(self, run_id: str, path=None):
+        if path is None:
+            from baicai_base.utils.data import get_tmp_folder
+
+            path = Path(get_tmp_folder("log")) / f"run_{run_id}.events.jsonl"
+        self.run_id = run_id
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.started_at = time.time()
+        self._events: List[Dict[str, Any]] = []
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._epoch_tables = 0
+
+    def emit(self, event: str, **data) -> Dict[str, Any]:
+        """记录一条事件"""
+        now = time.time()
+        record = {"event": event, "time": now, "elapsed": round(now - self.started_at, 3), **data}
+        with self._lock:
+            self._events.append(record)
+            if not self._file.closed:
+                self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                self._file.flush()
+        return record
+
+    def events(self, event: Optional[str] = None, since: int = 0) -> List[Dict[str, Any]]:
+        """返回第 since 条之后的事件，可按事件类型过滤"""
+        with self._lock:
+            events = self._events[since:]
+        return [e for e in events if event is None or e["event"] == event]
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def observe_log(self, text: str) -> None:
+        """从一条日志记录中提取 epoch 指标，作为 RunLog 的订阅者使用"""
+        if "epoch" not in text:
+            return
+        for table in parse_epoch_metrics(text):
+            self._epoch_tables += 1
+            for row in table:
+                self.emit("epoch", attempt=self._epoch_tables, **row)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def load_run_events(path) -> List[Dict[str, Any]]:
+    """读取已保存的事件文件"""
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                events.append(json.loads(line))
+    return events
+
+
+def epoch_metrics_frame(events: List[Dict[str, Any]], attempt: Optional[int] = None) -> pd.DataFrame:
+    """把 epoch 事件整理为以 epoch 为索引、每列一个指标的表，默认取最后一次训练"""
+    rows = [e for e in events if e["event"] == "epoch"]
+    if not rows:
+        return pd.DataFrame()
+    attempt = attempt or max(e.get("attempt", 1) for e in rows)
+    rows = [e for e in rows if e.get("attempt", 1) == attempt]
+    frame = pd.DataFrame(rows).set_index("epoch")
+    metrics = [c for c in frame.columns if c not in _EPOCH_META]
+    return frame[metrics + (["seconds"] if "seconds" in frame.columns else [])]
+
+
+def node_timeline_frame(events: List[Dict[str, Any]]) -> pd.DataFrame:
+    """把节点事件整理为时间线：节点、开始和结束的相对秒数、用时和状态，运行中的节点结束时间为最新事件时间"""
+    columns = ["node", "step", "start", "end", "duration", "status"]
+    if not events:
+        return pd.DataFrame(columns=columns)
+    now = max(e["elapsed"] for e in events)
+    rows, running = [], {}
+    for e in events:
+        key = (e.get("node"), e.get("step"))
+        if e["event"] == "node_start":
+            running[key] = e["elapsed"]
+        elif e["event"] == "node_end":
+            start = running.pop(key, e["elapsed"] - e.get("duration", 0))
+            rows.append(
+                {
+                    "node": e["node"],
+                    "step": e.get("step"),
+                    "start": start,
+                    "end": e["elapsed"],
+                    "duration": e.get("duration"),
+                    "status": e.get("status", "ok"),
+                }
+            )
+    for (node, step), start in running.items():
+        rows.append(
+            {"node": node, "step": step, "start": start, "end": now, "duration": now - start, "status": "running"}
+        )
+    return pd.DataFrame(rows, columns=columns).sort_values("start", ignore_index=True)
+
+
+def llm_usage_frame(events: List[Dict[str, Any]]) -> pd.DataFrame:
+    """按节点汇总 LLM 调用：调用次数、出错次数、输入/输出 token 数、总耗时和平均耗时（秒），按总耗时降序"""
+    columns = ["node", "calls", "errors", "prompt_tokens", "completion_tokens", "seconds", "mean_seconds"]
+    rows = [e for e in events if e["event"] == "llm_call"]
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    frame = pd.DataFrame(rows)
+    for column in ("prompt_tokens", "completion_tokens"):
+        frame[column] = pd.to_numeric(frame.get(column), errors="coerce").fillna(0)
+    frame["node"] = frame["node"].fillna("-")
+    frame["errors"] = frame["error"].notna() if "error" in frame.columns else False
+    usage = frame.groupby("node", sort=False).agg(
+        calls=("seconds", "size"),
+        errors=("errors", "sum"),
+        prompt_tokens=("prompt_tokens", "sum"),
+        completion_tokens=("completion_tokens", "sum"),
+        seconds=("seconds", "sum"),
+    )
+    usage["mean_seconds"] = usage["seconds"] / usage["calls"]
+    usage = usage.reset_index().sort_values("seconds", ascending=False, ignore_index=True)
+    return usage.astype({"calls": int, "errors": int, "prompt_tokens": int, "completion_tokens": int})[columns]
+
+
+def _token_usage(response) -> Dict[str, Optional[int]]:
+    """从 LLMResult 中读取输入、输出和命中服务端提示缓存的 token 数
+
+    兼容 llm_output.token_usage 和消息的 usage_metadata 两种形式。
+    """
+    usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    if usage:
+        return {
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "completion_tokens": usage.get("completion_tokens"),
+            "cached_tokens": (usage.get("prompt_tokens_details") or {}).get("cached_tokens"),
+        }
+    prompt = completion = cached = None
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if metadata:
+                prompt = (prompt or 0) + metadata.get("input_tokens", 0)
+                completion = (completion or 0) + metadata.get("output_tokens", 0)
+                cache_read = (metadata.get("input_token_details") or {}).get("cache_read")
+                if cache_read is not None:
+                    cached = (cached or 0) + cache_read
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "cached_tokens": cached}
+
+
+class GraphEventCallback(BaseCallbackHandler):
+    """把 LangGraph 节点的开始、结束、出错、代码运行结果和节点内的 LLM 调用记录为结构化事件"""
+
+    def __init__(self, events: RunEvents):
+        self.events = events
+        self._nodes: Dict[UUID, Dict[str, Any]] = {}
+        self._llm_calls: Dict[UUID, Dict[str, Any]] = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        # 节点内部的 LLM 调用等也会继承节点的元数据，只记录节点本身
+        if node is None or kwargs.get("name") != node:
+            return
+        step = metadata.get("langgraph_step")
+        self._nodes[run_id] = {"node": node, "step": step, "start": time.time()}
+        self.events.emit("node_start", node=node, step=step)
+
+    def _finish(self, run_id, status: str, **data) -> Optional[Dict[str, Any]]:
+        info = self._nodes.pop(run_id, None)
+        if info is None:
+            return None
+        duration = round(time.time() - info["start"], 3)
+        self.events.emit("node_end", node=info["node"], step=info["step"], status=status, duration=duration, **data)
+        return info
+
+    def on_chain_end(self, outputs, *, run_id, parent_run_id=None, **kwargs):
+        info = self._finish(run_id, "ok")
+        if info is None or not isinstance(outputs, dict):
+            return
+        for key, value in outputs.items():
+            if key.endswith("_success") and isinstance(value, bool):
+                self.events.emit("code_result", node=info["node"], step=info["step"], key=key, success=value)
+
+    def on_chain_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._finish(run_id, "error", error=f"{type(error).__name__}: {error}")
+
+    def _start_llm(self, run_id, metadata) -> None:
+        metadata = metadata or {}
+        self._llm_calls[run_id] = {
+            "node": metadata.get("langgraph_node"),
+            "step": metadata.get("langgraph_step"),
+            "start": time.time(),
+        }
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        self._start_llm(run_id, metadata)
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs
+    ):
+        self._start_llm(run_id, metadata)
+
+    def _finish_llm(self, run_id, **data) -> None:
+        info = self._llm_calls.pop(run_id, None)
+        if info is None:
+            return
+        seconds = round(time.time() - info.pop("start"), 3)
+        self.events.emit("llm_call", **info, seconds=seconds, **data)
+
+    def on_llm_end(self, response, *, run_id, parent_run_id=None, **kwargs):
+        self._finish_llm(run_id, **_token_usage(response))
+
+    def on_llm_error(self, error, *, run_id, parent_run_id=None, **kwargs):
+        self._finish_llm(run_id, error=f"{type(error).__name__}: {error}")
@@ -0,0 +1,193 @@
+import bisect
+import contextlib
+import contextvars
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+_current_run_log: contextvars.ContextVar[Optional["RunLog"]] = contextvars.ContextVar("baicai_run_log", default=None)
+
+# 与 baicai_base 写入 app_log_*.md 时使用的 Markdown 格式一致（格式本身的换行加上 FileHandler 的换行）
+_FORMATTER = logging.Formatter("%(message)s\n")
+_TERMINATOR = "\n"
+
+_install_lock = threading.Lock()
+_installed = False
+
+
+class RunLog:
+    """单次运行的日志流
+
+    运行期间产生的日志记录按 contextvars 归属到当前运行，而不是按修改时间猜测 app_log_*.md，
+    多个会话同时运行时互不干扰。日志同时保存在内存中和该运行专属的文件里，
+    ``wait`` 在有新内容或日志关闭时立即返回，界面无需轮询文件大小。
+
+    偏移量按字符计算，``read(since)`` 返回 since 之后的新内容和新的偏移量；
+    ``entries`` 按日志记录读取，用于只渲染新增的部分。
+    """
+
+    def __init__(self, run_id: str, path=None):
+        if path is None:
+            from baicai_base.utils.data import get_tmp_folder
+
+            path = Path(get_tmp_folder("log")) / f"run_{run_id}.md"
+        self.run_id = run_id
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._chunks: List[str] = []
+        self._offsets: List[int] = []
+        self._size = 0
+        self._closed = False
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._cond = threading.Condition()
+        self._subscribers: List[Callable[[str], None]] = []
+
+    @classmethod
+    def from_file(cls, path, run_id: Optional[str] = None) -> "RunLog":
+        """读取已保存的日志文件，返回已关闭的 RunLog
+
+        按记录之间的空行切分为条目，代码块内部的空行不会切开。
+        """
+        path = Path(path)
+        run_log = cls(run_id or path.stem, path=path)
+        run_log.close()
+        text = path.read_text(encoding="utf-8") if path.exists() else ""
+        entry, in_fence = [], False
+        for line in text.splitlines(keepends=True):
+            entry.append(line)
+            if line.lstrip().startswith("```"):
+                in_fence = not in_fence
+            if not in_fence and line == "\n" and len(entry) > 1:
+                run_log._add("".join(entry))
+                entry = []
+        if entry:
+            run_log._add("".join(entry))
+        return run_log
+
+    def _add(self, text: str) -> None:
+        self._chunks.append(text)
+        self._offsets.append(self._size)
+        self._size += len(text)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def entry_count(self) -> int:
+        """日志条数，每条对应一条日志记录"""
+        return len(self._chunks)
+
+    def entries(self, start: int = 0, end: Optional[int] = None) -> List[str]:
+        """按条读取日志，一条记录中的多行内容（如代码块）不会被拆开"""
+        with self._cond:
+            return self._chunks[start:end]
+
+    def window_start(self, max_lines: int, end: Optional[int] = None) -> int:
+        """从第 end 条往前、总行数不超过 max_lines 的日志的起始序号（至少包含一条）"""
+        with self._cond:
+            end = len(self._chunks) if end is None else end
+            start, lines = end, 0
+            while start > 0:
+                lines += self._chunks[start - 1].count("\n")
+                if lines > max_lines and start < end:
+                    break
+                start -= 1
+            return start
+
+    @property
+    def text(self) -> str:
+        with self._cond:
+            return "".join(self._chunks)
+
+    def append(self, text: str) -> None:
+        """追加日志并唤醒等待者"""
+        if not text:
+            return
+        with self._cond:
+            if self._closed:
+                return
+            self._add(text)
+            self._file.write(text)
+            self._file.flush()
+            self._cond.notify_all()
+        for callback in self._subscribers:
+            try:
+                callback(text)
+            except Exception:
+                pass
+
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        """订阅新增的日志记录，例如从中提取结构化事件"""
+        self._subscribers.append(callback)
+
+    def read(self, since: int = 0) -> Tuple[str, int]:
+        """返回偏移量 since 之后的内容和新的偏移量"""
+        with self._cond:
+            if since >= self._size:
+                return "", self._size
+            i = max(bisect.bisect_right(self._offsets, since) - 1, 0)
+            return "".join(self._chunks[i:])[since - self._offsets[i] :], self._size
+
+    def wait(self, since: int, timeout: Optional[float] = None) -> bool:
+        """阻塞直到有偏移量 since 之后的新内容或日志关闭，返回是否有新内容"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._size > since or self._closed, timeout)
+            return self._size > since
+
+    def close(self) -> None:
+        """结束日志，唤醒所有等待者"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._file.close()
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def bind(self):
+        """在当前上下文中把日志记录归属到本次运行
+
+        之后创建的 asyncio 任务和 asyncio.to_thread 调用会继承该上下文。
+        """
+        install_run_log_capture()
+        token = _current_run_log.set(self)
+        try:
+            yield self
+        finally:
+            _current_run_log.reset(token)
+
+
+def current_run_log() -> Optional[RunLog]:
+    return _current_run_log.get()
+
+
+def install_run_log_capture() -> None:
+    """安装日志记录工厂，把每条日志同时写入当前上下文所属的运行日志
+
+    baicai_base 的 setup_logging 在每次创建图节点时都会清空根日志记录器的 handler，
+    因此这里挂在 LogRecord 工厂上：只在记录器的级别检查通过后才会创建记录，且不会被清空。
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        previous = logging.getLogRecordFactory()
+
+        def factory(*args, **kwargs):
+            record = previous(*args, **kwargs)
+            run_log = _current_run_log.get()
+            if run_log is not None:
+                try:
+                    run_log.append(_FORMATTER.format(record) + _TERMINATOR)
+                except Exception:
+                    pass
+            return record
+
+        logging.setLogRecordFactory(factory)
+        _installed = True
@@ -0,0 +1,301 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    task_type TEXT NOT NULL,
+    name TEXT,
+    owner TEXT,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    finished_at REAL,
+    duration REAL,
+    dataset_fingerprint TEXT,
+    config TEXT,
+    summary TEXT,
+    artifacts TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_task_created ON runs (task_type, created_at);
+"""
+
+_COLUMNS = [
+    "id",
+    "task_type",
+    "name",
+    "owner",
+    "status",
+    "created_at",
+    "finished_at",
+    "duration",
+    "dataset_fingerprint",
+    "config",
+    "summary",
+    "artifacts",
+    "error",
+]
+
+
+class RunRecord(NamedTuple):
+    """运行记录"""
+
+    id: str
+    task_type: str
+    name: Optional[str]
+    owner: Optional[str]
+    status: str
+    created_at: float
+    finished_at: Optional[float]
+    duration: Optional[float]
+    dataset_fingerprint: Optional[str]
+    config: Dict[str, Any]
+    summary: Dict[str, Any]
+    artifacts: Dict[str, str]
+    error: Optional[str]
+
+    @property
+    def label(self) -> str:
+        created = time.strftime("%Y-%m-%d %H:%M", time.localtime(self.created_at))
+        return f"{created} · {self.name or self.task_type} · {self.status}"
+
+
+def dataset_fingerprint(path) -> Optional[str]:
+    """数据集指纹：文件按大小、修改时间和首尾各 1MB 内容计算，目录按其中文件的路径、大小和修改时间计算"""
+    if not path:
+        return None
+    path = Path(path)
+    if not path.exists():
+        return None
+    digest = hashlib.md5()
+    if path.is_file():
+        stat = path.stat()
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+        with open(path, "rb") as f:
+            digest.update(f.read(1 << 20))
+            if stat.st_size > 2 << 20:
+                f.seek(-(1 << 20), os.SEEK_END)
+                digest.update(f.read())
+    else:
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file = Path(root) / name
+                stat = file.stat()
+                digest.update(f"{file.relative_to(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def summarize_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """图状态摘要：各类代码的数量和成功标志，用于历史列表"""
+    summary = {}
+    for key, value in state.items():
+        if key.endswith("_success") and isinstance(value, bool):
+            summary[key] = value
+        elif key.endswith(("_codes", "_models")) or key == "actions":
+            summary[f"{key}_count"] = len(value or [])
+    return summary
+
+
+def _copy(src: Path, dst: Path) -> None:
+    # 优先使用硬链接，避免重复占用磁盘
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class RunStore:
+    """本地运行记录库
+
+    每次运行在 SQLite 中保存配置、数据集指纹、状态摘要、耗时等元数据，
+    在运行目录中保存完整图状态（pickle）、日志、事件和模型/数据 pickle 的副本，
+    刷新页面或重启服务后可以直接加载结果，而无需重新运行流程。
+    """
+
+    def __init__(self, root=None):
+        if root is None:
+            from baicai_base.utils.data import get_tmp_folder
+
+            root = get_tmp_folder("data") / "runs"
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.root / "runs.sqlite"
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """打开连接，with 块正常结束时提交，出错时回滚，最后关闭连接"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def run_dir(self, run_id: str) -> Path:
+        return self.root / run_id
+
+    def record(
+        self,
+        run_id: str,
+        task_type: str,
+        config: Dict[str, Any],
+        state: Optional[Dict[str, Any]] = None,
+        owner: Optional[str] = None,
+        status: str = "succeeded",
+        started_at: Optional[float] = None,
+        finished_at: Optional[float] = None,
+        files: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        usage: Optional[Dict[str, Any]] = None,
+    ) -> RunRecord:
+        """保存一次运行
+
+        Args:
+            run_id: 运行 id
+            task_type: 任务类型
+            config: 运行配置（data_config）
+            state: 图的最终状态
+            owner: 客户端标识
+            status: 运行状态
+            started_at: 开始时间
+            finished_at: 结束时间
+            files: 需要随运行保存的文件，键为名称（如 log、events、model/best_xxx.pkl），值为源路径
+            error: 错误信息
+            usage: 资源使用摘要（内存峰值、LLM 调用次数等），与状态摘要一起显示在历史列表中
+        """
+        run_dir = self.run_dir(run_id)
+        run_dir.mkdir(parents=True, exist_ok=True)
+        if state is not None:
+            with open(run_dir / "state.pkl", "wb") as f:
+                pickle.dump(state, f)
+
+        artifacts = {}
+        for key, src in (files or {}).items():
+            if src and Path(src).is_file():
+                dst = run_dir / key.replace("/", "__")
+                if not dst.exists():
+                    _copy(Path(src), dst)
+                artifacts[key] = str(dst)
+
+        configurable = config.get("configurable", config)
+        finished_at = finished_at or time.time()
+        started_at = started_at or finished_at
+        row = (
+            run_id,
+            task_type,
+            configurable.get("name"),
+            owner,
+            status,
+            started_at,
+            finished_at,
+            finished_at - started_at,
+            # 开发采样模式下 path 指向采样文件，指纹按完整数据计算
+            dataset_fingerprint(configurable.get("full_data_path") or configurable.get("path")),
+            json.dumps(config, ensure_ascii=False, default=str),
+            json.dumps({**summarize_state(state or {}), **(usage or {})}, ensure_ascii=False),
+            json.dumps(artifacts, ensure_ascii=False),
+            error,
+        )
+        with self._lock, self._connect() as conn:
+            conn.execute(f"INSERT OR REPLACE INTO runs VALUES ({', '.join('?' * len(_COLUMNS))})", row)
+        return self.get(run_id)
+
+    @staticmethod
+    def _to_record(row) -> RunRecord:
+        values = dict(zip(_COLUMNS, row, strict=True))
+        for key in ("config", "summary", "artifacts"):
+            values[key] = json.loads(values[key]) if values[key] else {}
+        return RunRecord(**values)
+
+    def get(self, run_id: str) -> Optional[RunRecord]:
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return self._to_record(row) if row else None
+
+    def list(
+        self,
+        task_type: Optional[str] = None,
+        owner: Optional[str] = None,
+        name: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[RunRecord]:
+        """按时间倒序列出运行记录"""
+        conditions, params = [], []
+        for column, value in (("task_type", task_type), ("owner", owner), ("name", name)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT {', '.join(_COLUMNS)} FROM runs {where} ORDER BY created_at DESC LIMIT ?"
+        with self._connect() as conn:
+            rows = conn.execute(query, (*params, limit)).fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def load_state(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """读取运行的完整图状态"""
+        path = self.run_dir(run_id) / "state.pkl"
+        if not path.exists():
+            return None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def delete(self, run_id: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+        shutil.rmtree(self.run_dir(run_id), ignore_errors=True)
+
+
+def collect_pickles(name: Optional[str], since: float) -> Dict[str, str]:
+    """收集运行期间保存的模型和数据 pickle，键为 "<type>/<文件名>"
+
+    baicai 的流程把 pickle 保存在 get_tmp_folder(type)/<name>/<prefix>_<时间戳>.pkl 中，
+    后续运行会写入新的文件，因此需要随运行记录保存副本。
+    """
+    if not name:
+        return {}
+    from baicai_base.utils.data import get_tmp_folder
+
+    files = {}
+    for kind in ("model", "data"):
+        folder = Path(get_tmp_folder(kind)) / name.lower()
+        if not folder.is_dir():
+            continue
+        for path in folder.glob("*.pkl"):
+            if path.stat().st_mtime >= since:
+                files[f"{kind}/{path.name}"] = str(path)
+    return files
+
+
+def latest_artifact(record: RunRecord, kind: str, prefix: str) -> Optional[Path]:
+    """运行记录中某类 pickle 的最新副本，对应 get_saved_pickle_path 的查找规则"""
+    candidates = [
+        path for key, path in record.artifacts.items() if key.startswith(f"{kind}/{prefix}_") and key.endswith(".pkl")
+    ]
+    return Path(max(candidates)) if candidates else None
+
+
+_store: Optional[RunStore] = None
+_store_lock = threading.Lock()
+
+
+def get_run_store() -> RunStore:
+    """获取进程级共享的运行记录库"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RunStore()
+        return _store
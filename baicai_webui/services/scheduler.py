@@ -0,0 +1,229 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - psutil 为可选依赖
+    psutil = None
+
+
+class JobClass(NamedTuple):
+    """任务类别及其占用的资源"""
+
+    name: str
+    cpu: int
+    memory_mb: int
+    label: str
+
+
+# 各类任务默认占用的 CPU 槽位和内存（MB），可以用环境变量 BAICAI_JOB_<NAME>_CPU / _MEMORY_MB 覆盖
+DEFAULT_JOB_CLASSES: Dict[str, JobClass] = {
+    "ml": JobClass("ml", cpu=1, memory_mb=1024, label="机器学习"),
+    "vision": JobClass("vision", cpu=2, memory_mb=4096, label="视觉训练"),
+    "nlp_train": JobClass("nlp_train", cpu=2, memory_mb=4096, label="NLP 训练"),
+    "nlp_infer": JobClass("nlp_infer", cpu=1, memory_mb=2048, label="NLP 推理"),
+    "collab": JobClass("collab", cpu=1, memory_mb=2048, label="协同过滤"),
+}
+
+
+def job_class_for(task_type: str) -> str:
+    """根据任务类型（TaskType 的值）返回任务类别名"""
+    if task_type == "ML":
+        return "ml"
+    if task_type == "Collaborative":
+        return "collab"
+    if task_type.startswith("Vision"):
+        return "vision"
+    if task_type.endswith("Inference"):
+        return "nlp_infer"
+    if task_type == "NLP" or task_type.endswith("Trainer"):
+        return "nlp_train"
+    return "ml"
+
+
+class AdmissionError(RuntimeError):
+    """任务未被接纳（超过个人限额、队列已满或资源需求超过服务器容量）"""
+
+
+class _Ticket:
+    def __init__(self, job_id: str, owner: Optional[str], job_class: JobClass):
+        self.job_id = job_id
+        self.owner = owner
+        self.job_class = job_class
+        self.enqueued_at = time.monotonic()
+        self.future: Optional[asyncio.Future] = None
+
+
+class ResourceScheduler:
+    """服务器级训练任务调度器
+
+    每类任务占用固定的 CPU 槽位和内存，空闲资源不足时任务在队列中等待。
+    队列按公平方式排序：正在运行任务较少的用户优先，同一用户内部先进先出；
+    只有排在队首的任务可以启动，避免大任务被小任务一直插队。
+
+    提交前通过 ``admit`` 做准入检查：每个用户同时排队和运行的任务数、队列总长度都有上限。
+    给出 ``job_id`` 时准入即预留名额，直到 ``acquire`` 入队或 ``release``，并发提交不会同时通过检查。
+    ``try_acquire`` 不排队，只在有空闲资源且没有任务在等待时立即占用，用于已运行任务临时借用额外的槽位。
+
+    ``acquire``/``release`` 在共享事件循环中调用，``position`` 等查询方法可以在任意线程调用。
+    """
+
+    def __init__(
+        self,
+        cpu_slots: Optional[int] = None,
+        memory_mb: Optional[int] = None,
+        per_user_limit: int = 2,
+        max_queue: int = 50,
+        job_classes: Optional[Dict[str, JobClass]] = None,
+    ):
+        self.cpu_slots = cpu_slots or os.cpu_count() or 1
+        if memory_mb is None and psutil is not None:
+            # 给界面进程和系统保留 20% 内存
+            memory_mb = int(psutil.virtual_memory().total / 1024 / 1024 * 0.8)
+        self.memory_mb = memory_mb
+        self.per_user_limit = per_user_limit
+        self.max_queue = max_queue
+        self.job_classes = dict(job_classes or DEFAULT_JOB_CLASSES)
+        self._waiting: List[_Ticket] = []
+        self._running: Dict[str, _Ticket] = {}
+        self._reserved: Dict[str, _Ticket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ResourceScheduler":
+        """从环境变量读取配置
+
+        - BAICAI_SCHEDULER_CPU: CPU 槽位总数，默认 CPU 核数
+        - BAICAI_SCHEDULER_MEMORY_MB: 可分配内存，默认物理内存的 80%
+        - BAICAI_MAX_JOBS_PER_USER: 每个用户同时排队和运行的任务数，默认 2
+        - BAICAI_MAX_QUEUE: 排队任务总数上限，默认 50
+        - BAICAI_JOB_<NAME>_CPU / BAICAI_JOB_<NAME>_MEMORY_MB: 覆盖某类任务的资源需求
+        """
+        job_classes = {}
+        for name, job_class in DEFAULT_JOB_CLASSES.items():
+            prefix = f"BAICAI_JOB_{name.upper()}"
+            job_classes[name] = job_class._replace(
+                cpu=int(os.environ.get(f"{prefix}_CPU", job_class.cpu)),
+                memory_mb=int(os.environ.get(f"{prefix}_MEMORY_MB", job_class.memory_mb)),
+            )
+        memory_mb = os.environ.get("BAICAI_SCHEDULER_MEMORY_MB")
+        return cls(
+            cpu_slots=int(os.environ.get("BAICAI_SCHEDULER_CPU", 0)) or None,
+            memory_mb=int(memory_mb) if memory_mb else None,
+            per_user_limit=int(os.environ.get("BAICAI_MAX_JOBS_PER_USER", 2)),
+            max_queue=int(os.environ.get("BAICAI_MAX_QUEUE", 50)),
+            job_classes=job_classes,
+        )
+
+    def get_class(self, name: str) -> JobClass:
+        if name not in self.job_classes:
+            raise ValueError(f"未知的任务类别: {name}")
+        return self.job_classes[name]
+
+    def admit(self, owner: Optional[str], job_class: str, job_id: Optional[str] = None) -> None:
+        """准入检查，不满足条件时抛出 AdmissionError；给出 job_id 时为该任务预留名额"""
+        cls = self.get_class(job_class)
+        if cls.cpu > self.cpu_slots or (self.memory_mb is not None and cls.memory_mb > self.memory_mb):
+            raise AdmissionError(f"{cls.label}任务需要的资源超过服务器容量")
+        with self._lock:
+            if len(self._waiting) + len(self._reserved) >= self.max_queue:
+                raise AdmissionError("排队的任务太多，请稍后再试")
+            if owner is not None and self.per_user_limit:
+                tickets = [*self._reserved.values(), *self._waiting, *self._running.values()]
+                if sum(t.owner == owner for t in tickets) >= self.per_user_limit:
+                    raise AdmissionError(f"每位用户最多同时运行或排队 {self.per_user_limit} 个任务，请等待已有任务完成")
+            if job_id is not None:
+                self._reserved[job_id] = _Ticket(job_id, owner, cls)
+
+    async def acquire(self, job_id: str, owner: Optional[str], job_class: str) -> None:
+        """排队等待资源，轮到该任务时返回；等待期间被取消会离开队列"""
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            ticket = self._reserved.pop(job_id, None) or _Ticket(job_id, owner, self.get_class(job_class))
+            ticket.future = future
+            self._waiting.append(ticket)
+            self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                else:
+                    # 已经分配到资源但还没开始运行
+                    self._running.pop(job_id, None)
+                self._dispatch()
+            raise
+
+    def try_acquire(self, job_id: str, owner: Optional[str], job_class: str) -> bool:
+        """不排队地占用资源：有任务在等待或资源不足时返回 False，占用成功后需调用 release 归还"""
+        ticket = _Ticket(job_id, owner, self.get_class(job_class))
+        with self._lock:
+            if self._waiting or not self._fits(ticket.job_class):
+                return False
+            self._running[job_id] = ticket
+            return True
+
+    def release(self, job_id: str) -> None:
+        """任务结束后归还资源或准入时预留的名额，并唤醒下一个任务"""
+        with self._lock:
+            self._running.pop(job_id, None)
+            self._reserved.pop(job_id, None)
+            self._dispatch()
+
+    def _used(self):
+        cpu = sum(t.job_class.cpu for t in self._running.values())
+        memory = sum(t.job_class.memory_mb for t in self._running.values())
+        return cpu, memory
+
+    def _ordered(self) -> List[_Ticket]:
+        running_per_owner: Dict[Optional[str], int] = {}
+        for ticket in self._running.values():
+            running_per_owner[ticket.owner] = running_per_owner.get(ticket.owner, 0) + 1
+        return sorted(self._waiting, key=lambda t: (running_per_owner.get(t.owner, 0), t.enqueued_at))
+
+    def _fits(self, job_class: JobClass) -> bool:
+        cpu, memory = self._used()
+        if cpu + job_class.cpu > self.cpu_slots:
+            return False
+        return self.memory_mb is None or memory + job_class.memory_mb <= self.memory_mb
+
+    def _dispatch(self) -> None:
+        # 调用方需持有 self._lock
+        while self._waiting:
+            head = self._ordered()[0]
+            if not self._fits(head.job_class):
+                return
+            self._waiting.remove(head)
+            self._running[head.job_id] = head
+            if not head.future.done():
+                head.future.get_loop().call_soon_threadsafe(_resolve, head.future)
+
+    def position(self, job_id: str) -> int:
+        """任务在队列中的位置，从 1 开始；不在队列中时返回 0"""
+        with self._lock:
+            for i, ticket in enumerate(self._ordered(), start=1):
+                if ticket.job_id == job_id:
+                    return i
+        return 0
+
+    def stats(self) -> Dict[str, int]:
+        """当前资源占用情况"""
+        with self._lock:
+            cpu, memory = self._used()
+            return {
+                "running": len(self._running),
+                "waiting": len(self._waiting),
+                "cpu_used": cpu,
+                "cpu_slots": self.cpu_slots,
+                "memory_used_mb": memory,
+                "memory_mb": self.memory_mb or 0,
+            }
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
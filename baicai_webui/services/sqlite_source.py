@@ -0,0 +1,162 @@
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+
+class SQLiteSource:
+    """SQLite 数据源适配器
+
+    只在数据库端做过滤、采样和分页，避免把整张表读入内存：
+    - 列出数据表及其行数
+    - 使用 LIMIT 预览
+    - 使用 ORDER BY RANDOM() 或 rowid 等距采样用于探索性分析
+    - 训练开始时按批次把完整结果流式写入 Parquet
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def _connect(self) -> "closing[sqlite3.Connection]":
+        """以只读方式打开数据库，避免误写用户上传的文件；在 with 块结束时关闭连接"""
+        return closing(sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True))
+
+    @staticmethod
+    def _quote(name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    def _source_sql(self, table: Optional[str] = None, query: Optional[str] = None) -> str:
+        """把数据表或自定义查询转换为可嵌套的 FROM 子句"""
+        if table:
+            return self._quote(table)
+        if query:
+            return f"({query.strip().rstrip(';')})"
+        raise ValueError("必须指定数据表或SQL查询")
+
+    def list_tables(self) -> List[Tuple[str, int]]:
+        """列出所有数据表和视图及其行数"""
+        with self._connect() as conn:
+            names = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type IN ('table', 'view') "
+                    "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+                )
+            ]
+            return [(name, conn.execute(f"SELECT COUNT(*) FROM {self._quote(name)}").fetchone()[0]) for name in names]
+
+    def count(self, table: Optional[str] = None, query: Optional[str] = None) -> int:
+        """统计数据表或查询结果的行数"""
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {self._source_sql(table, query)}").fetchone()[0]
+
+    def preview(self, table: Optional[str] = None, query: Optional[str] = None, limit: int = 5) -> pd.DataFrame:
+        """使用 LIMIT 预览前几行"""
+        with self._connect() as conn:
+            return pd.read_sql_query(f"SELECT * FROM {self._source_sql(table, query)} LIMIT ?", conn, params=(limit,))
+
+    def sample(
+        self,
+        table: Optional[str] = None,
+        query: Optional[str] = None,
+        n: int = 10000,
+        method: str = "random",
+    ) -> pd.DataFrame:
+        """在数据库端采样用于探索性分析
+
+        Args:
+            table: 数据表名
+            query: 自定义SQL查询，table 为空时使用
+            n: 采样行数
+            method: "random" 使用 ORDER BY RANDOM()，"stride" 按 rowid 等距采样（仅数据表可用）
+
+        Returns:
+            pd.DataFrame: 采样结果
+        """
+        source = self._source_sql(table, query)
+        with self._connect() as conn:
+            if method == "stride" and table:
+                total = conn.execute(f"SELECT COUNT(*) FROM {source}").fetchone()[0]
+                step = max(1, total // max(n, 1))
+                try:
+                    return pd.read_sql_query(
+                        f"SELECT * FROM {source} WHERE rowid % ? = 0 LIMIT ?", conn, params=(step, n)
+                    )
+                except pd.errors.DatabaseError:
+                    # 视图和 WITHOUT ROWID 表没有 rowid，退回随机采样
+                    pass
+            return pd.read_sql_query(f"SELECT * FROM {source} ORDER BY RANDOM() LIMIT ?", conn, params=(n,))
+
+    def iter_batches(
+        self, table: Optional[str] = None, query: Optional[str] = None, batch_size: int = 50000
+    ) -> Iterator[pd.DataFrame]:
+        """按批次读取完整结果"""
+        with self._connect() as conn:
+            yield from pd.read_sql_query(f"SELECT * FROM {self._source_sql(table, query)}", conn, chunksize=batch_size)
+
+    def to_parquet(
+        self,
+        dest,
+        table: Optional[str] = None,
+        query: Optional[str] = None,
+        batch_size: int = 50000,
+    ) -> Path:
+        """按批次把完整结果流式写入 Parquet，内存占用只与批次大小有关
+
+        先写入临时文件，成功后再替换目标文件，避免中断时留下不完整的 Parquet。
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dest = dest.with_suffix(".parquet.part")
+
+        writer = None
+        try:
+            for batch in self.iter_batches(table=table, query=query, batch_size=batch_size):
+                if writer is None:
+                    arrow_table = pa.Table.from_pandas(batch, preserve_index=False)
+                    writer = pq.ParquetWriter(tmp_dest, arrow_table.schema)
+                else:
+                    # 后续批次按第一批的 schema 对齐（例如整数列某一批全为空时）
+                    arrow_table = pa.Table.from_pandas(batch, schema=writer.schema, preserve_index=False)
+                writer.write_table(arrow_table)
+            if writer is None:
+                # 空结果也要保留列信息
+                empty = self.preview(table=table, query=query, limit=0)
+                pq.write_table(pa.Table.from_pandas(empty, preserve_index=False), tmp_dest)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        tmp_dest.replace(dest)
+        return dest
+
+
+def ensure_sqlite_extract(configurable: Dict[str, Any], batch_size: int = 50000) -> Optional[Path]:
+    """训练开始前按需把 SQLite 数据源完整导出到配置中的 Parquet 路径
+
+    上传阶段只在数据库端采样，完整导出推迟到真正开始训练时进行；
+    如果导出文件已存在且比数据库新，则直接复用。
+
+    Args:
+        configurable: 图配置中的 configurable 字段
+
+    Returns:
+        Path | None: 导出的 Parquet 路径，非 SQLite 数据源时返回 None
+    """
+    source = configurable.get("sqlite_source")
+    if not source:
+        return None
+
+    dest = Path(configurable["path"])
+    db_path = Path(source["db_path"])
+    if dest.exists() and dest.stat().st_mtime >= db_path.stat().st_mtime:
+        return dest
+
+    return SQLiteSource(db_path).to_parquet(
+        dest, table=source.get("table"), query=source.get("query"), batch_size=batch_size
+    )
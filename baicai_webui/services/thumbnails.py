@@ -0,0 +1,90 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+THUMBNAIL_MAX_EDGE = 256
+
+
+@lru_cache(maxsize=65536)
+def _content_key(path: str, size: int, mtime_ns: int) -> str:
+    """文件内容哈希；按 (路径, 大小, 修改时间) 记忆，未修改的文件不会重复读取"""
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_thumbnail(src, cache_dir, max_edge: int = THUMBNAIL_MAX_EDGE) -> Optional[Path]:
+    """生成缩略图并按内容哈希缓存到磁盘
+
+    相同内容的图片（即使路径不同）共用一个缩略图。JPEG 使用 draft 模式在解码时
+    直接缩小，避免完整解码大图。
+
+    Args:
+        src: 原图路径
+        cache_dir: 缩略图缓存目录
+        max_edge: 缩略图最长边的像素数
+
+    Returns:
+        Path | None: 缩略图路径，原图无法读取时返回 None
+    """
+    from PIL import Image
+
+    try:
+        stat = os.stat(src)
+        key = _content_key(str(src), stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return None
+
+    dest = Path(cache_dir) / f"{max_edge}" / key[:2] / f"{key}.jpg"
+    if dest.exists():
+        return dest
+
+    try:
+        with Image.open(src) as img:
+            img.draft("RGB", (max_edge, max_edge))
+            img.thumbnail((max_edge, max_edge))
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再替换，避免并发生成时读到不完整的缩略图
+            tmp_dest = dest.with_suffix(f".{os.getpid()}.{id(img)}.part")
+            img.save(tmp_dest, "JPEG", quality=85)
+        tmp_dest.replace(dest)
+    except Exception:
+        return None
+    return dest
+
+
+class ThumbnailCache:
+    """缩略图缓存
+
+    使用线程池并行生成缩略图（Pillow 在解码和缩放时会释放 GIL），
+    并支持在后台预先生成下一组图片的缩略图。
+    """
+
+    def __init__(self, cache_dir=None, max_edge: int = THUMBNAIL_MAX_EDGE, max_workers: Optional[int] = None):
+        if cache_dir is None:
+            from baicai_base.utils.data import get_tmp_folder
+
+            cache_dir = get_tmp_folder("data") / "thumbnails"
+        self.cache_dir = Path(cache_dir)
+        self.max_edge = max_edge
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or min(8, (os.cpu_count() or 1) + 2))
+
+    def get(self, src) -> Optional[Path]:
+        """获取单张图片的缩略图"""
+        return make_thumbnail(src, self.cache_dir, self.max_edge)
+
+    def get_many(self, paths: Iterable) -> List[Optional[Path]]:
+        """并行获取多张图片的缩略图，顺序与输入一致"""
+        return list(self._executor.map(self.get, paths))
+
+    def prefetch(self, paths: Iterable) -> None:
+        """在后台生成缩略图，不等待结果"""
+        for path in paths:
+            self._executor.submit(self.get, path)
@@ -0,0 +1,260 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+
+
+class TrialBudget(NamedTuple):
+    """模型优化阶段超参数搜索的资源上限和试验预算
+
+    Attributes:
+        cpus: 同时评估试验的进程数上限
+        memory_mb: 所有评估进程合计的内存上限（MB），用于估算可以同时运行的进程数
+        max_trials: 最多评估的参数组合数，0 表示不限制
+        time_budget: 搜索的总时长上限（秒），0 表示不限制
+        patience: 连续多少批试验没有提升时提前停止，0 表示不提前停止
+    """
+
+    cpus: int = max(1, min(4, os.cpu_count() or 1))
+    memory_mb: int = 4096
+    max_trials: int = 50
+    time_budget: float = 600.0
+    patience: int = 3
+
+    @classmethod
+    def from_config(cls, configurable: Mapping[str, Any]) -> "TrialBudget":
+        """从运行配置读取 trial_cpus、trial_memory_mb、trial_max_trials、trial_time_budget、trial_patience"""
+        default = cls()
+        return cls(
+            cpus=max(1, int(configurable.get("trial_cpus") or default.cpus)),
+            memory_mb=max(256, int(configurable.get("trial_memory_mb") or default.memory_mb)),
+            max_trials=max(0, int(configurable.get("trial_max_trials", default.max_trials) or 0)),
+            time_budget=max(0.0, float(configurable.get("trial_time_budget", default.time_budget) or 0)),
+            patience=max(0, int(configurable.get("trial_patience", default.patience) or 0)),
+        )
+
+
+# 在代码解释器内核中执行，让生成代码中的 GridSearchCV/RandomizedSearchCV 按预算分批评估参数组合：
+# - 每批的参数组合由 loky 进程池并行评估，进程数受 CPU 和内存上限约束，各进程内部只用单线程
+# - 超过试验数量上限的组合不再评估，超过总时长或连续多批没有提升时提前停止
+# - 每个试验的参数、得分和耗时追加写入 trials_path（JSON Lines），供界面展示
+# 直接修改类的方法而不是定义子类，搜索对象仍可以正常 pickle；原方法保存在 _search 模块中，
+# 运行结束后由 TRIAL_TEARDOWN 恢复，归还给池的内核不会带着上一个会话的预算和记录文件
+_PRELUDE_TEMPLATE = """
+def _baicai_trial_setup(trials_path, cpus, memory_mb, max_trials, time_budget, patience):
+    import json as _json
+    import math as _math
+    import os as _os
+    import time as _time
+
+    from joblib import parallel_config as _parallel_config
+    from sklearn.model_selection import _search
+    from sklearn.model_selection import GridSearchCV as _Grid, RandomizedSearchCV as _Randomized
+
+    if not getattr(_search, "_baicai_trial_installed", False):
+        _search._baicai_trial_originals = {{
+            cls: {{name: cls.__dict__.get(name) for name in ("fit", "_run_search")}} for cls in (_Grid, _Randomized)
+        }}
+        _search._baicai_trial_loky = _os.environ.get("LOKY_MAX_CPU_COUNT")
+    _os.environ["LOKY_MAX_CPU_COUNT"] = str(cpus)
+    _search._baicai_trial_settings = dict(
+        trials_path=trials_path,
+        cpus=cpus,
+        memory_mb=memory_mb,
+        max_trials=max_trials,
+        time_budget=time_budget,
+        patience=patience,
+    )
+    if getattr(_search, "_baicai_trial_installed", False):
+        return
+
+    def _data_mb(X):
+        try:
+            if hasattr(X, "memory_usage"):
+                return float(X.memory_usage(deep=True).sum()) / 2**20
+            return float(getattr(X, "nbytes", 0)) / 2**20
+        except Exception:
+            return 0.0
+
+    def _record(row):
+        with open(_search._baicai_trial_settings["trials_path"], "a", encoding="utf-8") as f:
+            f.write(_json.dumps(row, ensure_ascii=False, default=str) + "\\n")
+
+    def _scores(search, results, size):
+        if "mean_test_score" in results:
+            key = "mean_test_score"
+        elif isinstance(search.refit, str) and f"mean_test_{{search.refit}}" in results:
+            key = f"mean_test_{{search.refit}}"
+        else:
+            key = next(name for name in results if name.startswith("mean_test_"))
+        return [float(value) for value in results[key][-size:]], [
+            float(value) for value in results["mean_fit_time"][-size:]
+        ]
+
+    def _patch(cls, candidates_of):
+        original_fit = cls.fit
+
+        def fit(self, X, y=None, **params):
+            settings = _search._baicai_trial_settings
+            # 每个评估进程大约需要数据的三倍内存（数据副本、交叉验证切分和模型），另加固定开销
+            per_worker = 256 + 3 * _data_mb(X)
+            self._baicai_workers = max(1, min(settings["cpus"], int(settings["memory_mb"] // per_worker)))
+            n_jobs = self.n_jobs
+            self.n_jobs = self._baicai_workers
+            try:
+                with _parallel_config(backend="loky", inner_max_num_threads=1):
+                    return original_fit(self, X, y, **params)
+            finally:
+                self.n_jobs = n_jobs
+
+        def _run_search(self, evaluate_candidates):
+            settings = _search._baicai_trial_settings
+            candidates = list(candidates_of(self))
+            total = len(candidates)
+            if settings["max_trials"]:
+                candidates = candidates[: settings["max_trials"]]
+            workers = getattr(self, "_baicai_workers", 1)
+            search = type(self).__name__
+            estimator = type(self.estimator).__name__
+            started = _time.monotonic()
+            best, stale, done, stop = -_math.inf, 0, 0, "completed" if len(candidates) == total else "max_trials"
+
+            while done < len(candidates):
+                if settings["time_budget"] and _time.monotonic() - started >= settings["time_budget"]:
+                    stop = "time_budget"
+                    break
+                batch = candidates[done : done + workers]
+                results = evaluate_candidates(batch)
+                scores, fit_times = _scores(self, results, len(batch))
+                for offset, (params, score, fit_time) in enumerate(zip(batch, scores, fit_times)):
+                    _record(
+                        {{
+                            "event": "trial",
+                            "search": search,
+                            "estimator": estimator,
+                            "trial": done + offset + 1,
+                            "params": params,
+                            "score": None if _math.isnan(score) else score,
+                            "fit_time": fit_time,
+                            "elapsed": round(_time.monotonic() - started, 3),
+                        }}
+                    )
+                done += len(batch)
+                batch_best = max((score for score in scores if not _math.isnan(score)), default=-_math.inf)
+                if batch_best > best + 1e-4:
+                    best, stale = batch_best, 0
+                else:
+                    stale += 1
+                if settings["patience"] and stale >= settings["patience"] and done < len(candidates):
+                    stop = "early_stopped"
+                    break
+
+            _record(
+                {{
+                    "event": "summary",
+                    "search": search,
+                    "estimator": estimator,
+                    "candidates": total,
+                    "evaluated": done,
+                    "workers": workers,
+                    "best_score": None if best == -_math.inf else best,
+                    "stop_reason": stop,
+                    "seconds": round(_time.monotonic() - started, 3),
+                }}
+            )
+
+        cls.fit = fit
+        cls._run_search = _run_search
+
+    _patch(_Grid, lambda self: _search.ParameterGrid(self.param_grid))
+    _patch(
+        _Randomized,
+        lambda self: _search.ParameterSampler(self.param_distributions, self.n_iter, random_state=self.random_state),
+    )
+    _search._baicai_trial_installed = True
+
+
+_baicai_trial_setup({trials_path!r}, {cpus!r}, {memory_mb!r}, {max_trials!r}, {time_budget!r}, {patience!r})
+del _baicai_trial_setup
+"""
+
+# 恢复 trial_prelude 修改过的搜索类方法和环境变量，没有执行过预置代码时不做任何事
+TRIAL_TEARDOWN = """
+def _baicai_trial_teardown():
+    import os as _os
+    import sys as _sys
+
+    _search = _sys.modules.get("sklearn.model_selection._search")
+    if _search is None or not getattr(_search, "_baicai_trial_installed", False):
+        return
+    for cls, methods in _search._baicai_trial_originals.items():
+        for name, method in methods.items():
+            if method is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, method)
+    if _search._baicai_trial_loky is None:
+        _os.environ.pop("LOKY_MAX_CPU_COUNT", None)
+    else:
+        _os.environ["LOKY_MAX_CPU_COUNT"] = _search._baicai_trial_loky
+    for name in ("_baicai_trial_installed", "_baicai_trial_originals", "_baicai_trial_loky", "_baicai_trial_settings"):
+        delattr(_search, name)
+
+
+_baicai_trial_teardown()
+del _baicai_trial_teardown
+"""
+
+
+def trial_prelude(trials_path, budget: Optional[TrialBudget] = None) -> str:
+    """生成在代码解释器中启用按预算并行评估超参数搜索的代码
+
+    重复执行只会更新预算和记录文件，不会重复修改搜索类。运行结束后执行 ``TRIAL_TEARDOWN`` 恢复原方法。
+
+    Args:
+        trials_path: 试验记录文件（JSON Lines），需与界面进程共享同一文件系统
+        budget: 资源上限和试验预算，默认使用 ``TrialBudget()``
+    """
+    budget = budget or TrialBudget()
+    return _PRELUDE_TEMPLATE.format(trials_path=str(trials_path), **budget._asdict())
+
+
+def load_trials(trials_path) -> Dict[str, List[Dict[str, Any]]]:
+    """读取试验记录
+
+    Returns:
+        ``{"trials": [...], "searches": [...]}``：每个试验一行，每次搜索一条汇总
+    """
+    records: Dict[str, List[Dict[str, Any]]] = {"trials": [], "searches": []}
+    path = Path(trials_path)
+    if not path.exists():
+        return records
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        event = row.pop("event", "trial")
+        records["searches" if event == "summary" else "trials"].append(row)
+    return records
+
+
+def trials_markdown(records: Dict[str, List[Dict[str, Any]]]) -> str:
+    """每次搜索的汇总表，用于运行日志"""
+    reasons = {
+        "completed": "全部评估",
+        "max_trials": "达到试验上限",
+        "time_budget": "达到时长上限",
+        "early_stopped": "提前停止",
+    }
+    lines = [
+        "| 搜索 | 模型 | 已评估/候选 | 进程数 | 最优得分 | 结束原因 | 耗时（秒） |",
+        "| --- | --- | --- | --- | --- | --- | --- |",
+    ]
+    for row in records.get("searches", []):
+        best = f"{row['best_score']:.4f}" if row.get("best_score") is not None else "-"
+        lines.append(
+            f"| {row['search']} | {row['estimator']} | {row['evaluated']}/{row['candidates']} | {row['workers']} "
+            f"| {best} | {reasons.get(row['stop_reason'], row['stop_reason'])} | {row['seconds']} |"
+        )
+    return "\n".join(lines)
@@ -10,6 +10,7 @@ project_root = Path(__file__).parent.parent.parent.parent
 sys.path.append(str(project_root))
 
 from baicai_webui.components.base_page import BasePage
+from baicai_webui.services import AdmissionError, JobStatus
 from baicai_dev.utils.data import TaskType
 
 
@@ -75,63 +76,64 @@ def test_show_with_data_and_pre_train(base_page):
 
 
 def test_show_with_training(base_page):
-    """Test show method with training process."""
+    """Test show method submits a background job and stores the graph state once it finishes."""
+    mock_job = Mock(id="job1", finished=True, status=JobStatus.SUCCEEDED)
     mock_monitor = Mock()
-    mock_monitor.start_training = AsyncMock(return_value={"result": "success"})
-    mock_monitor.app = Mock()
-    mock_monitor.app.get_state = Mock(
-        return_value=Mock(values={"dl_codes": ["code1"], "dl_models": ["model1"], "dl_success": True})
+    mock_monitor.submit_training = Mock(return_value=mock_job)
+    mock_monitor.attach_job = Mock(
+        return_value={"dl_codes": ["code1"], "dl_models": ["model1"], "dl_success": True}
     )
-
-    # Create a mock async iterator for helper_node
-    class MockAsyncIterator:
-        def __init__(self):
-            self.items = [{"state": "update1"}, {"state": "update2"}]
-            self.index = 0
-
-        def __aiter__(self):
-            return self
-
-        async def __anext__(self):
-            if self.index >= len(self.items):
-                raise StopAsyncIteration
-            item = self.items[self.index]
-            self.index += 1
-            return item
-
-    mock_monitor.graph = Mock()
-    mock_monitor.graph.helper_node = Mock(return_value=MockAsyncIterator())
+    mock_manager = Mock()
+    mock_manager.get = Mock(side_effect=lambda job_id: mock_job if job_id == "job1" else None)
 
     st.session_state.page_state["monitor"] = mock_monitor
     st.session_state.page_state["helper_ready"] = False
 
     with (
-        patch("streamlit.success") as mock_success,
+        patch("baicai_webui.components.base_page.get_job_manager", return_value=mock_manager),
         patch("streamlit.button", return_value=True),
     ):
         base_page.show()
-        mock_monitor.start_training.assert_called_once()
-        mock_success.assert_called_once_with("训练已启动！")
+        mock_monitor.submit_training.assert_called_once()
+        assert mock_monitor.submit_training.call_args.kwargs["job_class"] == "ml"
+        assert st.session_state.page_state["job_id"] == "job1"
+        mock_monitor.show_job_progress.assert_called_once_with(mock_job)
+        mock_monitor.attach_job.assert_called_once_with(mock_job)
+        assert st.session_state.page_state["handled_job_id"] == "job1"
         assert st.session_state.graph_state["dl_codes"] == ["code1"]
         assert st.session_state.graph_state["dl_models"] == ["model1"]
         assert st.session_state.graph_state["dl_success"] is True
         assert st.session_state.page_state["helper_ready"] is True
+        assert st.session_state.page_state["run_post_train"] is True
 
 
 def test_show_with_training_error(base_page):
-    """Test show method when training fails."""
+    """Test show method when the scheduler rejects the job or reading the result fails."""
     mock_monitor = Mock()
-    mock_monitor.start_training = AsyncMock(side_effect=Exception("Training failed"))
+    mock_monitor.submit_training = Mock(side_effect=AdmissionError("排队的任务太多，请稍后再试"))
+    mock_manager = Mock()
+    mock_manager.get = Mock(return_value=None)
+    mock_manager.latest = Mock(return_value=None)
 
     st.session_state.page_state["monitor"] = mock_monitor
     st.session_state.page_state["helper_ready"] = False
 
     with (
-        patch("streamlit.error") as mock_error,
+        patch("baicai_webui.components.base_page.get_job_manager", return_value=mock_manager),
+        patch("streamlit.warning") as mock_warning,
         patch("streamlit.button", return_value=True),
     ):
         base_page.show()
-        mock_error.assert_called_once_with("训练失败：Training failed")
+        mock_warning.assert_called_once_with("排队的任务太多，请稍后再试")
+        assert st.session_state.page_state.get("job_id") is None
+        mock_monitor.show_job_progress.assert_not_called()
+
+    mock_job = Mock(id="job2", finished=True, status=JobStatus.FAILED)
+    mock_monitor.attach_job = Mock(side_effect=Exception("Training failed"))
+    with patch("streamlit.error") as mock_error:
+        base_page._handle_finished_job(mock_monitor, mock_job)
+        mock_error.assert_called_once_with("读取训练结果失败：Training failed")
+        assert st.session_state.page_state["helper_ready"] is False
 
 
 def test_show_with_post_train(base_page):
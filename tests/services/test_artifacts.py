@@ -0,0 +1,89 @@
+import contextlib
+import io
+import os
+import time
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from baicai_webui.services import (
+    ArtifactStore,
+    load_artifact,
+    parse_artifact_handles,
+    strip_artifact_handles,
+    sweep_artifacts,
+)
+
+
+def run_in_namespace(code: str) -> str:
+    """模拟代码解释器：执行代码并返回标准输出"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        exec(code, {})
+    return output.getvalue()
+
+
+class TestArtifacts:
+    """测试代码解释器与界面之间的产物通道"""
+
+    def test_figure_table_array(self, tmp_path):
+        """测试保存和读取图表、DataFrame 和数组"""
+        store = ArtifactStore("session", root=tmp_path)
+        code = store.prelude(dpi=50, fmt="png") + (
+            "import matplotlib.pyplot as plt\n"
+            "import numpy as np\n"
+            "import pandas as pd\n"
+            "fig, ax = plt.subplots()\n"
+            "ax.plot([1, 2, 3])\n"
+            "save_artifact(fig, name='plot')\n"
+            "save_artifact(pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']}))\n"
+            "save_artifact(np.arange(6).reshape(2, 3))\n"
+            "save_artifact(pd.DataFrame({'fig': [1, 2], 'figure': [3, 4]}))\n"
+            "print('done')\n"
+        )
+        output = run_in_namespace(code)
+        handles = parse_artifact_handles(output)
+        # 列名为 fig/figure 的 DataFrame 仍按表格保存
+        assert [h["kind"] for h in handles] == ["figure", "table", "array", "table"]
+        assert strip_artifact_handles(output).strip() == "done"
+
+        figure = store.figures(output)[0]
+        assert figure == tmp_path / "session" / "plot.png"
+        assert figure.read_bytes().startswith(b"\x89PNG")
+        pd.testing.assert_frame_equal(load_artifact(handles[1]), pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}))
+        np.testing.assert_array_equal(store.latest(output, kind="array"), np.arange(6).reshape(2, 3))
+        plt.close("all")
+
+    def test_save_current_figure(self, tmp_path):
+        """测试自动选择要保存的图表"""
+        store = ArtifactStore("session", root=tmp_path)
+        code = store.prelude() + (
+            "import matplotlib.pyplot as plt\n"
+            "plt.close('all')\n"
+            "print(save_current_figure(None, None))\n"
+            "plt.plot([1, 2])\n"
+            "import pandas as pd\n"
+            "fig = pd.DataFrame({'fig': [1, 2]})\n"
+            "save_current_figure(globals().get('plot'), globals().get('fig'))\n"
+        )
+        output = run_in_namespace(code)
+        assert output.startswith("None")
+        assert len(store.figures(output)) == 1
+
+        store.clear()
+        assert not store.path.exists()
+        plt.close("all")
+
+    def test_sweep(self, tmp_path):
+        """测试清理长时间没有新产物的会话目录，保留仍在使用的会话"""
+        old, live = ArtifactStore("old", root=tmp_path), ArtifactStore("live", root=tmp_path)
+        for store in (old, live):
+            store.path.mkdir()
+            (store.path / "a.png").write_bytes(b"")
+        os.utime(old.path, (time.time() - 7200, time.time() - 7200))
+        assert sweep_artifacts(tmp_path, max_age=3600) == 1
+        assert not old.path.exists() and live.path.exists()
+        live.clear()
+        assert not live.path.exists()
+        assert sweep_artifacts(tmp_path / "missing") == 0
@@ -0,0 +1,92 @@
+import asyncio
+import concurrent.futures
+import threading
+
+import pytest
+
+from baicai_webui.services import AsyncRunner, get_async_runner, run_async
+from baicai_webui.services.async_runner import SCRIPT_RUN_CONTEXT_ATTR_NAME
+
+
+@pytest.fixture
+def runner():
+    runner = AsyncRunner(name="test-runner")
+    yield runner
+    runner.stop()
+
+
+class TestAsyncRunner:
+    """测试常驻事件循环"""
+
+    def test_run_reuses_loop(self, runner):
+        """测试多次运行使用同一个事件循环"""
+
+        async def current_loop():
+            await asyncio.sleep(0)
+            return asyncio.get_running_loop()
+
+        assert runner.run(current_loop()) is runner.loop
+        assert runner.run(current_loop()) is runner.loop
+
+    def test_async_resource_survives_between_runs(self, runner):
+        """测试异步资源可以跨多次运行复用"""
+        lock = asyncio.Lock()
+
+        async def use_lock():
+            async with lock:
+                await asyncio.sleep(0)
+            return True
+
+        assert runner.run(use_lock())
+        assert runner.run(use_lock())
+
+    def test_exception_propagates(self, runner):
+        """测试协程中的异常传回调用方"""
+
+        async def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            runner.run(fail())
+
+    def test_timeout_cancels_coroutine(self, runner):
+        """测试超时后协程被取消"""
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(concurrent.futures.TimeoutError):
+            runner.run(slow(), timeout=0.05)
+        assert cancelled.wait(1)
+
+    def test_script_ctx_bound_per_step(self, runner):
+        """测试协程每一步都能看到调用方的 ScriptRunContext，结束后恢复"""
+        thread = threading.current_thread()
+        seen = []
+
+        async def read_ctx():
+            seen.append(getattr(threading.current_thread(), SCRIPT_RUN_CONTEXT_ATTR_NAME, None))
+            await asyncio.sleep(0.01)
+            seen.append(getattr(threading.current_thread(), SCRIPT_RUN_CONTEXT_ATTR_NAME, None))
+
+        setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, "session-a")
+        try:
+            runner.run(read_ctx())
+        finally:
+            delattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME)
+        assert seen == ["session-a", "session-a"]
+
+        async def loop_thread_ctx():
+            return getattr(threading.current_thread(), SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+
+        assert runner.run(loop_thread_ctx()) is None
+
+    def test_shared_runner(self):
+        """测试进程级共享的事件循环"""
+        assert get_async_runner() is get_async_runner()
+        assert run_async(asyncio.sleep(0, result=42)) == 42
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from baicai_webui.services import (
+    JobManager,
+    JobStatus,
+    ResourceScheduler,
+    RunTimeouts,
+    cell_timeout,
+    get_async_runner,
+    run_with_deadline,
+    wait_interruptible,
+)
+
+
+class FakeKernelManager:
+    def __init__(self):
+        self.interrupts = 0
+
+    async def interrupt_kernel(self):
+        self.interrupts += 1
+
+
+class FakeClient:
+    def __init__(self):
+        self.km = FakeKernelManager()
+        self.timeout = 600
+
+
+class FakeInterpreter:
+    """只提供 nb_client.km 和 timeout 的解释器替身"""
+
+    def __init__(self):
+        self.nb_client = FakeClient()
+        self.timeout = 600
+
+
+class RerunRequested(BaseException):
+    """模拟 Streamlit 在脚本线程中抛出的重新运行异常"""
+
+
+class TestCancellation:
+    """测试运行的取消和时长上限"""
+
+    def test_timeouts_from_config(self):
+        """测试从运行配置读取时长上限，0 或空值表示不限制"""
+        assert RunTimeouts.from_config({"run_timeout": 120, "node_timeout": 0}) == RunTimeouts(run=120.0, node=0.0)
+        assert RunTimeouts.from_config({"run_timeout": None}).run == 0.0
+        assert RunTimeouts.from_config({}).node == RunTimeouts().node
+
+    def test_cell_timeout(self):
+        """测试单次代码执行的超时在上下文中生效，退出后恢复"""
+        interpreter = FakeInterpreter()
+        with cell_timeout(interpreter, 30):
+            assert interpreter.timeout == 30 and interpreter.nb_client.timeout == 30
+        assert interpreter.timeout == 600 and interpreter.nb_client.timeout == 600
+        with cell_timeout(interpreter, 0):
+            assert interpreter.nb_client.timeout is None
+        with cell_timeout(None, 30):
+            pass
+
+    def test_deadline_interrupts_kernel(self):
+        """测试超过时长上限时中断内核并给出说明"""
+        interpreter = FakeInterpreter()
+        with pytest.raises(asyncio.TimeoutError, match="0.05 秒"):
+            get_async_runner().run(run_with_deadline(asyncio.sleep(10), 0.05, interpreter))
+        assert interpreter.nb_client.km.interrupts == 1
+        assert get_async_runner().run(run_with_deadline(asyncio.sleep(0, result=7), 0, interpreter)) == 7
+        assert interpreter.nb_client.km.interrupts == 1
+
+    def test_cancelled_job_interrupts_and_releases_slot(self):
+        """测试取消任务时中断内核，并释放调度器的资源槽位"""
+        interpreter = FakeInterpreter()
+        scheduler = ResourceScheduler(cpu_slots=1, memory_mb=1024)
+        manager = JobManager(scheduler=scheduler)
+        started = threading.Event()
+
+        async def runaway(job):
+            started.set()
+            await run_with_deadline(asyncio.sleep(10), 0, interpreter)
+
+        job = manager.submit(runaway, kind="ml", job_class="ml")
+        assert started.wait(5)
+        assert job.cancel()
+        job.wait(5)
+        assert job.status == JobStatus.CANCELLED
+        assert interpreter.nb_client.km.interrupts == 1
+        assert scheduler.stats()["running"] == 0
+
+    def test_wait_interruptible(self):
+        """测试轮询中的异常（页面重新运行）会取消后台协程，协程自身的超时错误照常抛出"""
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        def on_poll(waited):
+            raise RerunRequested
+
+        future = get_async_runner().submit(slow(), bind_script_ctx=False)
+        with pytest.raises(RerunRequested):
+            wait_interruptible(future, on_poll, interval=0.05)
+        assert cancelled.wait(5)
+
+        async def timed_out():
+            await asyncio.sleep(0.1)
+            raise asyncio.TimeoutError("运行超时")
+
+        polls = []
+        started = time.monotonic()
+        future = get_async_runner().submit(timed_out(), bind_script_ctx=False)
+        with pytest.raises(asyncio.TimeoutError, match="运行超时"):
+            wait_interruptible(future, polls.append, interval=0.02)
+        assert polls and time.monotonic() - started < 5
+
+    def test_wait_interruptible_detached(self):
+        """测试 cancel_on_exit=False 时页面重新运行不取消后台协程，下次运行可以重新等待结果"""
+
+        async def slow():
+            await asyncio.sleep(0.2)
+            return "done"
+
+        def on_poll(waited):
+            raise RerunRequested
+
+        future = get_async_runner().submit(slow(), bind_script_ctx=False)
+        with pytest.raises(RerunRequested):
+            wait_interruptible(future, on_poll, interval=0.02, cancel_on_exit=False)
+        assert not future.cancelled()
+        assert wait_interruptible(future, lambda waited: None, interval=0.02, cancel_on_exit=False) == "done"
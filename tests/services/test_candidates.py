@@ -0,0 +1,106 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from baicai_webui.services import (
+    InterpreterPool,
+    candidate_code,
+    parse_metrics,
+    promote_winner,
+    rank_candidates,
+    run_async,
+    run_candidates,
+)
+
+BASELINE = """
+rf_model = RandomForest(n_estimators=10, random_state=42, max_depth=5, min_samples_leaf=20)
+rf_model.fit(X, y)
+saved_file_name = data_folder / f"baseline_{timestamp}.pkl"
+model_path = model_folder / f"baseline_{timestamp}.pkl"
+"""
+
+
+def output(f1, train=0.9):
+    return f"Training f1_score: {train}\nValidation f1_score: {f1}\nValidation accuracy_score: 0.5\n"
+
+
+class SlowInterpreter:
+    """每段代码耗时 0.2 秒，按代码中的模型族返回不同的指标"""
+
+    scores = {"linear": 0.7, "tree": 0.8, "boosting": 0.85}
+
+    def __init__(self):
+        self.nb = SimpleNamespace(cells=[])
+
+    async def run(self, code):
+        await asyncio.sleep(0.2)
+        for family, score in self.scores.items():
+            if f"candidate_{family}_" in code:
+                return output(score), True
+        return "", True
+
+    async def terminate(self):
+        pass
+
+
+class TestCandidates:
+    """测试并行候选模型基线"""
+
+    def test_candidate_code(self):
+        """测试只替换模型和保存路径"""
+        code = candidate_code(BASELINE, "boosting", classification=False)
+        assert "rf_model = HistGradientBoostingRegressor(random_state=42)" in code
+        assert "from sklearn.ensemble import HistGradientBoostingClassifier" in code
+        assert 'f"candidate_boosting_{timestamp}.pkl"' in code
+        assert "baseline_" not in code
+        assert "rf_model.fit(X, y)" in code
+
+        with pytest.raises(ValueError):
+            candidate_code(BASELINE, "svm", classification=True)
+        with pytest.raises(ValueError):
+            candidate_code("print(1)", "linear", classification=True)
+
+    def test_rank_candidates(self):
+        """测试按主指标排名，失败的候选排在最后"""
+        assert parse_metrics(output(0.8)) == {
+            "train": {"f1_score": 0.9},
+            "valid": {"f1_score": 0.8, "accuracy_score": 0.5},
+        }
+        results = {
+            "linear": {"output": output(0.7), "success": True, "seconds": 1.0},
+            "tree": {"output": "Traceback\nValueError: bad", "success": False, "seconds": 0.5},
+            "boosting": {"output": output(0.85), "success": True, "seconds": 2.0},
+        }
+        board = rank_candidates(results, classification=True)
+        assert [row["family"] for row in board] == ["boosting", "linear", "tree"]
+        assert [row["rank"] for row in board] == [1, 2, 3]
+        assert board[0]["score"] == 0.85 and board[0]["train_score"] == 0.9
+        assert board[2]["error"] == "ValueError: bad"
+
+        rmse = {
+            "linear": {"output": "Validation root_mean_squared_error: 0.3", "success": True},
+            "tree": {"output": "Validation root_mean_squared_error: 0.2", "success": True},
+        }
+        assert rank_candidates(rmse, classification=False)[0]["family"] == "tree"
+
+    def test_run_candidates_in_parallel(self):
+        """测试候选在各自的解释器中同时运行，总耗时接近单个候选"""
+        pool = InterpreterPool(size=0, factory=SlowInterpreter)
+        codes = {family: candidate_code(BASELINE, family, True) for family in ("linear", "tree", "boosting")}
+        started = time.perf_counter()
+        results = run_async(run_candidates(codes, pool))
+        assert time.perf_counter() - started < 0.5
+        assert rank_candidates(results, True)[0]["family"] == "boosting"
+        stats = pool.stats()
+        assert (stats["misses"], stats["leased"]) == (3, 0)
+
+    def test_promote_winner(self, tmp_path):
+        """测试最优候选的模型和数据复制为基线前缀"""
+        model = tmp_path / "candidate_boosting_20240101-000000.pkl"
+        model.write_bytes(b"model")
+        log = f"The model is saved to {model}\nThe pickled data is saved to {tmp_path / 'missing.pkl'}\n"
+        promoted = promote_winner(log)
+        assert promoted == {"model": tmp_path / "baseline_20240101-000000.pkl"}
+        assert promoted["model"].read_bytes() == b"model"
@@ -0,0 +1,105 @@
+import sqlite3
+from typing import List, TypedDict
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+from baicai_webui.services import SQLiteCheckpointSaver, run_async
+
+
+class State(TypedDict):
+    steps: List[str]
+
+
+def build_graph(memory, calls, fail_on=None):
+    """三个节点依次执行的小图，calls 记录实际运行的节点"""
+
+    def make_node(name):
+        def node(state):
+            calls.append(name)
+            if name == fail_on:
+                raise RuntimeError(f"{name} crashed")
+            return {"steps": state["steps"] + [name]}
+
+        return node
+
+    graph = StateGraph(State)
+    for name in ("a", "b", "c"):
+        graph.add_node(name, make_node(name))
+    graph.add_edge(START, "a")
+    graph.add_edge("a", "b")
+    graph.add_edge("b", "c")
+    graph.add_edge("c", END)
+    return graph.compile(checkpointer=memory)
+
+
+class TestSQLiteCheckpointSaver:
+    """测试持久化的图检查点"""
+
+    def test_state_survives_restart(self, tmp_path):
+        """测试新的 saver 实例（模拟重启）能读到已完成的运行"""
+        config = {"configurable": {"thread_id": "run1:baseline"}}
+        calls = []
+        app = build_graph(SQLiteCheckpointSaver(tmp_path / "ckpt.sqlite"), calls)
+        run_async(app.ainvoke({"steps": []}, config))
+        assert calls == ["a", "b", "c"]
+
+        reopened = build_graph(SQLiteCheckpointSaver(tmp_path / "ckpt.sqlite"), calls)
+        snapshot = reopened.get_state(config)
+        assert snapshot.values == {"steps": ["a", "b", "c"]}
+        assert snapshot.next == ()
+        assert len(list(reopened.get_state_history(config))) == len(list(app.get_state_history(config)))
+
+    def test_resume_from_last_completed_node(self, tmp_path):
+        """测试中途出错后，从最后完成的节点继续，已完成的节点不重新运行"""
+        config = {"configurable": {"thread_id": "run1:action"}}
+        calls = []
+        app = build_graph(SQLiteCheckpointSaver(tmp_path / "ckpt.sqlite"), calls, fail_on="b")
+        with pytest.raises(RuntimeError):
+            run_async(app.ainvoke({"steps": []}, config))
+        assert calls == ["a", "b"]
+
+        calls.clear()
+        resumed = build_graph(SQLiteCheckpointSaver(tmp_path / "ckpt.sqlite"), calls)
+        assert resumed.get_state(config).next == ("b",)
+        result = run_async(resumed.ainvoke(None, config))
+        assert calls == ["b", "c"]
+        assert result == {"steps": ["a", "b", "c"]}
+
+    def test_threads_release_and_delete(self, tmp_path):
+        """测试按前缀列出 thread、释放内存副本和删除 thread"""
+        saver = SQLiteCheckpointSaver(tmp_path / "ckpt.sqlite")
+        app = build_graph(saver, [])
+        for thread_id in ("run1:a", "run1:b", "run_2:a"):
+            run_async(app.ainvoke({"steps": []}, {"configurable": {"thread_id": thread_id}}))
+
+        assert saver.threads("run1:") == ["run1:a", "run1:b"]
+        assert saver.threads("run_") == ["run_2:a"]
+
+        config = {"configurable": {"thread_id": "run1:a"}}
+        saver.release("run1:a")
+        assert "run1:a" not in saver.storage
+        assert app.get_state(config).values == {"steps": ["a", "b", "c"]}
+
+        saver.delete_thread("run1:a")
+        assert saver.threads("run1:") == ["run1:b"]
+        assert SQLiteCheckpointSaver(tmp_path / "ckpt.sqlite").get_tuple(config) is None
+
+    def test_prune(self, tmp_path):
+        """测试清理长时间没有保存过检查点的 thread，自动清理每小时最多执行一次"""
+        path = tmp_path / "ckpt.sqlite"
+        saver = SQLiteCheckpointSaver(path)
+        app = build_graph(saver, [])
+        for thread_id in ("old:a", "new:a"):
+            run_async(app.ainvoke({"steps": []}, {"configurable": {"thread_id": thread_id}}))
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.execute("UPDATE checkpoints SET created_at = created_at - 7200 WHERE thread_id = 'old:a'")
+        conn.close()
+
+        assert saver.prune(max_age=3600) == ["old:a"]
+        assert saver.threads() == ["new:a"]
+        assert app.get_state({"configurable": {"thread_id": "old:a"}}).values == {}
+        assert saver.maybe_prune(max_age=0) == []
+        saver._pruned_at = 0.0
+        assert saver.maybe_prune(max_age=0) == ["new:a"]
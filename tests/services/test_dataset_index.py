@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from baicai_webui.services import ImageDatasetIndex
+
+
+@pytest.fixture
+def image_root(tmp_path):
+    root = tmp_path / "images"
+    for label, count in [("cat", 3), ("dog", 2)]:
+        (root / "train" / label).mkdir(parents=True)
+        for i in range(count):
+            (root / "train" / label / f"{i}.jpg").write_bytes(b"x" * (i + 1))
+    (root / "train" / "cat" / "notes.txt").write_text("not an image")
+    (root / ".hidden").mkdir()
+    (root / ".hidden" / "a.png").write_bytes(b"x")
+    return root
+
+
+class TestImageDatasetIndex:
+    """测试图片数据集索引"""
+
+    def test_build_index(self, image_root, tmp_path):
+        """测试首次建立索引"""
+        index = ImageDatasetIndex(image_root, index_dir=tmp_path / "index")
+        files = index.refresh()
+        assert files["path"].tolist() == [
+            "train/cat/0.jpg",
+            "train/cat/1.jpg",
+            "train/cat/2.jpg",
+            "train/dog/0.jpg",
+            "train/dog/1.jpg",
+        ]
+        assert index.summary() == {"num_images": 5, "total_size": 9, "num_folders": 4}
+
+    def test_queries(self, image_root, tmp_path):
+        """测试子目录、图片列表和类别统计"""
+        index = ImageDatasetIndex(image_root, index_dir=tmp_path / "index")
+        assert index.subfolders() == ["train"]
+        assert index.subfolders("train") == ["cat", "dog"]
+        assert index.image_files("train/dog", recursive=False) == [
+            image_root / "train" / "dog" / "0.jpg",
+            image_root / "train" / "dog" / "1.jpg",
+        ]
+        assert len(index.image_files("train")) == 5
+        assert index.image_files("train", recursive=False) == []
+        assert index.class_counts("train").to_dict() == {"cat": 3, "dog": 2}
+        assert index.class_counts().to_dict() == {"train": 5}
+        assert index.relative(image_root / "train") == "train"
+
+    def test_persisted_index_is_reused(self, image_root, tmp_path, monkeypatch):
+        """测试重新打开时复用磁盘上的索引，未变化的目录不会重新扫描"""
+        ImageDatasetIndex(image_root, index_dir=tmp_path / "index").refresh()
+
+        index = ImageDatasetIndex(image_root, index_dir=tmp_path / "index")
+        scanned = []
+        original_scan = index._scan_dir
+        monkeypatch.setattr(index, "_scan_dir", lambda folder: scanned.append(folder) or original_scan(folder))
+        assert len(index.refresh()) == 5
+        assert scanned == []
+
+    def test_incremental_refresh(self, image_root, tmp_path):
+        """测试新增和删除文件后只重新扫描变化的目录"""
+        index = ImageDatasetIndex(image_root, index_dir=tmp_path / "index")
+        index.refresh()
+
+        dog_dir = image_root / "train" / "dog"
+        (dog_dir / "2.jpg").write_bytes(b"xyz")
+        (image_root / "train" / "cat" / "0.jpg").unlink()
+        # 确保目录修改时间发生变化
+        for folder in [dog_dir, image_root / "train" / "cat"]:
+            stat = folder.stat()
+            os.utime(folder, (stat.st_atime, stat.st_mtime + 10))
+
+        files = index.refresh()
+        assert "train/dog/2.jpg" in files["path"].tolist()
+        assert "train/cat/0.jpg" not in files["path"].tolist()
+        assert index.class_counts("train").to_dict() == {"cat": 2, "dog": 3}
+
+    def test_version_changes_with_content(self, image_root, tmp_path):
+        """测试索引版本随内容变化"""
+        index = ImageDatasetIndex(image_root, index_dir=tmp_path / "index")
+        version = index.version
+        assert ImageDatasetIndex(image_root, index_dir=tmp_path / "index").version == version
+
+        (image_root / "train" / "dog" / "9.jpg").write_bytes(b"new")
+        stat = (image_root / "train" / "dog").stat()
+        os.utime(image_root / "train" / "dog", (stat.st_atime, stat.st_mtime + 10))
+        index.refresh()
+        assert index.version != version
@@ -0,0 +1,121 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from baicai_base.utils.data import extract_code
+from baicai_dev.utils.code_templates.ml import BASELINE_CODE, WORKFLOW_CODE
+
+from baicai_webui.services import (
+    COLUMNAR_LOADER_PRELUDE,
+    ensure_parquet_snapshot,
+    full_data_code,
+    full_data_path,
+    full_data_workflow_code,
+    saved_data_path,
+    stratified_sample,
+    use_dev_sample,
+)
+
+
+def make_table(rows: int = 5000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    # 少数类只占 0.4%
+    label = np.where(np.arange(rows) % 250 == 0, "rare", np.where(np.arange(rows) % 2 == 0, "a", "b"))
+    return pd.DataFrame({"x": rng.normal(size=rows), "y": rng.normal(size=rows) * 10, "label": label})
+
+
+class TestDevSample:
+    """测试大数据集的开发采样模式"""
+
+    def test_stratified_classification(self):
+        """测试分类任务按类别比例采样，少数类也会保留"""
+        df = make_table()
+        sample = stratified_sample(df, "label", 500, classification=True)
+        assert abs(len(sample) - 500) <= 3
+        counts = sample["label"].value_counts()
+        assert counts["rare"] >= 1
+        assert abs(counts["a"] / len(sample) - (df["label"] == "a").mean()) < 0.02
+
+    def test_stratified_regression_and_small(self):
+        """测试回归任务按目标分位区间采样，数据不足采样行数时原样返回"""
+        df = make_table()
+        sample = stratified_sample(df, "y", 1000, classification=False)
+        assert abs(len(sample) - 1000) <= 10
+        assert abs(sample["y"].median() - df["y"].median()) < 1.0
+        assert stratified_sample(df, "label", 10000) is df
+
+    def test_use_dev_sample(self, tmp_path):
+        """测试切换到采样数据、采样缓存复用，以及完整数据的 Parquet 快照"""
+        source = tmp_path / "big.csv"
+        make_table().to_csv(source, sep=";", index=False)
+        configurable = {
+            "path": str(source),
+            "delimiter": ";",
+            "target": "label",
+            "classification": True,
+            "dev_sample_rows": 1000,
+        }
+
+        sample = use_dev_sample(configurable)
+        assert configurable["path"] == str(sample) and sample.suffix == ".parquet"
+        assert full_data_path(configurable) == str(source)
+        assert abs(len(pd.read_parquet(sample)) - 1000) <= 3
+        mtime = sample.stat().st_mtime_ns
+        # 再次调用仍从完整数据出发，并复用缓存的采样文件
+        assert use_dev_sample(configurable) == sample
+        assert sample.stat().st_mtime_ns == mtime
+
+        snapshot = ensure_parquet_snapshot(configurable)
+        assert snapshot.suffix == ".parquet" and len(pd.read_parquet(snapshot)) == 5000
+        assert ensure_parquet_snapshot({"path": str(snapshot)}) == snapshot
+
+    def test_full_data_retrain(self, tmp_path, monkeypatch):
+        """测试用真实的基线和工作流模板在完整数据上重新训练：先重跑基线生成数据，工作流再读取新数据"""
+        monkeypatch.setenv("HOME", str(tmp_path))
+        source = tmp_path / "big.csv"
+        make_table(3000).to_csv(source, index=False)
+        configurable = {"path": str(source), "target": "label", "classification": True, "dev_sample_rows": 600}
+        sample = use_dev_sample(configurable)
+        snapshot = ensure_parquet_snapshot(configurable)
+
+        params = {
+            "delimiter": ",",
+            "ignored_features": [],
+            "date_feature": "",
+            "need_time": False,
+            "time_series": False,
+            "threshold": None,
+            "ordinal_features": [],
+            "classification": True,
+            "target": "label",
+            "avg_param": "weighted",
+            "name": "dev_sample",
+        }
+        baseline = extract_code(BASELINE_CODE.format(path=sample, **params))
+        # 工作流代码读取的是采样数据上运行基线时保存的数据，其中不出现采样数据的路径
+        workflow = extract_code(WORKFLOW_CODE.format(clean_data_path=tmp_path / "baseline_sample.pkl", **params))
+        with pytest.raises(ValueError):
+            full_data_code(workflow, sample, snapshot)
+
+        def run(code):
+            namespace, output = {}, io.StringIO()
+            with contextlib.redirect_stdout(output):
+                exec(COLUMNAR_LOADER_PRELUDE + "\n" + code, namespace)
+            return namespace, output.getvalue()
+
+        _, output = run(full_data_code(baseline, sample, snapshot))
+        clean_data = saved_data_path(output)
+        assert clean_data and clean_data.endswith(".pkl")
+
+        code = full_data_workflow_code(workflow, clean_data)
+        assert f'read_pickle(r"{clean_data}")' in code
+        namespace, _ = run(code)
+        # 模板中快速验证用的 1000 行抽样被跳过，训练使用完整数据
+        assert len(namespace["X_train"]) + len(namespace["X_test"]) == 3000
+        assert namespace["best_model"] is not None
+
+        assert saved_data_path("no data") is None
+        with pytest.raises(ValueError):
+            full_data_workflow_code("df = pd.read_csv('x.csv')", clean_data)
@@ -0,0 +1,111 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from baicai_webui.services import InterpreterPool, JobClass, ResourceScheduler, run_async, run_isolated
+
+
+class SleepInterpreter:
+    """代码形如 "sleep:<秒数>" 时等待相应时间，"fail" 时运行失败，记录同时运行的数量"""
+
+    running = 0
+    peak = 0
+
+    def __init__(self):
+        self.nb = SimpleNamespace(cells=[])
+        self.codes = []
+        self.terminated = False
+
+    async def run(self, code):
+        self.codes.append(code)
+        if code == "fail":
+            return "ValueError: bad", False
+        if code.startswith("sleep:"):
+            SleepInterpreter.running += 1
+            SleepInterpreter.peak = max(SleepInterpreter.peak, SleepInterpreter.running)
+            try:
+                await asyncio.sleep(float(code.split(":")[1]))
+            finally:
+                SleepInterpreter.running -= 1
+        return f"ran {code}", True
+
+    async def terminate(self):
+        self.terminated = True
+
+
+def make_pool():
+    SleepInterpreter.running = SleepInterpreter.peak = 0
+    created = []
+
+    def factory():
+        created.append(SleepInterpreter())
+        return created[-1]
+
+    return InterpreterPool(size=0, factory=factory), created
+
+
+class TestRunIsolated:
+    """测试在独立解释器中并发运行代码"""
+
+    def test_order_and_wall_time(self):
+        """测试结果按输入顺序返回，总耗时接近最慢的一段代码"""
+        pool, created = make_pool()
+        codes = ["sleep:0.3", "sleep:0.1", "fail", "sleep:0.2"]
+        started = time.perf_counter()
+        results = run_async(run_isolated(codes, pool, setup_code="load", max_concurrency=10))
+        assert time.perf_counter() - started < 0.6
+        assert [r["output"] for r in results] == ["ran sleep:0.3", "ran sleep:0.1", "ValueError: bad", "ran sleep:0.2"]
+        assert [r["success"] for r in results] == [True, True, False, True]
+        # 每段代码在各自的解释器中运行，都先运行准备代码
+        assert len(created) == 4
+        assert all(interpreter.codes[0] == "load" for interpreter in created)
+        assert pool.stats()["leased"] == 0
+
+    def test_concurrency_limit(self):
+        """测试同时运行的解释器数量不超过上限"""
+        pool, _ = make_pool()
+        run_async(run_isolated(["sleep:0.05"] * 6, pool, max_concurrency=2))
+        assert SleepInterpreter.peak == 2
+
+    def test_timeout_discards_interpreter(self):
+        """测试超时的代码被中断，其解释器直接关闭而不放回池中"""
+        pool, created = make_pool()
+        pool.size = 2
+        results = run_async(run_isolated(["sleep:5", "sleep:0"], pool, timeout=0.2))
+        assert results[0]["timed_out"] and not results[0]["success"]
+        assert results[0]["output"].startswith("TimeoutError")
+        assert results[1]["success"] and not results[1]["timed_out"]
+
+        slow = next(interpreter for interpreter in created if "sleep:5" in interpreter.codes)
+        deadline = time.time() + 5
+        while not slow.terminated and time.time() < deadline:
+            time.sleep(0.01)
+        assert slow.terminated
+        assert pool.stats()["retired"] >= 1
+
+    def test_setup_failure(self):
+        """测试准备代码失败时不运行后面的代码"""
+        pool, created = make_pool()
+        results = run_async(run_isolated(["sleep:0"], pool, setup_code="fail"))
+        assert not results[0]["success"]
+        assert "preparing data" in results[0]["output"]
+        assert created[0].codes == ["fail"]
+
+    def test_borrows_scheduler_slots(self):
+        """测试给出调度器时只借用空闲的槽位并发运行，结束后归还"""
+        pool, _ = make_pool()
+        scheduler = ResourceScheduler(
+            cpu_slots=3, memory_mb=1000, job_classes={"ml": JobClass("ml", cpu=1, memory_mb=100, label="机器学习")}
+        )
+        # 调用方所在的任务占用一个槽位，另有一个槽位空闲
+        assert scheduler.try_acquire("caller", None, "ml")
+        assert scheduler.try_acquire("other", None, "ml")
+        run_async(run_isolated(["sleep:0.05"] * 4, pool, max_concurrency=4, scheduler=scheduler))
+        assert SleepInterpreter.peak == 2
+        assert scheduler.stats()["running"] == 2
+
+        # 没有空闲槽位时按顺序运行
+        assert scheduler.try_acquire("third", None, "ml")
+        SleepInterpreter.peak = 0
+        run_async(run_isolated(["sleep:0.02"] * 3, pool, max_concurrency=4, scheduler=scheduler))
+        assert SleepInterpreter.peak == 1
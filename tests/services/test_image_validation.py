@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+from PIL import Image
+
+from baicai_webui.services import ImageDatasetIndex, summarize_validation, validate_image, validate_images
+
+
+@pytest.fixture
+def image_root(tmp_path):
+    root = tmp_path / "images"
+    (root / "cat").mkdir(parents=True)
+    (root / "dog").mkdir()
+    Image.new("RGB", (40, 20), "red").save(root / "cat" / "a.png")
+    Image.new("RGB", (40, 20), "red").save(root / "cat" / "b.png")
+    Image.new("L", (30, 30)).save(root / "cat" / "c.png")
+    Image.new("RGB", (30, 30), "blue").save(root / "dog" / "d.jpg")
+    (root / "dog" / "broken.jpg").write_bytes(b"not an image")
+    return root
+
+
+class TestImageValidation:
+    """测试图片数据集检查"""
+
+    def test_validate_image(self, image_root):
+        """测试单张图片检查"""
+        result = validate_image(str(image_root / "cat" / "a.png"))
+        assert result["ok"]
+        assert (result["format"], result["mode"], result["width"], result["height"]) == ("PNG", "RGB", 40, 20)
+
+        broken = validate_image(str(image_root / "dog" / "broken.jpg"), strict=True)
+        assert not broken["ok"]
+        assert broken["error"]
+
+    def test_validate_images_and_summary(self, image_root, tmp_path):
+        """测试批量检查和汇总"""
+        index = ImageDatasetIndex(image_root, index_dir=tmp_path / "index")
+        report = validate_images(index)
+        assert len(report) == 5
+        assert (index.index_dir / "validation.parquet").exists()
+
+        summary = summarize_validation(report, index.class_counts())
+        assert summary["invalid"]["path"].tolist() == ["dog/broken.jpg"]
+        assert summary["duplicates"]["path"].tolist() == ["cat/a.png", "cat/b.png"]
+        assert summary["modes"].to_dict() == {"RGB": 3, "L": 1}
+        assert summary["aspect_ratios"].to_dict() == {1.0: 2, 2.0: 2}
+        assert summary["imbalance"] == pytest.approx(1.5)
+
+    def test_validation_cache(self, image_root, tmp_path, monkeypatch):
+        """测试只重新检查变化的图片"""
+        index = ImageDatasetIndex(image_root, index_dir=tmp_path / "index")
+        validate_images(index)
+
+        checked = []
+        import baicai_webui.services.image_validation as module
+
+        original = module.validate_image
+        monkeypatch.setattr(module, "validate_image", lambda path, strict=False: checked.append(path) or original(path))
+        report = validate_images(index)
+        assert checked == []
+        assert isinstance(report, pd.DataFrame) and len(report) == 5
+
+        (image_root / "dog" / "broken.jpg").unlink()
+        Image.new("RGB", (10, 10)).save(image_root / "dog" / "e.png")
+        report = validate_images(index)
+        assert checked == [str(image_root / "dog" / "e.png")]
+        assert report["ok"].all()
@@ -0,0 +1,115 @@
+import time
+from types import SimpleNamespace
+
+from baicai_webui.services import TRIAL_TEARDOWN, InterpreterPool
+
+
+class FakeInterpreter:
+    """记录执行过的代码，模拟 LocalPythonInterpreter 的 run/terminate"""
+
+    def __init__(self):
+        self.nb = SimpleNamespace(cells=[])
+        self.codes = []
+        self.terminated = False
+
+    async def run(self, code):
+        self.codes.append(code)
+        self.nb.cells.append(code)
+        return "", True
+
+    async def terminate(self):
+        self.terminated = True
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestInterpreterPool:
+    """测试代码解释器预热池"""
+
+    def test_lease_warm_and_cold(self):
+        """测试预热后租用的解释器已执行预热代码，池空时冷启动"""
+        pool = InterpreterPool(size=1, warmup_code="import pandas", factory=FakeInterpreter)
+        pool.start()
+        assert wait_until(lambda: pool.stats()["idle"] == 1)
+
+        # 暂停补充，确保第二次租用时池为空
+        pool.size = 0
+        warm = pool.lease(owner="a")
+        assert warm.codes == ["import pandas"]
+        assert warm.nb.cells == []
+
+        cold = pool.lease(owner="b")
+        assert cold.codes == []
+        stats = pool.stats()
+        assert (stats["hits"], stats["misses"], stats["leased"]) == (1, 1, 2)
+
+        # 恢复后在后台补足预热的解释器
+        pool.size = 1
+        pool.start()
+        assert wait_until(lambda: pool.stats()["idle"] == 1)
+
+    def test_release_when_full(self):
+        """测试池中空闲解释器已满时，归还的解释器被关闭"""
+        pool = InterpreterPool(size=1, warmup_code="import pandas", factory=FakeInterpreter)
+        interpreter = pool.lease()
+        assert wait_until(lambda: pool.stats()["idle"] == 1)
+
+        pool.release(interpreter)
+        assert wait_until(lambda: interpreter.terminated)
+        assert pool.stats()["retired"] == 1
+        assert pool.stats()["leased"] == 0
+
+        pool.shutdown()
+        assert pool.stats()["idle"] == 0
+
+    def test_recycle_clears_state(self):
+        """测试池未满时，归还的解释器执行 %reset 后放回池中，可再次租用"""
+        pool = InterpreterPool(size=0, warmup_code="import pandas", factory=FakeInterpreter)
+        interpreter = pool.lease()
+        interpreter.nb.cells.append("x = 1")
+        pool.size = 1
+        pool.release(interpreter)
+        assert wait_until(lambda: pool.stats()["recycled"] == 1)
+        assert interpreter.codes[-1] == "%reset -f\n" + TRIAL_TEARDOWN + "import pandas"
+        assert interpreter.nb.cells == []
+        assert not interpreter.terminated
+        assert pool.lease() is interpreter
+        assert pool.stats()["hits"] == 1
+
+    def test_lifetime_and_lease_timeout(self):
+        """测试超过寿命的解释器不再复用，长时间无访问的租用被回收"""
+        pool = InterpreterPool(size=0, max_lifetime=0, lease_timeout=0.05, factory=FakeInterpreter)
+        old = pool.lease()
+        pool.release(old)
+        assert wait_until(lambda: old.terminated)
+
+        kept = pool.lease()
+        idle = pool.lease()
+        time.sleep(0.1)
+        pool.touch(kept)
+        assert pool.reap() == 1
+        assert wait_until(lambda: idle.terminated)
+        assert not kept.terminated
+        assert pool.stats()["expired"] == 1
+
+    def test_busy_and_kept_leases_not_reaped(self):
+        """测试正在运行任务或在保留期内的解释器不会被超时回收，结束后照常回收"""
+        pool = InterpreterPool(size=0, lease_timeout=0.05, factory=FakeInterpreter)
+        busy, kept = pool.lease(), pool.lease()
+        pool.keep(kept, 0.3)
+        with pool.in_use(busy):
+            time.sleep(0.1)
+            assert pool.reap() == 0
+        assert pool.is_leased(busy) and pool.is_leased(kept)
+
+        time.sleep(0.35)
+        assert pool.reap() == 2
+        assert not pool.is_leased(busy) and not pool.is_leased(kept)
+        assert wait_until(lambda: busy.terminated and kept.terminated)
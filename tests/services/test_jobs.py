@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+from baicai_webui.services import JobManager, JobStatus, get_job_manager
+
+
+class TestJobManager:
+    """测试后台任务管理器"""
+
+    def test_success(self):
+        """测试任务在后台运行并保存结果"""
+        manager = JobManager()
+
+        async def work(job):
+            job.emit("stage", message="running")
+            await asyncio.sleep(0.01)
+            return 42
+
+        job = manager.submit(work, kind="ml", owner="client-a", dataset="iris")
+        assert job.wait(5) == 42
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.finished
+        assert job.meta == {"dataset": "iris"}
+        assert job.elapsed > 0
+        assert [e["event"] for e in job.events()] == ["started", "stage", "finished"]
+        assert [e["seq"] for e in job.events(since=1)] == [1, 2]
+
+    def test_failure(self):
+        """测试任务异常被记录而不是抛给页面"""
+        manager = JobManager()
+
+        async def fail(job):
+            raise ValueError("boom")
+
+        job = manager.submit(fail, kind="ml")
+        assert job.wait(5) is None
+        assert job.status == JobStatus.FAILED
+        assert job.error == "ValueError: boom"
+        assert job.events()[-1] == {**job.events()[-1], "status": "failed", "error": "ValueError: boom"}
+
+    def test_cancel_running(self):
+        """测试取消正在运行的任务"""
+        manager = JobManager()
+        started = threading.Event()
+
+        async def slow(job):
+            started.set()
+            await asyncio.sleep(10)
+
+        job = manager.submit(slow, kind="vision")
+        assert started.wait(5)
+        assert manager.cancel(job.id)
+        job.wait(5)
+        assert job.status == JobStatus.CANCELLED
+        assert not job.cancel()
+
+    def test_list_and_latest(self):
+        """测试按客户端和类别查询任务"""
+        manager = JobManager()
+        release = threading.Event()
+
+        async def block(job):
+            await asyncio.get_running_loop().run_in_executor(None, release.wait, 5)
+
+        first = manager.submit(block, kind="ml", owner="a")
+        second = manager.submit(block, kind="vision", owner="a")
+        other = manager.submit(block, kind="ml", owner="b")
+
+        assert manager.list(owner="a") == [first, second]
+        assert manager.list(kind="ml") == [first, other]
+        assert manager.latest("a") is second
+        assert manager.latest("a", kind="ml") is first
+        assert manager.get(first.id) is first
+        assert manager.get(None) is None
+
+        release.set()
+        for job in (first, second, other):
+            job.wait(5)
+        assert manager.list(active_only=True) == []
+        assert manager.latest("a", active_only=True) is None
+
+    def test_prune_finished(self):
+        """测试只保留最近结束的任务"""
+        manager = JobManager(max_finished=2)
+
+        async def noop(job):
+            return job.id
+
+        jobs = []
+        for _ in range(4):
+            job = manager.submit(noop, kind="ml")
+            job.wait(5)
+            jobs.append(job)
+        manager.submit(noop, kind="ml").wait(5)
+
+        assert manager.get(jobs[0].id) is None
+        assert manager.get(jobs[-1].id) is jobs[-1]
+        assert len(manager.list()) <= 3
+
+    def test_shared_manager(self):
+        """测试进程级共享的任务管理器"""
+        assert get_job_manager() is get_job_manager()
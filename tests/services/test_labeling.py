@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import pytest
+
+from baicai_webui.services import compile_label_func, label_files, validate_label_func
+
+
+class TestLabeling:
+    """测试标注函数编译和批量标注"""
+
+    def test_compile_once(self):
+        """测试相同函数体只编译一次"""
+        func = compile_label_func("return x.parent.name")
+        assert func(Path("bears/grizzly/1.jpg")) == "grizzly"
+        assert compile_label_func("return x.parent.name") is func
+
+    def test_multiline_body(self):
+        """测试多行函数体"""
+        func = compile_label_func("name = x.stem\nreturn 'cat' if name[0].isupper() else 'dog'")
+        assert func(Path("Abc.jpg")) == "cat"
+        assert func(Path("abc.jpg")) == "dog"
+
+    def test_syntax_error(self):
+        """测试语法错误的提示"""
+        with pytest.raises(ValueError, match="语法错误"):
+            compile_label_func("return x.parent.name)")
+        with pytest.raises(ValueError, match="不能为空"):
+            compile_label_func("  ")
+
+    def test_validate_reports_file(self):
+        """测试运行错误时指出出错的文件"""
+        func = compile_label_func("return x.name.split('_')[1]")
+        with pytest.raises(ValueError, match="nounderscore.jpg"):
+            validate_label_func(func, [Path("a_1.jpg"), Path("nounderscore.jpg")])
+        with pytest.raises(ValueError, match="None"):
+            validate_label_func(compile_label_func("x.name"), [Path("a.jpg")])
+
+    def test_label_files(self):
+        """测试批量标注"""
+        fnames = [Path(f"data/{label}/{i}.jpg") for label in ["a", "b"] for i in range(30)]
+        labels = label_files("return x.parent.name", fnames)
+        assert len(labels) == 60
+        assert labels[Path("data/b/3.jpg")] == "b"
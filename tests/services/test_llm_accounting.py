@@ -0,0 +1,128 @@
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from baicai_webui.services import (
+    LLMCallLog,
+    LLMCallRecorder,
+    instrument_llm,
+    llm_call_frame,
+    llm_scope,
+    llm_usage_summary,
+)
+from baicai_webui.services.run_events import _token_usage
+
+
+def fake_llm(*messages):
+    return GenericFakeChatModel(messages=iter(messages))
+
+
+class TestLLMAccounting:
+    """测试 LLM 调用的记录和汇总"""
+
+    def test_tags_and_usage(self, tmp_path):
+        """测试调用按 llm_scope 和 instrument_llm 打标签，记录 token 用量和错误"""
+        log = LLMCallLog(tmp_path / "calls.jsonl")
+        config = {"callbacks": [LLMCallRecorder(log)]}
+        llm = instrument_llm(
+            fake_llm(AIMessage(content="a", usage_metadata={"input_tokens": 5, "output_tokens": 2, "total_tokens": 7})),
+            "quiz",
+        )
+
+        llm.invoke("first", config)
+        with llm_scope(page="小测验", feature="tutor"):
+            with llm_scope(feature="hinter"):
+                try:
+                    # 消息已用完，调用出错
+                    llm.invoke("second", config)
+                except StopIteration:
+                    pass
+
+        first, second = log.records()
+        assert (first["page"], first["feature"], first["prompt_tokens"], first["completion_tokens"]) == (
+            "-",
+            "quiz",
+            5,
+            2,
+        )
+        assert first["error"] is None and first["latency"] >= 0 and not first["cache_hit"]
+        assert (second["page"], second["feature"]) == ("小测验", "hinter")
+        assert second["error"].startswith("StopIteration")
+
+    def test_streaming_ttft(self, tmp_path):
+        """测试流式调用记录首个 token 的时间"""
+        log = LLMCallLog(tmp_path / "calls.jsonl")
+        llm = fake_llm(AIMessage(content="hello world"))
+        chunks = list(llm.stream("hi", {"callbacks": [LLMCallRecorder(log)]}))
+        assert len(chunks) > 1
+        (record,) = log.records()
+        assert record["streaming"] and 0 <= record["ttft"] <= record["latency"]
+
+    def test_cached_tokens(self):
+        """测试读取服务端提示缓存命中的 token 数"""
+        response = LLMResult(
+            generations=[[ChatGeneration(message=AIMessage(content="a"))]],
+            llm_output={
+                "token_usage": {
+                    "prompt_tokens": 100,
+                    "completion_tokens": 5,
+                    "prompt_tokens_details": {"cached_tokens": 64},
+                }
+            },
+        )
+        assert _token_usage(response) == {"prompt_tokens": 100, "completion_tokens": 5, "cached_tokens": 64}
+        message = AIMessage(
+            content="a",
+            usage_metadata={
+                "input_tokens": 10,
+                "output_tokens": 1,
+                "total_tokens": 11,
+                "input_token_details": {"cache_read": 8},
+            },
+        )
+        response = LLMResult(generations=[[ChatGeneration(message=message)]])
+        assert _token_usage(response) == {"prompt_tokens": 10, "completion_tokens": 1, "cached_tokens": 8}
+
+    def test_log_and_summary(self, tmp_path):
+        """测试记录写入文件后可以恢复，按标签汇总调用次数、错误、缓存命中率和耗时分位数"""
+        path = tmp_path / "calls.jsonl"
+        log = LLMCallLog(path, max_records=10)
+        for i in range(4):
+            log.add(
+                {
+                    "time": 1000.0 + i,
+                    "page": "小测验",
+                    "feature": "tutor" if i < 3 else "hinter",
+                    "model": "m",
+                    "latency": float(i + 1),
+                    "prompt_tokens": 10,
+                    "completion_tokens": None if i == 3 else 2,
+                    "cache_hit": i == 0,
+                    "error": "RuntimeError: x" if i == 2 else None,
+                }
+            )
+        restored = LLMCallLog(path)
+        assert len(restored) == 4
+        assert [r["time"] for r in restored.records(since=1002.0)] == [1002.0, 1003.0]
+
+        frame = llm_call_frame(restored.records())
+        assert frame["time"].dt.second.diff().dropna().tolist() == [1.0, 1.0, 1.0]
+        summary = llm_usage_summary(frame, ["page", "feature"]).set_index("feature")
+        assert summary.loc["tutor", ["calls", "errors", "prompt_tokens", "completion_tokens"]].tolist() == [3, 1, 30, 6]
+        assert summary.loc["tutor", "cache_hit_rate"] == 1 / 3
+        assert summary.loc["tutor", "p50"] == 2.0
+        assert summary.loc["hinter", "completion_tokens"] == 0
+        assert llm_usage_summary(llm_call_frame([]), ["model"]).empty
+
+    def test_log_rotation(self, tmp_path):
+        """测试记录文件不会无限增长，改写后保留最近的记录"""
+        path = tmp_path / "calls.jsonl"
+        log = LLMCallLog(path, max_records=3)
+        for i in range(10):
+            log.add({"time": float(i)})
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) <= 6
+        assert [r["time"] for r in LLMCallLog(path, max_records=3).records()] == [7.0, 8.0, 9.0]
+        # 以更小的上限加载时立即截断文件
+        LLMCallLog(path, max_records=2)
+        assert len(path.read_text(encoding="utf-8").splitlines()) == 2
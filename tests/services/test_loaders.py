@@ -0,0 +1,44 @@
+import pandas as pd
+
+from baicai_webui.services import apply_dtype_transforms, columnar_copy, load_table, table_schema
+from baicai_webui.services.loaders import read_columnar, write_columnar
+
+
+class TestColumnarHandoff:
+    """测试上传文件转换为列式文件后交给智能体"""
+
+    def test_dtype_transforms(self):
+        """测试类型转换，无法解析的值变为缺失值，不存在的列被忽略"""
+        df = pd.DataFrame({"n": ["1", "x", "3"], "d": ["2024-01-01", "bad", "2024-03-01"], "c": ["a", "b", "a"]})
+        apply_dtype_transforms(df, {"n": "int64", "d": "datetime64", "c": "category", "missing": "float64"})
+        assert table_schema(df) == {"n": "Int64", "d": "datetime64[ns]", "c": "category"}
+        assert df["n"].isna().tolist() == [False, True, False]
+        assert df["d"].isna().tolist() == [False, True, False]
+
+    def test_columnar_copy(self, tmp_path):
+        """测试转换后的 Parquet 保留类型，同一文件和转换只写入一次"""
+        source = tmp_path / "upload.csv"
+        pd.DataFrame({"id": ["1", "2", "3"], "label": ["a", "b", "a"]}).to_csv(source, index=False)
+        transforms = {"label": "category"}
+        df = apply_dtype_transforms(load_table(source), transforms)
+
+        dest = columnar_copy(df, source, tmp_path / "columnar", transforms)
+        assert dest.suffix == ".parquet"
+        loaded = read_columnar(dest)
+        assert table_schema(loaded) == table_schema(df)
+        mtime = dest.stat().st_mtime_ns
+        assert columnar_copy(df, source, tmp_path / "columnar", transforms) == dest
+        assert dest.stat().st_mtime_ns == mtime
+        # 不同的类型转换得到不同的文件
+        assert columnar_copy(df, source, tmp_path / "columnar", {}) != dest
+        # 原文件已是列式格式且没有类型转换时直接使用
+        assert columnar_copy(loaded, dest, tmp_path / "columnar") == dest
+
+    def test_mixed_object_column(self, tmp_path):
+        """测试混合类型的文本列按字符串保存"""
+        df = pd.DataFrame({"mixed": [1, "a", None], "x": [1.0, 2.0, 3.0]})
+        dest = write_columnar(df, tmp_path / "mixed.feather")
+        loaded = read_columnar(dest)
+        assert loaded["mixed"].tolist()[:2] == ["1", "a"]
+        assert pd.isna(loaded["mixed"].iloc[2])
+        assert not list(tmp_path.glob("*.part"))
@@ -0,0 +1,64 @@
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from baicai_webui.services import ResourceSampler, RunEvents, kernel_pid, resource_frame, usage_summary
+
+psutil = pytest.importorskip("psutil")
+
+
+def fake_interpreter(pid):
+    """只提供内核 pid 的解释器替身"""
+    return SimpleNamespace(nb_client=SimpleNamespace(km=SimpleNamespace(provisioner=SimpleNamespace(pid=pid))))
+
+
+class TestResourceSampler:
+    """测试运行期间的资源采样"""
+
+    def test_sample_processes(self, tmp_path):
+        """测试采样界面进程和内核进程（含子进程），停止时再采样一次"""
+        child = "import time; time.sleep(30)"
+        code = f"import subprocess, sys, time; subprocess.Popen([sys.executable, '-c', {child!r}]); time.sleep(30)"
+        kernel = subprocess.Popen([sys.executable, "-c", code])
+        try:
+            time.sleep(0.5)
+            interpreter = fake_interpreter(kernel.pid)
+            assert kernel_pid(interpreter) == kernel.pid
+            assert kernel_pid(None) is None
+
+            events = RunEvents("r", path=tmp_path / "r.events.jsonl")
+            with ResourceSampler(events, interpreter, interval=0.1):
+                time.sleep(0.35)
+            frame = resource_frame(events.events())
+            root_mb = psutil.Process(kernel.pid).memory_info().rss / 2**20
+        finally:
+            for child in psutil.Process(kernel.pid).children(recursive=True):
+                child.kill()
+            kernel.kill()
+            kernel.wait()
+
+        assert set(frame["process"]) == {"webui", "kernel"}
+        assert len(frame[frame["process"] == "kernel"]) >= 3
+        assert (frame["peak_mb"] >= frame["rss_mb"]).all()
+        # 内核的内存包含子进程
+        assert frame[frame["process"] == "kernel"]["rss_mb"].iloc[-1] > root_mb * 1.5
+
+    def test_usage_summary(self):
+        """测试运行资源摘要"""
+        records = [
+            {"event": "resource", "elapsed": 0.0, "process": "kernel", "cpu": 50.0, "rss_mb": 100.0, "peak_mb": 100.0},
+            {"event": "resource", "elapsed": 2.0, "process": "kernel", "cpu": 100.0, "rss_mb": 80.0, "peak_mb": 120.0},
+            {"event": "llm_call", "node": "coder", "seconds": 1.5, "prompt_tokens": 10, "completion_tokens": 5},
+            {"event": "llm_call", "node": "coder", "seconds": 0.5, "prompt_tokens": 4, "completion_tokens": 1},
+        ]
+        assert usage_summary(records) == {
+            "kernel_peak_mb": 120.0,
+            "kernel_cpu_avg": 75.0,
+            "llm_calls": 2,
+            "llm_tokens": 20,
+            "llm_seconds": 2.0,
+        }
+        assert usage_summary([]) == {}
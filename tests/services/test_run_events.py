@@ -0,0 +1,170 @@
+import asyncio
+from typing import TypedDict
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, StateGraph
+
+from baicai_webui.services import (
+    GraphEventCallback,
+    RunEvents,
+    RunLog,
+    epoch_metrics_frame,
+    llm_usage_frame,
+    load_run_events,
+    node_timeline_frame,
+    parse_epoch_metrics,
+    run_async,
+)
+
+TEXT_TABLE = """- Code run result:
+```sh
+epoch     train_loss  valid_loss  error_rate  time
+0         1.200000    0.900000    0.300000    00:12
+1         0.800000    0.700000    #na#        01:02
+```
+"""
+
+HTML_TABLE = (
+    "<table><thead><tr><th>epoch</th><th>train_loss</th><th>valid_loss</th><th>time</th></tr></thead>"
+    "<tbody><tr><td>0</td><td>0.5</td><td>0.4</td><td>00:03</td></tr></tbody></table>"
+)
+
+
+class State(TypedDict):
+    x: int
+    dl_success: bool
+
+
+class TestRunEvents:
+    """测试结构化训练事件"""
+
+    def test_parse_epoch_metrics(self):
+        """测试解析纯文本和 HTML 格式的 fastai 进度表"""
+        (table,) = parse_epoch_metrics(TEXT_TABLE)
+        assert table == [
+            {"epoch": 0, "train_loss": 1.2, "valid_loss": 0.9, "error_rate": 0.3, "seconds": 12},
+            {"epoch": 1, "train_loss": 0.8, "valid_loss": 0.7, "error_rate": None, "seconds": 62},
+        ]
+        assert parse_epoch_metrics(HTML_TABLE) == [[{"epoch": 0, "train_loss": 0.5, "valid_loss": 0.4, "seconds": 3}]]
+        assert parse_epoch_metrics("no epochs here") == []
+
+    def test_events_from_log_and_jsonl(self, tmp_path):
+        """测试从运行日志中提取 epoch 事件并写入 JSONL"""
+        events = RunEvents("a", path=tmp_path / "a.events.jsonl")
+        run_log = RunLog("a", path=tmp_path / "a.md")
+        run_log.subscribe(events.observe_log)
+        run_log.append(TEXT_TABLE)
+        run_log.append(HTML_TABLE)
+        events.close()
+
+        saved = load_run_events(events.path)
+        assert [e["event"] for e in saved] == ["epoch", "epoch", "epoch"]
+        assert [e["attempt"] for e in saved] == [1, 1, 2]
+
+        latest = epoch_metrics_frame(saved)
+        assert list(latest.columns) == ["train_loss", "valid_loss", "seconds"]
+        first = epoch_metrics_frame(saved, attempt=1)
+        assert list(first.index) == [0, 1]
+        assert first.loc[1, "valid_loss"] == 0.7
+
+    def test_graph_callback(self, tmp_path):
+        """测试图节点的开始、结束、出错和代码运行结果事件"""
+        events = RunEvents("g", path=tmp_path / "g.events.jsonl")
+
+        def coder(state):
+            return {"x": state["x"] + 1}
+
+        async def runner(state):
+            await asyncio.sleep(0.01)
+            return {"dl_success": True}
+
+        def broken(state):
+            raise ValueError("bad")
+
+        graph = StateGraph(State)
+        graph.add_node("coder", coder)
+        graph.add_node("runner", runner)
+        graph.add_node("broken", broken)
+        graph.add_edge(START, "coder")
+        graph.add_edge("coder", "runner")
+        graph.add_edge("runner", "broken")
+        graph.add_edge("broken", END)
+        app = graph.compile()
+
+        try:
+            run_async(app.ainvoke({"x": 0, "dl_success": False}, {"callbacks": [GraphEventCallback(events)]}))
+        except ValueError:
+            pass
+
+        records = events.events()
+        assert [(e["event"], e.get("node")) for e in records] == [
+            ("node_start", "coder"),
+            ("node_end", "coder"),
+            ("node_start", "runner"),
+            ("node_end", "runner"),
+            ("code_result", "runner"),
+            ("node_start", "broken"),
+            ("node_end", "broken"),
+        ]
+        assert records[4]["success"] is True
+        assert records[-1]["status"] == "error"
+        assert "bad" in records[-1]["error"]
+
+        timeline = node_timeline_frame(records)
+        assert list(timeline["node"]) == ["coder", "runner", "broken"]
+        assert list(timeline["status"]) == ["ok", "ok", "error"]
+        assert (timeline["end"] >= timeline["start"]).all()
+
+    def test_llm_calls(self, tmp_path):
+        """测试节点内的 LLM 调用按节点记录耗时、token 数和错误"""
+        events = RunEvents("l", path=tmp_path / "l.events.jsonl")
+        llm = GenericFakeChatModel(
+            messages=iter(
+                [
+                    AIMessage(content="a", usage_metadata={"input_tokens": 5, "output_tokens": 2, "total_tokens": 7}),
+                    AIMessage(content="b", usage_metadata={"input_tokens": 3, "output_tokens": 1, "total_tokens": 4}),
+                ]
+            )
+        )
+
+        async def coder(state):
+            await llm.ainvoke("first")
+            await llm.ainvoke("second")
+            return {"x": state["x"] + 1}
+
+        async def helper(state):
+            try:
+                # 消息已用完，调用出错（协程中的 StopIteration 被转换为 RuntimeError）
+                await llm.ainvoke("third")
+            except RuntimeError:
+                pass
+            return {"x": state["x"]}
+
+        graph = StateGraph(State)
+        graph.add_node("coder", coder)
+        graph.add_node("helper", helper)
+        graph.add_edge(START, "coder")
+        graph.add_edge("coder", "helper")
+        graph.add_edge("helper", END)
+        run_async(graph.compile().ainvoke({"x": 0, "dl_success": False}, {"callbacks": [GraphEventCallback(events)]}))
+
+        calls = events.events("llm_call")
+        assert [(e["node"], e.get("prompt_tokens")) for e in calls] == [("coder", 5), ("coder", 3), ("helper", None)]
+        assert "error" in calls[-1]
+        usage = llm_usage_frame(events.events()).set_index("node")
+        assert usage.loc["coder", ["calls", "errors", "prompt_tokens", "completion_tokens"]].tolist() == [2, 0, 8, 3]
+        assert usage.loc["helper", ["calls", "errors"]].tolist() == [1, 1]
+        assert llm_usage_frame([]).empty
+
+    def test_timeline_running_node(self):
+        """测试运行中的节点显示到最新事件时间"""
+        records = [
+            {"event": "node_start", "node": "a", "step": 1, "elapsed": 1.0},
+            {"event": "epoch", "epoch": 0, "elapsed": 4.0},
+        ]
+        timeline = node_timeline_frame(records)
+        assert timeline.to_dict("records") == [
+            {"node": "a", "step": 1, "start": 1.0, "end": 4.0, "duration": 3.0, "status": "running"}
+        ]
+        assert node_timeline_frame([]).empty
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import threading
+
+from baicai_webui.services import RunLog, current_run_log, run_async
+
+logger = logging.getLogger("baicai_webui.tests.run_logs")
+logger.setLevel(logging.INFO)
+
+
+class TestRunLog:
+    """测试单次运行的日志流"""
+
+    def test_append_read(self, tmp_path):
+        """测试按偏移量读取新内容，并写入运行专属文件"""
+        run_log = RunLog("a", path=tmp_path / "a.md")
+        run_log.append("first\n")
+        run_log.append("second\n")
+
+        assert run_log.read() == ("first\nsecond\n", 13)
+        assert run_log.read(3) == ("st\nsecond\n", 13)
+        assert run_log.read(6) == ("second\n", 13)
+        assert run_log.read(13) == ("", 13)
+
+        run_log.close()
+        run_log.append("ignored\n")
+        assert (tmp_path / "a.md").read_text(encoding="utf-8") == "first\nsecond\n"
+
+    def test_wait_wakes_on_append_and_close(self, tmp_path):
+        """测试有新内容或关闭时等待立即返回"""
+        run_log = RunLog("b", path=tmp_path / "b.md")
+        assert not run_log.wait(0, timeout=0.01)
+
+        threading.Timer(0.05, run_log.append, args=("line\n",)).start()
+        assert run_log.wait(0, timeout=5)
+
+        threading.Timer(0.05, run_log.close).start()
+        assert not run_log.wait(run_log.size, timeout=5)
+        assert run_log.closed
+
+    def test_records_routed_by_context(self, tmp_path):
+        """测试并发运行的日志记录只归属到各自的运行"""
+        logs = {name: RunLog(name, path=tmp_path / f"{name}.md") for name in ("x", "y")}
+
+        async def run(name):
+            with logs[name].bind():
+                assert current_run_log() is logs[name]
+                for i in range(3):
+                    logger.info(f"{name}-{i}")
+                    await asyncio.sleep(0.01)
+                await asyncio.to_thread(logger.info, f"{name}-thread")
+
+        async def both():
+            await asyncio.gather(run("x"), run("y"))
+
+        run_async(both())
+        logger.info("outside")
+
+        assert logs["x"].text == "x-0\n\nx-1\n\nx-2\n\nx-thread\n\n"
+        assert logs["y"].text == "y-0\n\ny-1\n\ny-2\n\ny-thread\n\n"
+        assert current_run_log() is None
+
+    def test_entries_and_window(self, tmp_path):
+        """测试按条读取日志和最近窗口的起点"""
+        run_log = RunLog("w", path=tmp_path / "w.md")
+        for i in range(10):
+            run_log.append(f"line {i}\n\n")
+        run_log.append("```\ncode\nblock\n```\n\n")
+
+        assert run_log.entry_count == 11
+        assert run_log.entries(9) == ["line 9\n\n", "```\ncode\nblock\n```\n\n"]
+        assert run_log.window_start(7) == 9
+        assert run_log.window_start(8) == 9
+        assert run_log.window_start(9) == 8
+        assert run_log.window_start(7, end=10) == 7
+        # 单条记录超过窗口时仍然完整显示
+        assert run_log.window_start(1) == 10
+        assert run_log.window_start(10_000) == 0
@@ -0,0 +1,112 @@
+import os
+import time
+
+from langchain_core.messages import AIMessage
+
+from baicai_webui.services import RunLog, RunStore, dataset_fingerprint, latest_artifact, summarize_state
+
+
+def make_state():
+    return {
+        "messages": [AIMessage(content="done")],
+        "baseline_codes": [{"code": "print(1)", "success": True}],
+        "baseline_success": True,
+        "actions": [],
+        "workflow_codes": None,
+    }
+
+
+class TestRunStore:
+    """测试本地运行记录库"""
+
+    def test_record_and_restore(self, tmp_path):
+        """测试保存运行后可以读取元数据、完整状态和文件副本"""
+        data = tmp_path / "iris.csv"
+        data.write_text("a,b\n1,2\n")
+        log = tmp_path / "run.md"
+        log.write_text("## Running\n\n")
+        model = tmp_path / "best_20240101.pkl"
+        model.write_bytes(b"model")
+
+        store = RunStore(root=tmp_path / "runs")
+        config = {"configurable": {"name": "Iris", "path": str(data), "target": "b"}}
+        record = store.record(
+            "run1",
+            "ML",
+            config,
+            state=make_state(),
+            owner="client-a",
+            started_at=time.time() - 5,
+            files={"log": str(log), "model/best_20240101.pkl": str(model), "events": None},
+        )
+
+        assert record.name == "Iris"
+        assert record.status == "succeeded"
+        assert record.config == config
+        assert 4 < record.duration < 60
+        assert record.dataset_fingerprint == dataset_fingerprint(data)
+        assert record.summary == {
+            "baseline_codes_count": 1,
+            "baseline_success": True,
+            "actions_count": 0,
+            "workflow_codes_count": 0,
+        }
+        assert set(record.artifacts) == {"log", "model/best_20240101.pkl"}
+        assert latest_artifact(record, "model", "best").read_bytes() == b"model"
+        assert latest_artifact(record, "data", "workflow") is None
+
+        # 新的 RunStore 实例（模拟重启）仍能读取
+        reopened = RunStore(root=tmp_path / "runs")
+        state = reopened.load_state("run1")
+        assert state["messages"][0].content == "done"
+        assert state["baseline_codes"] == make_state()["baseline_codes"]
+
+    def test_list_filters(self, tmp_path):
+        """测试按任务类型和客户端过滤并按时间倒序"""
+        store = RunStore(root=tmp_path)
+        store.record("a", "ML", {"name": "x"}, owner="u1", started_at=1, finished_at=2)
+        store.record("b", "Vision", {"name": "y"}, owner="u1", started_at=3, finished_at=4)
+        store.record("c", "ML", {"name": "z"}, owner="u2", started_at=5, finished_at=6, status="failed", error="boom")
+
+        assert [r.id for r in store.list()] == ["c", "b", "a"]
+        assert [r.id for r in store.list(task_type="ML")] == ["c", "a"]
+        assert [r.id for r in store.list(task_type="ML", owner="u1")] == ["a"]
+        assert store.get("c").error == "boom"
+        assert store.load_state("a") is None
+
+        store.delete("a")
+        assert store.get("a") is None
+        assert not store.run_dir("a").exists()
+
+    def test_dataset_fingerprint(self, tmp_path):
+        """测试数据集内容或修改时间变化时指纹改变"""
+        data = tmp_path / "data.csv"
+        data.write_text("a\n1\n")
+        first = dataset_fingerprint(data)
+        data.write_text("a\n2\n")
+        os.utime(data, ns=(1, 1))
+        assert dataset_fingerprint(data) != first
+
+        folder = tmp_path / "images"
+        (folder / "cat").mkdir(parents=True)
+        (folder / "cat" / "1.jpg").write_bytes(b"x")
+        before = dataset_fingerprint(folder)
+        (folder / "cat" / "2.jpg").write_bytes(b"y")
+        assert dataset_fingerprint(folder) != before
+        assert dataset_fingerprint(tmp_path / "missing") is None
+
+    def test_summarize_state(self):
+        assert summarize_state({"dl_codes": [1, 2], "dl_models": [1], "dl_success": False, "messages": []}) == {
+            "dl_codes_count": 2,
+            "dl_models_count": 1,
+            "dl_success": False,
+        }
+
+    def test_run_log_from_file(self, tmp_path):
+        """测试从保存的日志恢复条目，代码块中的空行不会切开"""
+        path = tmp_path / "run_x.md"
+        path.write_text("## Start\n\n- Code:\n```python\na = 1\n\nb = 2\n```\n\n## End\n\n", encoding="utf-8")
+        run_log = RunLog.from_file(path)
+        assert run_log.closed
+        assert run_log.entries() == ["## Start\n\n", "- Code:\n```python\na = 1\n\nb = 2\n```\n\n", "## End\n\n"]
+        assert run_log.text == path.read_text(encoding="utf-8")
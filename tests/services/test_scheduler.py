@@ -0,0 +1,194 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from baicai_webui.services import (
+    AdmissionError,
+    JobClass,
+    JobManager,
+    JobStatus,
+    ResourceScheduler,
+    job_class_for,
+)
+
+JOB_CLASSES = {
+    "small": JobClass("small", cpu=1, memory_mb=100, label="小任务"),
+    "big": JobClass("big", cpu=2, memory_mb=100, label="大任务"),
+}
+
+
+def make_manager(**kwargs):
+    scheduler = ResourceScheduler(cpu_slots=2, memory_mb=1000, job_classes=JOB_CLASSES, **kwargs)
+    return JobManager(scheduler=scheduler), scheduler
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class Gate:
+    """让测试控制任务何时结束"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    async def __call__(self, job):
+        await asyncio.get_running_loop().run_in_executor(None, self.release.wait, 5)
+        return job.id
+
+
+class TestResourceScheduler:
+    """测试服务器级任务调度"""
+
+    def test_queue_until_slots_free(self):
+        """测试资源不足时任务排队，资源释放后按顺序启动"""
+        manager, scheduler = make_manager(per_user_limit=0)
+        gate = Gate()
+
+        first = manager.submit(gate, kind="ML", owner="a", job_class="big")
+        assert wait_until(lambda: first.status == JobStatus.RUNNING)
+        second = manager.submit(gate, kind="ML", owner="b", job_class="small")
+        third = manager.submit(gate, kind="ML", owner="c", job_class="small")
+        assert wait_until(lambda: third.status == JobStatus.QUEUED)
+
+        assert manager.queue_position(first) == 0
+        assert manager.queue_position(second) == 1
+        assert manager.queue_position(third) == 2
+        assert scheduler.stats()["cpu_used"] == 2
+
+        gate.release.set()
+        for job in (first, second, third):
+            job.wait(5)
+            assert job.status == JobStatus.SUCCEEDED
+        assert scheduler.stats() == {**scheduler.stats(), "running": 0, "waiting": 0, "cpu_used": 0}
+
+    def test_fair_order(self):
+        """测试没有运行任务的用户排在已有任务运行的用户前面"""
+        manager, scheduler = make_manager(per_user_limit=0)
+        gate = Gate()
+
+        running = manager.submit(gate, kind="ML", owner="a", job_class="big")
+        assert wait_until(lambda: running.status == JobStatus.RUNNING)
+        again = manager.submit(gate, kind="ML", owner="a", job_class="small")
+        assert wait_until(lambda: again.status == JobStatus.QUEUED)
+        other = manager.submit(gate, kind="ML", owner="b", job_class="small")
+        assert wait_until(lambda: other.status == JobStatus.QUEUED)
+
+        assert manager.queue_position(other) == 1
+        assert manager.queue_position(again) == 2
+        gate.release.set()
+        for job in (running, again, other):
+            job.wait(5)
+
+    def test_per_user_limit(self):
+        """测试每个用户同时排队和运行的任务数有上限"""
+        manager, _ = make_manager(per_user_limit=1)
+        gate = Gate()
+
+        job = manager.submit(gate, kind="ML", owner="a", job_class="small")
+        with pytest.raises(AdmissionError):
+            manager.submit(gate, kind="ML", owner="a", job_class="small")
+        other = manager.submit(gate, kind="ML", owner="b", job_class="small")
+
+        gate.release.set()
+        job.wait(5)
+        other.wait(5)
+        manager.submit(gate, kind="ML", owner="a", job_class="small").wait(5)
+
+    def test_admit_reserves(self):
+        """测试准入时预留名额，任务入队前并发提交不会同时通过个人限额，释放后名额归还"""
+        scheduler = ResourceScheduler(cpu_slots=2, memory_mb=1000, per_user_limit=1, job_classes=JOB_CLASSES)
+        scheduler.admit("a", "small", "j1")
+        with pytest.raises(AdmissionError):
+            scheduler.admit("a", "small", "j2")
+        scheduler.release("j1")
+        scheduler.admit("a", "small", "j2")
+
+        manager, _ = make_manager(per_user_limit=1)
+        gate = Gate()
+        results = []
+
+        def submit():
+            try:
+                results.append(manager.submit(gate, kind="ML", owner="a", job_class="small"))
+            except AdmissionError:
+                results.append(None)
+
+        threads = [threading.Thread(target=submit) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len([job for job in results if job is not None]) == 1
+        gate.release.set()
+
+    def test_try_acquire(self):
+        """测试借用槽位只在资源空闲且没有任务排队时成功"""
+        manager, scheduler = make_manager(per_user_limit=0)
+        assert scheduler.try_acquire("x", None, "small")
+        gate = Gate()
+        big = manager.submit(gate, kind="ML", owner="a", job_class="big")
+        assert wait_until(lambda: big.status == JobStatus.QUEUED)
+        scheduler.release("x")
+        assert wait_until(lambda: big.status == JobStatus.RUNNING)
+        assert not scheduler.try_acquire("y", None, "small")
+        gate.release.set()
+        big.wait(5)
+        assert scheduler.try_acquire("y", None, "small")
+        scheduler.release("y")
+        assert scheduler.stats()["running"] == 0
+
+    def test_admission(self):
+        """测试队列已满或资源需求超过容量时拒绝任务"""
+        scheduler = ResourceScheduler(cpu_slots=1, memory_mb=1000, max_queue=0, job_classes=JOB_CLASSES)
+        with pytest.raises(AdmissionError):
+            scheduler.admit("a", "big")
+        with pytest.raises(AdmissionError):
+            scheduler.admit("a", "small")
+        with pytest.raises(ValueError):
+            scheduler.admit("a", "unknown")
+
+    def test_cancel_queued(self):
+        """测试取消排队中的任务会离开队列"""
+        manager, scheduler = make_manager(per_user_limit=0)
+        gate = Gate()
+
+        running = manager.submit(gate, kind="ML", owner="a", job_class="big")
+        assert wait_until(lambda: running.status == JobStatus.RUNNING)
+        queued = manager.submit(gate, kind="ML", owner="b", job_class="small")
+        assert wait_until(lambda: queued.status == JobStatus.QUEUED)
+
+        assert queued.cancel()
+        queued.wait(5)
+        assert queued.status == JobStatus.CANCELLED
+        assert scheduler.stats()["waiting"] == 0
+
+        gate.release.set()
+        running.wait(5)
+        assert scheduler.stats()["running"] == 0
+
+    def test_job_class_for(self):
+        """测试任务类型到任务类别的映射"""
+        assert job_class_for("ML") == "ml"
+        assert job_class_for("Vision CSV Learner") == "vision"
+        assert job_class_for("Sentiment Inference") == "nlp_infer"
+        assert job_class_for("Sentiment Trainer") == "nlp_train"
+        assert job_class_for("NLP") == "nlp_train"
+        assert job_class_for("Collaborative") == "collab"
+
+    def test_from_env(self, monkeypatch):
+        """测试从环境变量读取配置"""
+        monkeypatch.setenv("BAICAI_SCHEDULER_CPU", "3")
+        monkeypatch.setenv("BAICAI_MAX_JOBS_PER_USER", "4")
+        monkeypatch.setenv("BAICAI_JOB_VISION_MEMORY_MB", "512")
+        scheduler = ResourceScheduler.from_env()
+        assert scheduler.cpu_slots == 3
+        assert scheduler.per_user_limit == 4
+        assert scheduler.get_class("vision").memory_mb == 512
@@ -0,0 +1,62 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from baicai_webui.services import SQLiteSource, ensure_sqlite_extract, load_table
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "data.db"
+    with sqlite3.connect(path) as conn:
+        pd.DataFrame({"x": range(1000), "y": [i % 3 for i in range(1000)]}).to_sql("points", conn, index=False)
+        pd.DataFrame({"name": ["a", "b"]}).to_sql("names", conn, index=False)
+    return path
+
+
+class TestSQLiteSource:
+    """测试 SQLite 数据源"""
+
+    def test_list_tables(self, db_path):
+        """测试列出数据表及行数"""
+        assert SQLiteSource(db_path).list_tables() == [("names", 2), ("points", 1000)]
+
+    def test_count_query(self, db_path):
+        """测试统计自定义查询的行数"""
+        assert SQLiteSource(db_path).count(query="SELECT * FROM points WHERE y = 0;") == 334
+
+    def test_sample_random(self, db_path):
+        """测试随机采样"""
+        sample = SQLiteSource(db_path).sample(table="points", n=50)
+        assert len(sample) == 50
+        assert list(sample.columns) == ["x", "y"]
+
+    def test_sample_stride(self, db_path):
+        """测试按 rowid 等距采样"""
+        sample = SQLiteSource(db_path).sample(table="points", n=100, method="stride")
+        assert len(sample) == 100
+        assert sample["x"].diff().dropna().eq(10).all()
+
+    def test_to_parquet_streams_all_rows(self, db_path, tmp_path):
+        """测试分批导出完整数据"""
+        dest = SQLiteSource(db_path).to_parquet(tmp_path / "points.parquet", table="points", batch_size=64)
+        df = load_table(dest)
+        assert len(df) == 1000
+        assert df["x"].tolist() == list(range(1000))
+        assert not (tmp_path / "points.parquet.part").exists()
+
+    def test_to_parquet_empty_result_keeps_columns(self, db_path, tmp_path):
+        """测试空结果仍保留列信息"""
+        dest = SQLiteSource(db_path).to_parquet(tmp_path / "empty.parquet", query="SELECT * FROM points WHERE x < 0")
+        df = load_table(dest)
+        assert df.empty
+        assert list(df.columns) == ["x", "y"]
+
+    def test_ensure_sqlite_extract(self, db_path, tmp_path):
+        """测试训练前按需导出"""
+        dest = tmp_path / "names.parquet"
+        configurable = {"path": str(dest), "sqlite_source": {"db_path": str(db_path), "table": "names", "query": None}}
+        assert ensure_sqlite_extract(configurable) == dest
+        assert load_table(dest)["name"].tolist() == ["a", "b"]
+        assert ensure_sqlite_extract({"path": str(dest)}) is None
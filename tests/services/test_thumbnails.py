@@ -0,0 +1,39 @@
+import shutil
+
+from PIL import Image
+
+from baicai_webui.services import ThumbnailCache, make_thumbnail
+
+
+class TestThumbnails:
+    """测试缩略图缓存"""
+
+    def test_make_thumbnail(self, tmp_path):
+        """测试缩略图尺寸和缓存复用"""
+        src = tmp_path / "big.png"
+        Image.new("RGBA", (1000, 500), "red").save(src)
+
+        thumb = make_thumbnail(src, tmp_path / "cache", max_edge=100)
+        with Image.open(thumb) as img:
+            assert img.size == (100, 50)
+            assert img.mode == "RGB"
+
+        mtime = thumb.stat().st_mtime_ns
+        assert make_thumbnail(src, tmp_path / "cache", max_edge=100) == thumb
+        assert thumb.stat().st_mtime_ns == mtime
+
+    def test_same_content_shares_thumbnail(self, tmp_path):
+        """测试内容相同的图片共用缩略图"""
+        src = tmp_path / "a.jpg"
+        Image.new("RGB", (300, 300), "blue").save(src)
+        shutil.copy(src, tmp_path / "b.jpg")
+        cache = ThumbnailCache(tmp_path / "cache", max_edge=64)
+        first, second = cache.get_many([src, tmp_path / "b.jpg"])
+        assert first == second
+
+    def test_unreadable_image(self, tmp_path):
+        """测试无法读取的图片返回 None"""
+        src = tmp_path / "broken.jpg"
+        src.write_bytes(b"not an image")
+        assert make_thumbnail(src, tmp_path / "cache") is None
+        assert make_thumbnail(tmp_path / "missing.jpg", tmp_path / "cache") is None
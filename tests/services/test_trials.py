@@ -0,0 +1,111 @@
+import subprocess
+import sys
+import textwrap
+
+from baicai_webui.services import TRIAL_TEARDOWN, TrialBudget, load_trials, trial_prelude, trials_markdown
+
+
+def run_search(tmp_path, budget: TrialBudget, search_code: str) -> str:
+    """模拟代码解释器：在独立进程中执行预置代码和搜索代码，避免修改测试进程中的 sklearn"""
+    trials_path = tmp_path / "trials.jsonl"
+    code = trial_prelude(trials_path, budget) + textwrap.dedent(
+        """
+        from sklearn.datasets import load_iris
+        from sklearn.dummy import DummyClassifier
+        from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+        from sklearn.tree import DecisionTreeClassifier
+
+        X, y = load_iris(return_X_y=True)
+        """
+    ) + textwrap.dedent(search_code)
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 0, completed.stderr
+    return trials_path
+
+
+class TestTrials:
+    """测试模型优化阶段按预算评估超参数搜索"""
+
+    def test_max_trials(self, tmp_path):
+        """测试超过试验上限的参数组合不再评估，搜索对象仍可 pickle，n_jobs 恢复原值"""
+        budget = TrialBudget(cpus=1, memory_mb=1024, max_trials=4, time_budget=0, patience=0)
+        path = run_search(
+            tmp_path,
+            budget,
+            """
+            import pickle
+            search = GridSearchCV(DecisionTreeClassifier(random_state=0), {"max_depth": [1, 2, 3, 4, 5, 6]}, n_jobs=-1)
+            search.fit(X, y)
+            assert len(search.cv_results_["params"]) == 4
+            assert search.n_jobs == -1
+            pickle.dumps(search)
+            """,
+        )
+        records = load_trials(path)
+        assert [trial["trial"] for trial in records["trials"]] == [1, 2, 3, 4]
+        assert records["trials"][0]["params"] == {"max_depth": 1}
+        summary = records["searches"][0]
+        assert (summary["evaluated"], summary["candidates"], summary["stop_reason"]) == (4, 6, "max_trials")
+        assert summary["best_score"] == max(trial["score"] for trial in records["trials"])
+        assert "达到试验上限" in trials_markdown(records)
+
+    def test_early_stopping(self, tmp_path):
+        """测试连续多批没有提升时提前停止"""
+        budget = TrialBudget(cpus=1, memory_mb=1024, max_trials=0, time_budget=0, patience=2)
+        path = run_search(
+            tmp_path,
+            budget,
+            """
+            search = RandomizedSearchCV(DummyClassifier(), {"random_state": list(range(10))}, n_iter=10, random_state=0)
+            search.fit(X, y)
+            """,
+        )
+        summary = load_trials(path)["searches"][0]
+        assert (summary["evaluated"], summary["stop_reason"]) == (3, "early_stopped")
+
+    def test_time_budget(self, tmp_path):
+        """测试超过总时长后不再开始新的一批试验"""
+        budget = TrialBudget(cpus=1, memory_mb=1024, max_trials=0, time_budget=0.001, patience=0)
+        path = run_search(
+            tmp_path,
+            budget,
+            """
+            search = GridSearchCV(DecisionTreeClassifier(random_state=0), {"max_depth": [1, 2, 3]})
+            search.fit(X, y)
+            assert len(search.cv_results_["params"]) == 1
+            """,
+        )
+        summary = load_trials(path)["searches"][0]
+        assert (summary["evaluated"], summary["stop_reason"]) == (1, "time_budget")
+
+    def test_teardown(self, tmp_path):
+        """测试恢复搜索类的原方法后，之后的搜索不再受预算限制，也不再写入记录文件"""
+        budget = TrialBudget(cpus=1, memory_mb=1024, max_trials=1, time_budget=0, patience=0)
+        before = """
+            import os
+            from sklearn.model_selection import _search
+
+            grid = {"max_depth": [1, 2, 3]}
+            search = GridSearchCV(DecisionTreeClassifier(random_state=0), grid).fit(X, y)
+            assert len(search.cv_results_["params"]) == 1
+            """
+        after = """
+            assert GridSearchCV.fit is _search.BaseSearchCV.fit and "fit" not in GridSearchCV.__dict__
+            assert "LOKY_MAX_CPU_COUNT" not in os.environ
+            assert not hasattr(_search, "_baicai_trial_settings")
+            search = GridSearchCV(DecisionTreeClassifier(random_state=0), grid).fit(X, y)
+            assert len(search.cv_results_["params"]) == 3
+            """
+        path = run_search(
+            tmp_path,
+            budget,
+            textwrap.dedent(before) + TRIAL_TEARDOWN + textwrap.dedent(after) + TRIAL_TEARDOWN,
+        )
+        records = load_trials(path)
+        assert len(records["trials"]) == 1 and len(records["searches"]) == 1
+
+    def test_budget_from_config(self):
+        """测试从运行配置读取预算，0 表示不限制"""
+        budget = TrialBudget.from_config({"trial_cpus": 2, "trial_max_trials": 0, "trial_time_budget": 30})
+        assert (budget.cpus, budget.max_trials, budget.time_budget) == (2, 0, 30.0)
+        assert budget.patience == TrialBudget().patience